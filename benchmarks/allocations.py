@@ -0,0 +1,72 @@
+"""Nodes allocated per node in the parsed tree, and time, for the sample queries."""
+import dataclasses
+import tracemalloc
+
+from husky_whale import ast
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+QUERIES = PARSER_QUERIES * 500
+
+
+def parse_all():
+    return [Parser(RegexLexer(query)).parse_statement() for query in QUERIES]
+
+
+def count_nodes(node: ast.Node) -> int:
+    # Goes through the fields, since child_nodes() leaves out some keywords
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        for field in dataclasses.fields(node):
+            value = getattr(node, field.name)
+            if isinstance(value, ast.Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, ast.Node))
+    return count
+
+
+def count_allocated_nodes() -> int:
+    """
+    Parse the queries, counting every node created, including copies.
+
+    Nodes can't be created again once the counter is removed, so this runs last.
+    """
+    allocated = 0
+
+    def counting_new(cls, *args, **kwargs):
+        nonlocal allocated
+        allocated += 1
+        return object.__new__(cls)
+
+    setattr(ast.Node, "__new__", counting_new)
+    parse_all()
+    return allocated
+
+
+def peak_bytes() -> int:
+    tracemalloc.start()
+    parse_all()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    seconds = best_time(parse_all)
+    report("Parser(RegexLexer)", seconds, len(QUERIES), "statements")
+    print(f"Peak traced memory: {peak_bytes() / 1024 / 1024:.1f} MiB")
+    nodes = sum(count_nodes(statement) for statement in parse_all())
+    allocated = count_allocated_nodes()
+    print(f"Nodes in trees: {nodes:,}")
+    print(f"Nodes allocated: {allocated:,} ({allocated / nodes:.2f} per node)")
+
+
+if __name__ == "__main__":
+    main()
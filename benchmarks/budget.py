@@ -0,0 +1,42 @@
+"""
+The cost of a ParseBudget, on the sample queries one by one and as a single
+large script, with limits high enough that none is reached.
+"""
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import ParseBudget, Parser
+
+from benchmarks.common import best_time, report
+
+QUERIES = PARSER_QUERIES * 1000
+SCRIPT = "".join(query.strip() + "\n;\n" for query in PARSER_QUERIES) * 500
+BUDGET = ParseBudget(max_tokens=10 ** 9, max_depth=10_000, max_seconds=3600.0)
+
+
+def parse_queries(budget) -> None:
+    for query in QUERIES:
+        Parser(RegexLexer(query), budget=budget).parse_statement()
+
+
+def parse_script(budget) -> None:
+    for _ in Parser(RegexLexer(SCRIPT), budget=budget).parse_script():
+        pass
+
+
+def main() -> None:
+    for label, fn, count, unit in (
+        ("queries", parse_queries, len(QUERIES), "statements"),
+        ("script", parse_script, len(SCRIPT), "bytes"),
+    ):
+        # Taking turns, so that both see the same changes in machine load
+        timings = [float("inf"), float("inf")]
+        for _ in range(10):
+            for index, budget in enumerate((None, BUDGET)):
+                timings[index] = min(timings[index], best_time(lambda: fn(budget), 1))
+        for seconds, budget in zip(timings, (None, BUDGET)):
+            report(f"{label}, budget={budget is not None}", seconds, count, unit)
+        print(f"{'':<40} {(timings[1] / timings[0] - 1) * 100:+10.1f} %")
+
+
+if __name__ == "__main__":
+    main()
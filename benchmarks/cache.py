@@ -0,0 +1,36 @@
+"""Parsing distinct texts without a cache, through a cold cache and a warm one."""
+import tempfile
+
+from husky_whale.cache import ASTCache
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+# Distinct texts, as a repository of files would be
+TEXTS = [
+    f"-- file {i}\n{query}"
+    for i in range(1000)
+    for query in PARSER_QUERIES
+]
+
+
+def main() -> None:
+    seconds = best_time(
+        lambda: [Parser(RegexLexer(text)).parse_statement() for text in TEXTS], 3
+    )
+    report("parse", seconds, len(TEXTS), "texts")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ASTCache(directory)
+        seconds = best_time(lambda: [cache.parse_data(text) for text in TEXTS], 1)
+        report("cold cache", seconds, len(TEXTS), "texts")
+        seconds = best_time(lambda: [cache.load_data(text) for text in TEXTS], 3)
+        report("warm cache, encoded", seconds, len(TEXTS), "texts")
+        seconds = best_time(lambda: [cache.parse(text) for text in TEXTS], 3)
+        report("warm cache, decoded", seconds, len(TEXTS), "texts")
+
+
+if __name__ == "__main__":
+    main()
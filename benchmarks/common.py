@@ -0,0 +1,34 @@
+"""Helpers shared by the benchmark scripts.
+
+Run a benchmark from the repository root, e.g. `python -m benchmarks.lexer`.
+"""
+import time
+from typing import Callable, List
+
+from husky_whale.corpus import PARSER_QUERIES
+
+
+def best_time(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Return the fastest of `repeat` runs of `fn`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def large_query_text(target_bytes: int, queries: List[str] = PARSER_QUERIES) -> str:
+    """Concatenate sample queries until the text is at least `target_bytes` long."""
+    parts = []
+    size = 0
+    while size < target_bytes:
+        for query in queries:
+            parts.append(query)
+            parts.append("\n")
+            size += len(query) + 1
+    return "".join(parts)
+
+
+def report(label: str, seconds: float, count: int, unit: str) -> None:
+    print(f"{label:<40} {seconds * 1000:10.1f} ms {count / seconds:14,.0f} {unit}/s")
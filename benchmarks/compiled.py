@@ -0,0 +1,61 @@
+"""Lexing and parsing with the modules compiled by mypyc against their sources.
+
+Usage: python -m benchmarks.compiled
+
+Build the compiled modules first, as the README describes. Each build runs in
+a fresh subprocess, the interpreted one with HUSKY_WHALE_PURE_PYTHON set.
+"""
+import os
+import subprocess
+import sys
+
+import husky_whale
+from husky_whale import token
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, large_query_text, report
+
+TEXT = large_query_text(1024 * 1024)
+
+
+def lex() -> int:
+    count = 0
+    next_token = RegexLexer(TEXT).next_token
+    while next_token().type != token.EOF:
+        count += 1
+    return count
+
+
+def parse() -> None:
+    for query in PARSER_QUERIES * 100:
+        Parser(RegexLexer(query)).parse_statement()
+
+
+def run() -> None:
+    label = "compiled" if husky_whale.compiled else "interpreted"
+    report(f"lex 1 MB ({label})", best_time(lex), lex(), "tokens")
+    statements = len(PARSER_QUERIES) * 100
+    report(f"parse ({label})", best_time(parse), statements, "statements")
+
+
+def main() -> None:
+    if sys.argv[1:] == ["--run"]:
+        run()
+        return
+
+    if not husky_whale.compiled:
+        sys.exit("No compiled modules found: build them as the README describes")
+    for pure in (True, False):
+        env = dict(os.environ)
+        env.pop("HUSKY_WHALE_PURE_PYTHON", None)
+        if pure:
+            env["HUSKY_WHALE_PURE_PYTHON"] = "1"
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.compiled", "--run"], env=env, check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Parsing, rendering and walking long OR chains and deeply nested groups.
+
+Each is timed at several sizes, all far past the recursion limit, to show that
+the time per term stays flat.
+"""
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.utils import walk
+
+from benchmarks.common import best_time, report
+
+SIZES = (25_000, 50_000, 100_000)
+
+
+def or_chain(terms: int) -> str:
+    return "SELECT a FROM t WHERE " + " OR ".join(f"a = {i}" for i in range(terms))
+
+
+def nested_groups(depth: int) -> str:
+    return "SELECT " + "(" * depth + "a" + ")" * depth
+
+
+def main() -> None:
+    for label, make_query in (("OR chain", or_chain), ("nested groups", nested_groups)):
+        for size in SIZES:
+            query = make_query(size)
+            statement = Parser(RegexLexer(query)).parse_statement()
+            for step, fn in (
+                ("parse", lambda: Parser(RegexLexer(query)).parse_statement()),
+                ("original_string", statement.original_string),
+                ("string", statement.string),
+                ("walk", lambda: sum(1 for _ in walk(statement))),
+            ):
+                seconds = best_time(fn, repeat=3)
+                report(f"{label} x{size:,}: {step}", seconds, size, "terms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Event-loop lag while parsing a mix of large and small queries.
+
+Usage: python -m benchmarks.event_loop
+
+A ticker task sleeps for 1 ms at a time and records how late it wakes, while
+the queries are parsed inline in coroutines, or through AsyncParser on threads
+or processes. Threads still share the GIL with the loop on a GIL build, which
+hands it over every sys.getswitchinterval() seconds.
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from husky_whale.aio import AsyncParser
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+TICK = 0.001
+LARGE = (
+    "SELECT "
+    + ", ".join(f"t.column_{i} * 2 + 1 AS alias_{i}" for i in range(2000))
+    + " FROM s.t WHERE "
+    + " AND ".join(f"(x_{i} = {i} OR y_{i} IS NOT NULL)" for i in range(2000))
+)
+QUERIES = (PARSER_QUERIES * 50 + [LARGE]) * 4
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def parse_inline(query: str) -> None:
+    Parser(RegexLexer(query)).parse_statement()
+
+
+async def run(parse) -> None:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticks = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(TICK * 10)
+    start = time.perf_counter()
+    await asyncio.gather(*map(parse, QUERIES))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await ticks
+    lags.sort()
+    p50, p99 = (lags[int(len(lags) * q)] * 1000 for q in (0.5, 0.99))
+    print(
+        f"  {seconds * 1000:8.1f} ms total, lag p50 {p50:6.2f} ms"
+        f" p99 {p99:7.2f} ms max {lags[-1] * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    print(
+        f"{len(QUERIES)} queries, {len(LARGE):,} characters in the largest;"
+        f" switch interval {sys.getswitchinterval() * 1000:.0f} ms"
+    )
+    print("inline")
+    asyncio.run(run(parse_inline))
+    print("AsyncParser, threads")
+    asyncio.run(run(AsyncParser().parse))
+    with ProcessPoolExecutor() as executor:
+        print("AsyncParser, processes")
+        asyncio.run(run(AsyncParser(executor).parse))
+
+
+if __name__ == "__main__":
+    main()
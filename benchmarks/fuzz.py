@@ -0,0 +1,68 @@
+"""
+Time per input byte of lexing and parsing malformed input, as the input grows.
+
+Inputs are mutated sample queries, plus inputs that end in an unterminated
+quote. The cost per byte must stay flat: the run fails if it grows by more than
+MAX_GROWTH from the smallest to the largest input.
+"""
+from husky_whale import token
+from husky_whale.corpus import mutated_queries
+from husky_whale.lexer import Lexer, RegexLexer
+from husky_whale.parser import ParseError, Parser
+
+from benchmarks.common import best_time, large_query_text
+
+SIZES = (10_000, 100_000, 1_000_000)
+MAX_GROWTH = 3.0
+
+
+def lex_all(lexer) -> None:
+    next_token = lexer.next_token
+    while next_token().type != token.EOF:
+        pass
+
+
+def parse_all(queries) -> None:
+    for query in queries:
+        try:
+            Parser(RegexLexer(query)).parse_statement()
+        except ParseError:
+            pass
+
+
+def main() -> None:
+    mutated = list(mutated_queries(2000))
+    inputs = {
+        "mutated": lambda size: large_query_text(size, mutated),
+        "unterminated '": lambda size: "'" + "a" * size,
+        'unterminated "': lambda size: 'x."' + "a." * (size // 2),
+    }
+    failed = False
+    print(f"{'input':<20} {'lexer':<12}" + "".join(f"{size:>12,}" for size in SIZES))
+    for label, make_input in inputs.items():
+        for lexer_class in (Lexer, RegexLexer):
+            per_byte = []
+            for size in SIZES:
+                text = make_input(size)
+                seconds = best_time(lambda: lex_all(lexer_class(text)), repeat=3)
+                per_byte.append(seconds / len(text))
+            print(
+                f"{label:<20} {lexer_class.__name__:<12}"
+                + "".join(f"{t * 1e9:9.0f} ns" for t in per_byte)
+            )
+            if per_byte[-1] > per_byte[0] * MAX_GROWTH:
+                print(f"  time per byte grew {per_byte[-1] / per_byte[0]:.1f}x")
+                failed = True
+
+    size = sum(len(query) for query in mutated)
+    seconds = best_time(lambda: parse_all(mutated), repeat=3)
+    print(
+        f"Parser over {len(mutated):,} mutated queries: "
+        f"{seconds / size * 1e9:.0f} ns/byte"
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Parsing long IN lists of integers and of strings, and the memory their trees
+keep. A list that ends with a column, so that it can't be kept as one
+ColumnLiteralList, is timed too for comparison.
+"""
+import tracemalloc
+
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+SIZES = (10_000, 100_000, 200_000)
+
+
+def query(values: list) -> str:
+    return f"SELECT a FROM t WHERE id IN ({', '.join(values)})"
+
+
+def parse(text: str) -> object:
+    return Parser(RegexLexer(text)).parse_statement()
+
+
+def retained_bytes(text: str) -> int:
+    tracemalloc.start()
+    statement = parse(text)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del statement
+    return size
+
+
+def main() -> None:
+    for size in SIZES:
+        integers = [str(i) for i in range(size)]
+        for label, text in (
+            ("integers", query(integers)),
+            ("strings", query([f"'key_{i}'" for i in range(size)])),
+            ("integers and a column", query(integers + ["b"])),
+        ):
+            seconds = best_time(lambda: parse(text), repeat=3)
+            report(f"{label} x{size:,}", seconds, size, "values")
+            print(f"{'':<40} {retained_bytes(text) / 1e6:10.1f} MB kept")
+
+
+if __name__ == "__main__":
+    main()
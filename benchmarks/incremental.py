@@ -0,0 +1,41 @@
+"""Cost of a one-character edit via IncrementalParse versus a full re-parse."""
+from husky_whale.incremental import IncrementalParse
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time
+
+LINES = 5000
+
+
+def large_query() -> str:
+    results = ",\n".join(
+        f"    u.column_{i} || ' ' || lower(u.name_{i}) AS alias_{i}" for i in range(LINES)
+    )
+    return (
+        f"SELECT\n{results}\nFROM users u JOIN schools s ON u.school_id = s.id\n"
+        "WHERE u.is_active IS TRUE\nORDER BY u.id DESC\nLIMIT 10\n"
+    )
+
+
+def main() -> None:
+    query = large_query()
+    print(f"Input: {query.count(chr(10)):,} lines, {len(query):,} characters")
+    previous = IncrementalParse.parse(query)
+
+    full = best_time(lambda: Parser(RegexLexer(query)).parse_select())
+    print(f"{'full parse':<40} {full * 1000:10.2f} ms")
+
+    for label, needle, replacement in (
+        ("edit in WHERE", "TRUE", "FALSE"),
+        ("edit in LIMIT", "LIMIT 10", "LIMIT 20"),
+        ("edit in SELECT list", "alias_2500", "alias_x"),
+    ):
+        start = query.index(needle)
+        end = start + len(needle)
+        seconds = best_time(lambda: previous.edit(start, end, replacement))
+        print(f"{label:<40} {seconds * 1000:10.2f} ms {full / seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
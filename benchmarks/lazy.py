@@ -0,0 +1,74 @@
+"""
+Table-only analysis of the sample queries, with and without lazy parsing.
+
+Each query is parsed and only its FROM clause looked at, as when finding the
+tables a query reads. Parsing lazily and then accessing every clause is timed
+too, for the cost when the laziness doesn't pay off.
+
+Then nests of FROM subqueries of several depths are parsed and every level
+materialised, to show that the time per level stays flat.
+"""
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.serialize import to_list
+from husky_whale.utils import walk
+
+from benchmarks.common import best_time, report
+
+# The sample queries, plus one with the wide SELECT list and long WHERE clause
+# of generated queries
+WIDE = (
+    "SELECT "
+    + ", ".join(f"t.column_{i} * 2 + 1 AS alias_{i}" for i in range(200))
+    + " FROM s.t JOIN (SELECT id FROM u WHERE x > 0) v ON t.id = v.id WHERE "
+    + " AND ".join(f"(x_{i} = {i} OR y_{i} IS NOT NULL)" for i in range(200))
+    + " ORDER BY 1"
+)
+CORPUS = PARSER_QUERIES * 1000 + [WIDE] * 100
+DEPTHS = (1000, 2000, 4000, 8000)
+
+
+def nested_subqueries(depth: int) -> str:
+    return (
+        "SELECT a FROM "
+        + "(SELECT a FROM " * depth
+        + "t WHERE x = 1"
+        + ") s WHERE (y)" * depth
+    )
+
+
+def tables(lazy: bool) -> None:
+    for query in CORPUS:
+        Parser(RegexLexer(query), lazy=lazy).parse_select().from_
+
+
+def everything() -> None:
+    for query in CORPUS:
+        to_list(Parser(RegexLexer(query), lazy=True).parse_select())
+
+
+def every_node(query: str, lazy: bool) -> None:
+    for _ in walk(Parser(RegexLexer(query), lazy=lazy).parse_select()):
+        pass
+
+
+def main() -> None:
+    size = sum(len(query) for query in CORPUS)
+    for label, fn in (
+        ("FROM only, eager", lambda: tables(False)),
+        ("FROM only, lazy", lambda: tables(True)),
+        ("every clause, lazy", everything),
+    ):
+        seconds = best_time(fn, repeat=3)
+        report(label, seconds, size, "bytes")
+
+    for depth in DEPTHS:
+        query = nested_subqueries(depth)
+        for label, lazy in (("eager", False), ("lazy", True)):
+            seconds = best_time(lambda: every_node(query, lazy), repeat=3)
+            report(f"{depth:,} nested subqueries, {label}", seconds, depth, "levels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Tokens/sec of the character-by-character Lexer versus RegexLexer."""
+from husky_whale import token
+from husky_whale.lexer import Lexer, RegexLexer
+
+from benchmarks.common import best_time, large_query_text, report
+
+
+def count_tokens(lexer) -> int:
+    count = 0
+    next_token = lexer.next_token
+    while next_token().type != token.EOF:
+        count += 1
+    return count
+
+
+def main() -> None:
+    text = large_query_text(2_000_000)
+    print(f"Input: {len(text):,} characters")
+    for lexer_class in (Lexer, RegexLexer):
+        count = count_tokens(lexer_class(text))
+        seconds = best_time(lambda: count_tokens(lexer_class(text)), repeat=3)
+        report(lexer_class.__name__, seconds, count, "tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+A query log of a few thousand distinct texts seen many times, parsed every time
+and through the memo behind husky_whale.parse().
+"""
+import random
+
+import husky_whale
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+DISTINCT = [f"{query} -- {i}" for i in range(500) for query in PARSER_QUERIES]
+# Skewed towards some texts, as logs are
+LOG = random.Random(0).choices(
+    DISTINCT, weights=[1 / (i + 1) for i in range(len(DISTINCT))], k=50_000
+)
+
+
+def main() -> None:
+    seconds = best_time(
+        lambda: [Parser(RegexLexer(text)).parse_statement() for text in LOG], 1
+    )
+    report("parse every time", seconds, len(LOG), "texts")
+
+    husky_whale.memo.clear()
+    seconds = best_time(lambda: [husky_whale.parse(text) for text in LOG], 1)
+    report("memo, cold", seconds, len(LOG), "texts")
+    print(f"  {husky_whale.memo.stats()}")
+    seconds = best_time(lambda: [husky_whale.parse(text) for text in LOG], 3)
+    report("memo, warm", seconds, len(LOG), "texts")
+
+
+if __name__ == "__main__":
+    main()
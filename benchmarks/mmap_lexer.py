@@ -0,0 +1,66 @@
+"""Throughput and peak RSS of lexing a large file as str versus via mmap.
+
+Usage: python -m benchmarks.mmap_lexer [size_in_mb]
+
+Each mode runs in a fresh subprocess so that peak RSS is measured separately.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from husky_whale import token
+from husky_whale.lexer import BytesLexer, RegexLexer, mapped_file
+
+from benchmarks.common import large_query_text
+
+
+def count_tokens(lexer) -> int:
+    count = 0
+    next_token = lexer.next_token
+    while next_token().type != token.EOF:
+        count += 1
+    return count
+
+
+def run_mode(mode: str, path: str) -> None:
+    start = time.perf_counter()
+    if mode == "str":
+        with open(path, encoding="utf-8") as f:
+            count = count_tokens(RegexLexer(f.read()))
+    else:
+        with mapped_file(path) as buffer:
+            count = count_tokens(BytesLexer(buffer))
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{mode:<6} {seconds:8.2f} s {count / seconds:12,.0f} tokens/s"
+        f" peak RSS {peak_mb:8.1f} MB"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3])
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    chunk = large_query_text(1024 * 1024)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.sql")
+        with open(path, "w", encoding="utf-8") as f:
+            for _ in range(size_mb):
+                f.write(chunk)
+        print(f"Input: {os.path.getsize(path) / 1024 / 1024:,.0f} MB")
+        for mode in ("str", "mmap"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.mmap_lexer", "--mode", mode, path],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
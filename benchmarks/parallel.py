@@ -0,0 +1,52 @@
+"""Serial parse_script versus parse_script_parallel on one large script.
+
+Usage: python -m benchmarks.parallel [size_in_mb]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parallel import parse_script_parallel, statement_boundaries
+from husky_whale.parser import Parser
+
+from benchmarks.common import report
+
+# Semicolons go on their own line, since some queries end in a comment
+CHUNK = "".join(query.strip() + "\n;\n" for query in PARSER_QUERIES) * 1000
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def consume(statements) -> None:
+    for _ in statements:
+        pass
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    text = CHUNK * max(1, size_mb * 1024 * 1024 // len(CHUNK))
+    statements = len(statement_boundaries(text))
+    workers = os.cpu_count() or 1
+    print(f"Input: {len(text) / 1024 / 1024:,.0f} MB, {statements:,} statements")
+
+    seconds = timed(lambda: statement_boundaries(text))
+    report("statement boundary scan", seconds, len(text) // 1024 // 1024, "MB")
+    serial = timed(lambda: consume(Parser(RegexLexer(text)).parse_script()))
+    report("parse_script", serial, statements, "statements")
+    with ProcessPoolExecutor(workers) as executor:
+        parallel = timed(lambda: consume(parse_script_parallel(text, executor)))
+    report(
+        f"parse_script_parallel ({workers} workers)", parallel, statements, "statements"
+    )
+    print(f"Speedup: {serial / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
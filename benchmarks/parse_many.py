@@ -0,0 +1,69 @@
+"""parse_many throughput from 1 to N worker processes, against a serial loop.
+
+Usage: python -m benchmarks.parse_many [max_workers]
+
+Also compares the size and speed of serialize's encoding with pickle, for the
+results that workers send back.
+"""
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from husky_whale import serialize
+from husky_whale.batch import parse_many
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+SOURCES = PARSER_QUERIES * 3000
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def serial() -> None:
+    for source in SOURCES:
+        Parser(RegexLexer(source)).parse_statement()
+
+
+def compare_encodings() -> None:
+    statements = [Parser(RegexLexer(source)).parse_statement() for source in SOURCES]
+    for label, dumps, loads in (
+        ("pickle", pickle.dumps, pickle.loads),
+        ("serialize", serialize.dumps, serialize.loads),
+    ):
+        encoded = [dumps(statement) for statement in statements]
+        size = sum(len(data) for data in encoded)
+        encode = best_time(lambda: [dumps(statement) for statement in statements], 3)
+        decode = best_time(lambda: [loads(data) for data in encoded], 3)
+        print(
+            f"{label:<10} {size / len(statements):6.0f} bytes/statement"
+            f" encode {encode / len(statements) * 1e6:5.1f} us"
+            f" decode {decode / len(statements) * 1e6:5.1f} us"
+        )
+
+
+def main() -> None:
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    print(f"Input: {len(SOURCES):,} texts")
+    compare_encodings()
+
+    seconds = timed(serial)
+    report("serial loop", seconds, len(SOURCES), "texts")
+    workers = 1
+    while workers <= max_workers:
+        with ProcessPoolExecutor(workers) as executor:
+            seconds = timed(lambda: list(parse_many(SOURCES, executor)))
+        report(f"parse_many ({workers} workers)", seconds, len(SOURCES), "texts")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Statements/sec and tokens/sec of Parser over the sample queries."""
+import tracemalloc
+
+from husky_whale import token
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import Lexer, RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+QUERIES = PARSER_QUERIES * 500
+
+
+def parse_all(lexer_class) -> None:
+    for query in QUERIES:
+        Parser(lexer_class(query)).parse_statement()
+
+
+def count_tokens() -> int:
+    count = 0
+    for query in QUERIES:
+        lexer = RegexLexer(query)
+        while lexer.next_token().type != token.EOF:
+            count += 1
+    return count
+
+
+def retained_token_bytes() -> float:
+    text = "\n".join(QUERIES)
+    tracemalloc.start()
+    lexer = RegexLexer(text)
+    tokens = []
+    while True:
+        t = lexer.next_token()
+        tokens.append(t)
+        if t.type == token.EOF:
+            break
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(tokens)
+
+
+def main() -> None:
+    tokens = count_tokens()
+    print(f"Input: {len(QUERIES):,} statements, {tokens:,} tokens")
+    for lexer_class in (Lexer, RegexLexer):
+        seconds = best_time(lambda: parse_all(lexer_class))
+        report(f"Parser({lexer_class.__name__})", seconds, len(QUERIES), "statements")
+        report("", seconds, tokens, "tokens")
+    print(f"Retained per token: {retained_token_bytes():.1f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Cost per lookup of turning 10k finding offsets into line/column positions,
+by rescanning for newlines versus with a LineIndex, for inputs of growing size.
+"""
+import random
+
+from husky_whale.position import LineIndex
+
+from benchmarks.common import best_time, large_query_text
+
+FINDINGS = 10_000
+
+
+def naive_positions(text: str, offsets) -> None:
+    for offset in offsets:
+        line = text.count("\n", 0, offset) + 1
+        column = offset - text.rfind("\n", 0, offset)
+        (line, column)
+
+
+def indexed_positions(lines: LineIndex, offsets) -> None:
+    position_of = lines.position_of
+    for offset in offsets:
+        position_of(offset)
+
+
+def built_index(text: str) -> LineIndex:
+    lines = LineIndex(text)
+    lines.position_of(len(text))
+    return lines
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'input':>12} {'rescan':>14} {'LineIndex':>14} {'index build':>14}")
+    for size in (100_000, 1_000_000, 10_000_000):
+        text = large_query_text(size)
+        offsets = [rng.randrange(len(text)) for _ in range(FINDINGS)]
+        naive = best_time(lambda: naive_positions(text, offsets), repeat=3)
+        # Built once per file, whatever the number of lookups
+        build = best_time(lambda: built_index(text), repeat=3)
+        lines = built_index(text)
+        indexed = best_time(lambda: indexed_positions(lines, offsets), repeat=3)
+        print(
+            f"{len(text):>12,} {naive / FINDINGS * 1e6:11.2f} us"
+            f" {indexed / FINDINGS * 1e6:11.2f} us {build * 1000:11.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
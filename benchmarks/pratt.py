@@ -0,0 +1,41 @@
+"""Tokens/sec of the Pratt expression loop on wide SELECT lists and boolean chains."""
+from husky_whale import token
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.token_arrays import TokenArrayLexer, tokenize
+
+from benchmarks.common import best_time, report
+
+TERMS = 2000
+
+
+def wide_select() -> str:
+    return "SELECT " + ", ".join(
+        f"t.column_{i} * 2 + 1 AS alias_{i}" for i in range(TERMS)
+    ) + " FROM t"
+
+
+def boolean_chain() -> str:
+    return "SELECT a FROM t WHERE " + " AND ".join(
+        f"(x_{i} = {i} OR y_{i} IS NOT NULL)" for i in range(TERMS)
+    )
+
+
+def main() -> None:
+    for label, query in (
+        ("wide SELECT list", wide_select()),
+        ("long boolean chain", boolean_chain()),
+    ):
+        arrays = tokenize(query)
+        # Lexing is done up front, so that only parsing is timed
+        tokens = sum(1 for t in arrays.types if t != token.WHITESPACE)
+        seconds = best_time(
+            lambda: Parser(TokenArrayLexer(arrays)).parse_statement(), repeat=7
+        )
+        report(label, seconds, tokens, "tokens")
+        seconds = best_time(lambda: Parser(RegexLexer(query)).parse_statement())
+        report(f"{label} (with RegexLexer)", seconds, tokens, "tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Parsing clean and error-heavy queries, with and without recovering from errors.
+
+The error-heavy queries are mutated sample queries, most of which have errors.
+Throughput is reported per byte so that the two can be compared.
+"""
+from husky_whale.corpus import PARSER_QUERIES, mutated_queries
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import best_time, report
+
+CLEAN = PARSER_QUERIES * 1000
+ERRORS = list(mutated_queries(10_000))
+
+
+def parse(queries, recover: bool) -> None:
+    for query in queries:
+        for _ in Parser(RegexLexer(query), recover=recover).parse_script():
+            pass
+
+
+def main() -> None:
+    errors = 0
+    for query in ERRORS:
+        parser = Parser(RegexLexer(query), recover=True)
+        for _ in parser.parse_script():
+            pass
+        errors += bool(parser.errors)
+    print(f"{errors:,} of {len(ERRORS):,} error-heavy queries have errors")
+
+    for label, queries, recover in (
+        ("clean", CLEAN, False),
+        ("clean, recovering", CLEAN, True),
+        ("error-heavy, recovering", ERRORS, True),
+    ):
+        size = sum(len(query) for query in queries)
+        seconds = best_time(lambda: parse(queries, recover), repeat=5)
+        report(label, seconds, size, "bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Throughput and peak RSS of round-tripping a large script with parse_script.
+
+Usage: python -m benchmarks.script [size_in_mb ...]
+
+The script is read through an mmap and each statement is written back out as
+soon as it is parsed. Each size runs in a fresh subprocess so that peak RSS is
+measured separately, and should stay flat as the script grows.
+"""
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import BytesLexer, mapped_file
+from husky_whale.parser import Parser
+
+# Semicolons go on their own line, since some queries end in a comment
+CHUNK = "".join(query.strip() + "\n;\n" for query in PARSER_QUERIES) * 1000
+
+
+def round_trip(path: str, out_path: str) -> None:
+    start = time.perf_counter()
+    count = 0
+    with mapped_file(path) as buffer, open(out_path, "w", encoding="utf-8") as out:
+        for statement in Parser(BytesLexer(buffer)).parse_script():
+            out.write(statement.original_string())
+            count += 1
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(
+        f"{size_mb:6,.0f} MB {seconds:8.2f} s {count / seconds:10,.0f} statements/s"
+        f" peak RSS {peak_mb:8.1f} MB"
+    )
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        round_trip(sys.argv[2], sys.argv[3])
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [4, 16, 64]
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in sizes:
+            path = os.path.join(directory, "script.sql")
+            out_path = os.path.join(directory, "out.sql")
+            with open(path, "w", encoding="utf-8") as f:
+                while f.tell() < size_mb * 1024 * 1024:
+                    f.write(CHUNK)
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.script", "--run", path, out_path],
+                check=True,
+            )
+            if file_hash(out_path) != file_hash(path):
+                raise SystemExit("round-tripped script differs from the input")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Finding the tables that the sample queries read, by scanning them with
+scan_tables() and by parsing them fully and walking the trees.
+"""
+from husky_whale import ast
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.tables import scan_tables
+from husky_whale.utils import walk
+
+from benchmarks.common import best_time, report
+
+CORPUS = PARSER_QUERIES * 2000
+
+
+def parsed() -> None:
+    for query in CORPUS:
+        statement = Parser(RegexLexer(query)).parse_statement()
+        [node for node in walk(statement) if isinstance(node, ast.TableIdentifier)]
+
+
+def scanned() -> None:
+    for query in CORPUS:
+        scan_tables(query)
+
+
+def main() -> None:
+    size = sum(len(query) for query in CORPUS)
+    for label, fn in (("parse and walk", parsed), ("scan_tables", scanned)):
+        seconds = best_time(fn, repeat=3)
+        report(label, seconds, size, "bytes")
+
+
+if __name__ == "__main__":
+    main()
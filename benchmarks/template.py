@@ -0,0 +1,57 @@
+"""Rendering parameterised variants of a template versus parsing each variant."""
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.template import Template
+
+from benchmarks.common import best_time, report
+
+TEMPLATE = (
+    "SELECT u.id, u.first_name || ' ' || u.last_name AS user_name, {{ column }}\n"
+    "FROM users u JOIN schools s ON u.school_id = s.id\n"
+    "WHERE u.created_at < {{input_date}} AND u.country = {{country}}\n"
+    "ORDER BY u.id DESC LIMIT 10"
+)
+VARIANTS = 100_000
+# Parsing every variant is slow, so fewer are timed
+PARSED_VARIANTS = 5_000
+
+
+def all_values(count: int):
+    return [
+        {
+            "column": f"u.column_{i % 50}",
+            "input_date": f"'2020-01-{i % 28 + 1:02}'",
+            "country": f"'country_{i}'",
+        }
+        for i in range(count)
+    ]
+
+
+def substitute(values) -> str:
+    text = TEMPLATE
+    for name, value in values.items():
+        text = text.replace("{{" + name + "}}", value).replace(
+            "{{ " + name + " }}", value
+        )
+    return text
+
+
+def main() -> None:
+    values = all_values(VARIANTS)
+    template = Template.parse(TEMPLATE)
+
+    seconds = best_time(lambda: [template.render(v) for v in values], repeat=3)
+    report("Template.render", seconds, VARIANTS, "variants")
+    seconds = best_time(lambda: [template.bind(v) for v in values], repeat=3)
+    report("Template.bind", seconds, VARIANTS, "variants")
+
+    parsed = values[:PARSED_VARIANTS]
+    seconds = best_time(
+        lambda: [Parser(RegexLexer(substitute(v))).parse_statement() for v in parsed],
+        repeat=3,
+    )
+    report("substitute and parse", seconds, PARSED_VARIANTS, "variants")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""parse_many on a pool of threads against a pool of processes.
+
+Usage: python -m benchmarks.threads [max_workers]
+
+Threads only parse in parallel on a free-threaded build of Python (3.13t and
+later), so run this under both kinds of build to compare. Results from threads
+are used as they are, while those from processes are encoded, sent back and
+decoded, so both are timed through to the statements.
+"""
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from husky_whale.batch import parse_many
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+from benchmarks.common import report
+
+SOURCES = PARSER_QUERIES * 3000
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def serial() -> None:
+    for source in SOURCES:
+        Parser(RegexLexer(source)).parse_statement()
+
+
+def statements(executor) -> None:
+    for result in parse_many(SOURCES, executor):
+        result.statement
+
+
+def main() -> None:
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"Python {sys.version.split()[0]},"
+        f" {'free-threaded' if free_threaded else 'GIL'} build,"
+        f" GIL {'enabled' if gil else 'disabled'};"
+        f" {len(SOURCES):,} texts"
+    )
+
+    report("serial loop", timed(serial), len(SOURCES), "texts")
+    workers = 1
+    while workers <= max_workers:
+        for label, pool in (
+            ("threads", ThreadPoolExecutor),
+            ("processes", ProcessPoolExecutor),
+        ):
+            with pool(workers) as executor:
+                seconds = timed(lambda: statements(executor))
+            report(f"{label} ({workers} workers)", seconds, len(SOURCES), "texts")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Per-token memory and hot-path cost of Token versus string-typed tokens.
+
+StringToken reproduces the previous token model (a frozen dataclass with a
+string type and its own copy of the literal) for comparison.
+"""
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+
+from husky_whale import token
+from husky_whale.lexer import RegexLexer
+from husky_whale.precedence import token_column_precedences
+from husky_whale.token import Token
+
+from benchmarks.common import large_query_text
+
+
+@dataclass(frozen=True)
+class StringToken:
+    type: str
+    literal: str
+
+
+def lex(text: str) -> list:
+    lexer = RegexLexer(text)
+    tokens = []
+    while True:
+        t = lexer.next_token()
+        tokens.append(t)
+        if t.type == token.EOF:
+            return tokens
+
+
+def as_string_tokens(tokens: list) -> list:
+    return [StringToken(token.type_names[t.type], t.literal) for t in tokens]
+
+
+def retained_bytes(fn) -> int:
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def per_call_ns(stmt: str, namespace: dict, number: int = 1_000_000) -> float:
+    timer = timeit.Timer(stmt, globals=namespace)
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+
+def main() -> None:
+    text = large_query_text(1_000_000)
+    tokens = lex(text)
+    count = len(tokens)
+    print(f"Input: {len(text):,} characters, {count:,} tokens")
+
+    # Measure each representation's tokens on their own, with the text shared
+    token_bytes = retained_bytes(lambda: lex(text))
+    string_token_bytes = retained_bytes(lambda: as_string_tokens(tokens))
+    print(f"{'Retained per Token':<40} {token_bytes / count:8.1f} bytes")
+    print(f"{'Retained per StringToken':<40} {string_token_bytes / count:8.1f} bytes")
+
+    string_precedences = {
+        token.type_names[type_]: precedence
+        for type_, precedence in token_column_precedences.items()
+    }
+    # Tokens used to hold TokenType members rather than plain int kinds
+    member_precedences = {
+        token.kinds[type_]: precedence
+        for type_, precedence in token_column_precedences.items()
+    }
+    namespace = dict(
+        Token=Token,
+        StringToken=StringToken,
+        text=text,
+        t=Token(token.SELECT, "SELECT"),
+        s=StringToken("SELECT", "SELECT"),
+        member=token.TokenType.SELECT,
+        SELECT=token.SELECT,
+        FROM=token.FROM,
+        MEMBER_FROM=token.TokenType.FROM,
+        token_column_precedences=token_column_precedences,
+        string_precedences=string_precedences,
+        member_precedences=member_precedences,
+    )
+    for label, stmt in (
+        ("construct Token", "Token(SELECT, text, 10, 16)"),
+        ("construct StringToken", "StringToken('SELECT', text[10:16])"),
+        ("Token type compare", "t.type == FROM"),
+        ("TokenType member compare", "member == MEMBER_FROM"),
+        ("StringToken type compare", "s.type == 'FROM'"),
+        ("Token precedence lookup", "token_column_precedences.get(t.type)"),
+        ("TokenType member precedence lookup", "member_precedences.get(member)"),
+        ("StringToken precedence lookup", "string_precedences.get(s.type)"),
+    ):
+        print(f"{label:<40} {per_call_ns(stmt, namespace):8.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Time and memory of tokenize() versus collecting Token objects."""
+import tracemalloc
+from typing import List
+
+from husky_whale import token
+from husky_whale.lexer import RegexLexer
+from husky_whale.token import Token
+from husky_whale.token_arrays import tokenize
+
+from benchmarks.common import best_time, large_query_text, report
+
+
+def collect_tokens(text: str) -> List[Token]:
+    lexer = RegexLexer(text)
+    tokens: List[Token] = []
+    while True:
+        t = lexer.next_token()
+        if t.type == token.EOF:
+            return tokens
+        tokens.append(t)
+
+
+def allocated_bytes(fn) -> int:
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    text = large_query_text(2_000_000)
+    count = len(tokenize(text))
+    print(f"Input: {len(text):,} characters, {count:,} tokens")
+    for label, fn in (
+        ("RegexLexer -> List[Token]", collect_tokens),
+        ("tokenize() -> TokenArrays", tokenize),
+    ):
+        seconds = best_time(lambda: fn(text), repeat=3)
+        report(label, seconds, count, "tokens")
+        size = allocated_bytes(lambda: fn(text))
+        print(f"{'':<40} {size / count:10.1f} bytes/token retained")
+
+
+if __name__ == "__main__":
+    main()
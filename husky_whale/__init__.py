@@ -0,0 +1,38 @@
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# Modules that can be compiled with mypyc, in the order they import each other.
+# Python imports a compiled module in place of its source when both are there.
+_compiled_modules = ("token", "position", "precedence", "lexer", "parser")
+
+if os.environ.get("HUSKY_WHALE_PURE_PYTHON"):
+    # Import the sources even when compiled modules sit beside them, e.g. to
+    # compare the two
+    for _name in _compiled_modules:
+        _path = os.path.join(os.path.dirname(__file__), _name + ".py")
+        _loader = importlib.machinery.SourceFileLoader(f"{__name__}.{_name}", _path)
+        _spec = importlib.machinery.ModuleSpec(_loader.name, _loader, origin=_path)
+        _spec.has_location = True
+        _module = importlib.util.module_from_spec(_spec)
+        sys.modules[_loader.name] = _module
+        _loader.exec_module(_module)
+
+from husky_whale import ast  # noqa: E402
+from husky_whale import parser  # noqa: E402
+from husky_whale.memo import ParseMemo  # noqa: E402
+
+# Whether the lexer and parser in use are compiled
+compiled = not parser.__file__.endswith(".py")
+
+# Shared by every call to parse()
+memo = ParseMemo()
+
+
+def parse(text: str) -> ast.Statement:
+    """
+    The statement in text, parsed at most once while text stays among the most
+    recently parsed texts. See memo.stats() for how often that was so.
+    """
+    return memo.parse(text)
@@ -0,0 +1,207 @@
+"""
+Parsing from asyncio code without blocking the event loop.
+
+Parses run on an executor, so a large query doesn't hold up every other task
+while it's parsed. Only so many run at once: callers beyond that wait for a
+slot, which pushes back on whatever is feeding them.
+"""
+import asyncio
+import codecs
+import os
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from husky_whale import ast
+from husky_whale import serialize
+from husky_whale.lexer import RegexLexer
+from husky_whale.parallel import statement_boundaries
+from husky_whale.parser import ParseBudget, ParseError, Parser
+
+T = TypeVar("T")
+
+# Swapped in for the budget of a parse whose caller has been cancelled, so that
+# it stops at its next check
+_cancelled_budget = ParseBudget(max_tokens=0)
+
+
+class _Job:
+    """A parse on a worker, which the event loop can stop."""
+
+    def __init__(self, budget: Optional[ParseBudget]):
+        # A parser without a budget never checks one, so couldn't be stopped
+        self.budget = ParseBudget() if budget is None else budget
+        self.parser: Optional[Parser] = None
+        self.cancelled = False
+
+    def parser_for(self, text: str) -> Parser:
+        parser = Parser(RegexLexer(text), budget=self.budget)
+        self.parser = parser
+        # Set after the parser, and cancel() does the reverse, so that one of
+        # them always sees the other
+        if self.cancelled:
+            parser.budget = _cancelled_budget
+        return parser
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        parser = self.parser
+        if parser is not None:
+            parser.budget = _cancelled_budget
+
+
+class AsyncParser:
+    """
+    Parses on executor, or the event loop's default executor if none is given,
+    with no more than max_in_flight parses submitted to it at once. Each parse
+    stops with BudgetExceeded if it goes over budget.
+
+    A parse whose caller is cancelled stops at its next budget check, within
+    _window_compact_size tokens, and keeps its slot until then, so the cap
+    holds for the work actually running. A parse already running in another
+    process can't be stopped, and keeps its slot until it finishes.
+
+    Statements parsed on an executor other than a ThreadPoolExecutor are sent
+    back in serialize's encoding, which unlike pickle copes with trees of any
+    depth, and decoded on the event loop.
+
+    Slots belong to the event loop that the first parse runs on.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_in_flight: Optional[int] = None,
+        budget: Optional[ParseBudget] = None,
+    ):
+        self.executor = executor
+        self.encode = executor is not None and not isinstance(
+            executor, ThreadPoolExecutor
+        )
+        if max_in_flight is None:
+            max_in_flight = (os.cpu_count() or 1) * 2
+        self.max_in_flight = max_in_flight
+        self.budget = budget
+        # Made on first use, as a Semaphore made outside a running loop may be
+        # bound to the wrong one
+        self.slots: Optional[asyncio.Semaphore] = None
+
+    async def parse(self, text: str) -> ast.Statement:
+        """The statement in text, as Parser.parse_statement would parse it."""
+        result = await self.run(_parse_statement, text, self.encode)
+        if self.encode:
+            return cast(ast.Statement, serialize.loads(cast(bytes, result)))
+        return cast(ast.Statement, result)
+
+    async def parse_stream(
+        self, stream: AsyncIterable[bytes], encoding: str = "utf-8"
+    ) -> AsyncIterator[ast.ScriptStatement]:
+        """
+        Parse a script read in chunks from stream, yielding the nodes that
+        Parser.parse_script would, in order.
+
+        Each statement is parsed once its semicolon has been read, while more
+        of the stream is read. Reading waits while max_in_flight statements
+        are waiting to be yielded. Offsets of ParseErrors are in the whole
+        script, but the errors have no line index to give positions with.
+        """
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending: Deque[asyncio.Future] = deque()
+        # Text read since the last statement handed to a parse, which started
+        # at offset start of the script
+        parts: List[str] = []
+        start = 0
+        try:
+            async for chunk in stream:
+                text = decoder.decode(chunk)
+                parts.append(text)
+                # Any new statement ends at a semicolon in the new text
+                if ";" in text:
+                    buffer = "".join(parts)
+                    previous = 0
+                    for end in statement_boundaries(buffer):
+                        script = buffer[previous:end]
+                        parse = self.parse_script_part(script, start + previous)
+                        pending.append(asyncio.ensure_future(parse))
+                        previous = end
+                    parts = [buffer[previous:]]
+                    start += previous
+
+                while pending and (
+                    pending[0].done() or len(pending) >= self.max_in_flight
+                ):
+                    for statement in await pending.popleft():
+                        yield statement
+
+            rest = "".join(parts) + decoder.decode(b"", final=True)
+            if rest:
+                parse = self.parse_script_part(rest, start)
+                pending.append(asyncio.ensure_future(parse))
+            while pending:
+                for statement in await pending.popleft():
+                    yield statement
+        finally:
+            # When the caller stops early or a parse fails
+            for future in pending:
+                future.cancel()
+
+    async def parse_script_part(
+        self, text: str, start: int
+    ) -> List[ast.ScriptStatement]:
+        """The nodes of a part of a script, which starts at offset start."""
+        result = await self.run(_parse_script, text, start, self.encode)
+        if self.encode:
+            return [
+                cast(ast.ScriptStatement, serialize.loads(data))
+                for data in cast(List[bytes], result)
+            ]
+        return cast(List[ast.ScriptStatement], result)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Call fn with a new _Job and args on the executor, once in a slot."""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_in_flight)
+        async with self.slots:
+            job = _Job(self.budget)
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, fn, job, *args)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                job.cancel()
+                await asyncio.wait([future])
+                if not future.cancelled():
+                    # Most likely the BudgetExceeded that stopped it, which
+                    # would otherwise be logged as never retrieved
+                    future.exception()
+                raise
+
+
+def _parse_statement(
+    job: _Job, text: str, encode: bool
+) -> Union[ast.Statement, bytes]:
+    statement = job.parser_for(text).parse_statement()
+    return serialize.dumps(statement) if encode else statement
+
+
+def _parse_script(
+    job: _Job, text: str, start: int, encode: bool
+) -> Union[List[ast.ScriptStatement], List[bytes]]:
+    try:
+        statements = list(job.parser_for(text).parse_script())
+    except ParseError as error:
+        offset = None if error.offset is None else start + error.offset
+        raise ParseError(error.message, offset) from None
+    if encode:
+        return [serialize.dumps(statement) for statement in statements]
+    return statements
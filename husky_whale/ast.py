@@ -1,9 +1,15 @@
 # https://www.postgresql.org/docs/11/sql-syntax-lexical.html
 # https://docs.aws.amazon.com/redshift/latest/dg/r_names.html
 import dataclasses
+import re
 from dataclasses import dataclass
 
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+# What a node renders as: strings, and the nodes to render in their place
+Parts = List[Union[str, "Node"]]
+# Any kind of node, for functions that hand back the node they're given
+N = TypeVar("N", bound="Node")
 
 
 @dataclass(frozen=True)
@@ -12,10 +18,16 @@ class Node:
     trailing: List[str]
 
     def string(self) -> str:
-        return ""
+        return render(self, original=False)
 
     def original_string(self) -> str:
-        return "".join(self.preceding) + "".join(self.trailing)
+        return render(self, original=True)
+
+    def string_parts(self) -> Parts:
+        return []
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, *self.trailing]
 
     def child_nodes(self) -> Dict[str, "Node"]:
         return {
@@ -30,17 +42,65 @@ class Node:
     def replace(self, changes: Dict[str, Any]) -> "Node":
         return dataclasses.replace(self, **changes)
 
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes that aren't set, which includes fields
+        # left by lazy() to be parsed on first access
+        state = self.__dict__
+        pending: Dict[str, Callable[[], Any]] = state.get("_pending") or {}
+        parse = pending.get(name)
+        if parse is None:
+            if name in state:
+                # Set by another thread since the lookup that got here
+                return state[name]
+            raise AttributeError(name)
+        # Two threads can both get here and parse the field, but only the
+        # first value stored is kept and returned by either, so every access
+        # sees the same node
+        value = state.setdefault(name, parse())
+        # Removed only once set, so that other threads always find one or the
+        # other
+        pending.pop(name, None)
+        return value
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Fields still to be parsed are parsed first, as the functions that
+        # parse them can't be pickled
+        state = self.__dict__
+        if "_pending" in state:
+            for name in list(state["_pending"]):
+                getattr(self, name)
+            state = dict(state)
+            del state["_pending"]
+        return state
+
 
 @dataclass(frozen=True)
 class Keyword(Node):
     keyword: str
     literal: str
 
-    def string(self) -> str:
-        return self.literal.upper()
+    def string_parts(self) -> Parts:
+        return [self.literal.upper()]
 
-    def original_string(self) -> str:
-        return "".join(self.preceding) + self.literal + "".join(self.trailing)
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.literal, *self.trailing]
+
+
+@dataclass(frozen=True)
+class Error(Node):
+    """
+    Tokens skipped by a recovering parser, in place of the node they couldn't
+    be parsed as. The parser's errors say what went wrong.
+    """
+
+    # The original text of the tokens, and of the whitespace between them
+    literal: str
+
+    def string_parts(self) -> Parts:
+        return [self.literal]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.literal, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -52,11 +112,27 @@ class ColumnExpression(Node):
 class ColumnLiteral(ColumnExpression):
     literal: str
 
-    def string(self) -> str:
-        return self.literal
+    def string_parts(self) -> Parts:
+        return [self.literal]
 
-    def original_string(self) -> str:
-        return "".join(self.preceding) + self.literal + "".join(self.trailing)
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.literal, *self.trailing]
+
+
+@dataclass(frozen=True)
+class ColumnPlaceholder(ColumnExpression):
+    # Including the braces, e.g. "{{ input_date }}"
+    literal: str
+
+    @property
+    def name(self) -> str:
+        return self.literal[2:-2].strip()
+
+    def string_parts(self) -> Parts:
+        return [self.literal]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.literal, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -64,16 +140,11 @@ class ColumnPrefixExpression(ColumnExpression):
     operator: Keyword
     right: ColumnExpression
 
-    def string(self) -> str:
-        return self.operator.string() + " " + self.right.string()
+    def string_parts(self) -> Parts:
+        return [self.operator, " ", self.right]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.operator.original_string()
-            + self.right.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.operator, self.right, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -82,40 +153,22 @@ class ColumnInfixExpression(ColumnExpression):
     operator: Keyword
     right: ColumnExpression
 
-    def string(self) -> str:
-        return (
-            self.left.string()
-            + " "
-            + self.operator.string()
-            + " "
-            + self.right.string()
-        )
+    def string_parts(self) -> Parts:
+        return [self.left, " ", self.operator, " ", self.right]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.left.original_string()
-            + self.operator.original_string()
-            + self.right.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.left, self.operator, self.right, *self.trailing]
 
 
 @dataclass(frozen=True)
 class ColumnGroupExpression(ColumnExpression):
     expression: ColumnExpression
 
-    def string(self) -> str:
-        return "(" + self.expression.string() + ")"
+    def string_parts(self) -> Parts:
+        return ["(", self.expression, ")"]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + "("
-            + self.expression.original_string()
-            + ")"
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, "(", self.expression, ")", *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -126,30 +179,114 @@ class ColumnBetweenExpression(ColumnExpression):
     and_: Keyword
     end: ColumnExpression
 
-    def string(self) -> str:
-        return (
-            self.left.string()
-            + " "
-            + self.between.string()
-            + " "
-            + self.start.string()
-            + " "
-            + self.and_.string()
-            + " "
-            + self.end.string()
-        )
+    def string_parts(self) -> Parts:
+        return [
+            self.left,
+            " ",
+            self.between,
+            " ",
+            self.start,
+            " ",
+            self.and_,
+            " ",
+            self.end,
+        ]
+
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            self.left,
+            self.between,
+            self.start,
+            self.and_,
+            self.end,
+            *self.trailing,
+        ]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.left.original_string()
-            + self.between.original_string()
-            + self.start.original_string()
-            + self.and_.original_string()
-            + self.end.original_string()
-            + "".join(self.trailing)
+
+@dataclass(frozen=True)
+class ColumnInExpression(ColumnExpression):
+    left: ColumnExpression
+    in_: Keyword
+    # A ColumnList, or a ColumnLiteralList for a list of only literals
+    values: ColumnExpression
+
+    def string_parts(self) -> Parts:
+        return [self.left, " ", self.in_, " ", self.values]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.left, self.in_, self.values, *self.trailing]
+
+
+@dataclass(frozen=True)
+class ColumnList(ColumnExpression):
+    expressions: List[ColumnExpression]
+
+    def string_parts(self) -> Parts:
+        return ["(", *joined(", ", self.expressions), ")"]
+
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            "(",
+            *joined(",", self.expressions),
+            ")",
+            *self.trailing,
+        ]
+
+    def child_nodes(self) -> Dict[str, "Node"]:
+        return {
+            str(index): self.expressions[index]
+            for index, expression in enumerate(self.expressions)
+            if isinstance(self.expressions[index], Node)
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(
+            preceding=self.preceding, **self.child_nodes(), trailing=self.trailing,
         )
 
+    def replace(self, changes: Dict[str, Any]) -> "Node":
+        result = self
+        for field, value in changes.items():
+            if field in ("preceding", "trailing"):
+                result = dataclasses.replace(result, **{field: value})
+            else:
+                index = int(field, 10)
+                new_expressions = (
+                    result.expressions[:index]
+                    + [value]
+                    + result.expressions[index + 1 :]
+                )
+                result = dataclasses.replace(result, expressions=new_expressions)
+        return result
+
+
+@dataclass(frozen=True)
+class ColumnLiteralList(ColumnExpression):
+    """
+    A parenthesised list of integers, or of strings, kept as text rather than
+    as a node for each literal, as such lists can be very long.
+    """
+
+    # The literals, separated by ", "
+    literal: str
+    # The original text between the parentheses, only where it differs from
+    # literal
+    original_literal: Optional[str]
+
+    @property
+    def values(self) -> List[str]:
+        return _literal_pattern.findall(self.literal)
+
+    def string_parts(self) -> Parts:
+        return ["(", self.literal, ")"]
+
+    def original_parts(self) -> Parts:
+        if self.original_literal is None:
+            return [*self.preceding, "(", self.literal, ")", *self.trailing]
+        return [*self.preceding, "(", self.original_literal, ")", *self.trailing]
+
 
 @dataclass(frozen=True)
 class ColumnIdentifier(ColumnExpression):
@@ -157,21 +294,15 @@ class ColumnIdentifier(ColumnExpression):
     table: Optional[str]
     column: str
 
-    def string(self) -> str:
-        return (
+    def string_parts(self) -> Parts:
+        return [
             (self.schema + "." if self.schema else "")
             + (self.table + "." if self.table else "")
             + self.column
-        )
+        ]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + (self.schema + "." if self.schema else "")
-            + (self.table + "." if self.table else "")
-            + self.column
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, *self.string_parts(), *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -179,23 +310,18 @@ class ColumnCallExpression(ColumnExpression):
     function: ColumnIdentifier
     arguments: List[ColumnExpression]
 
-    def string(self) -> str:
-        return (
-            self.function.string()
-            + "("
-            + ", ".join([ex.string() for ex in self.arguments])
-            + ")"
-        )
+    def string_parts(self) -> Parts:
+        return [self.function, "(", *joined(", ", self.arguments), ")"]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.function.original_string()
-            + "("
-            + ",".join([ex.original_string() for ex in self.arguments])
-            + ")"
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            self.function,
+            "(",
+            *joined(",", self.arguments),
+            ")",
+            *self.trailing,
+        ]
 
     def child_nodes(self) -> Dict[str, "Node"]:
         return {
@@ -216,14 +342,14 @@ class ColumnCallExpression(ColumnExpression):
         result = self
         for field, value in changes.items():
             if field in ("preceding", "trailing", "function"):
-                result = dataclasses.replace(self, **{field: value})
+                result = dataclasses.replace(result, **{field: value})
             else:
                 index = int(field, 10)
                 new_arguments = (
                     result.arguments[:index] + [value] + result.arguments[index + 1 :]
                 )
-                result = dataclasses.replace(self, arguments=new_arguments)
-        return dataclasses.replace(self, **changes)
+                result = dataclasses.replace(result, arguments=new_arguments)
+        return result
 
 
 @dataclass(frozen=True)
@@ -232,21 +358,15 @@ class ColumnAlias(ColumnExpression):
     as_: Optional[Keyword]
     alias: str
 
-    def string(self) -> str:
-        return (
-            self.value.string()
-            + (" " + self.as_.string() + " " if self.as_ else " ")
-            + self.alias
-        )
+    def string_parts(self) -> Parts:
+        if self.as_:
+            return [self.value, " ", self.as_, " ", self.alias]
+        return [self.value, " ", self.alias]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.value.original_string()
-            + (self.as_.original_string() if self.as_ else "")
-            + self.alias
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        if self.as_:
+            return [*self.preceding, self.value, self.as_, self.alias, *self.trailing]
+        return [*self.preceding, self.value, self.alias, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -254,16 +374,11 @@ class ColumnOrderExpression(ColumnExpression):
     value: ColumnExpression
     order: Keyword
 
-    def string(self) -> str:
-        return self.value.string() + " " + self.order.string()
+    def string_parts(self) -> Parts:
+        return [self.value, " ", self.order]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.value.original_string()
-            + self.order.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.value, self.order, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -275,15 +390,11 @@ class Statement(Node):
 class ResultsClause(Node):
     expressions: List[ColumnExpression]
 
-    def string(self) -> str:
-        return ", ".join([ex.string() for ex in self.expressions])
+    def string_parts(self) -> Parts:
+        return joined(", ", self.expressions)
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + ",".join([ex.original_string() for ex in self.expressions])
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, *joined(",", self.expressions), *self.trailing]
 
     def child_nodes(self) -> Dict[str, "Node"]:
         return {
@@ -301,7 +412,7 @@ class ResultsClause(Node):
         result = self
         for field, value in changes.items():
             if field in ("preceding", "trailing"):
-                result = dataclasses.replace(self, **{field: value})
+                result = dataclasses.replace(result, **{field: value})
             else:
                 index = int(field, 10)
                 new_expressions = (
@@ -309,8 +420,8 @@ class ResultsClause(Node):
                     + [value]
                     + result.expressions[index + 1 :]
                 )
-                result = dataclasses.replace(self, expressions=new_expressions)
-        return dataclasses.replace(self, **changes)
+                result = dataclasses.replace(result, expressions=new_expressions)
+        return result
 
 
 @dataclass(frozen=True)
@@ -323,16 +434,11 @@ class FromClause(Node):
     from_: Keyword
     expression: TableExpression
 
-    def string(self) -> str:
-        return self.from_.string() + " " + self.expression.string()
+    def string_parts(self) -> Parts:
+        return [self.from_, " ", self.expression]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.from_.original_string()
-            + self.expression.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.from_, self.expression, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -340,16 +446,11 @@ class WhereClause(Node):
     where: Keyword
     expression: ColumnExpression
 
-    def string(self) -> str:
-        return self.where.string() + " " + self.expression.string()
+    def string_parts(self) -> Parts:
+        return [self.where, " ", self.expression]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.where.original_string()
-            + self.expression.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.where, self.expression, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -358,23 +459,17 @@ class GroupByClause(Node):
     by: Keyword
     expressions: List[ColumnExpression]
 
-    def string(self) -> str:
-        return (
-            self.group.string()
-            + " "
-            + self.by.string()
-            + " "
-            + ", ".join([ex.string() for ex in self.expressions])
-        )
+    def string_parts(self) -> Parts:
+        return [self.group, " ", self.by, " ", *joined(", ", self.expressions)]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.group.original_string()
-            + self.by.original_string()
-            + ",".join([ex.original_string() for ex in self.expressions])
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            self.group,
+            self.by,
+            *joined(",", self.expressions),
+            *self.trailing,
+        ]
 
     def child_nodes(self) -> Dict[str, "Node"]:
         return {
@@ -396,7 +491,7 @@ class GroupByClause(Node):
         result = self
         for field, value in changes.items():
             if field in ("preceding", "trailing", "group", "by"):
-                result = dataclasses.replace(self, **{field: value})
+                result = dataclasses.replace(result, **{field: value})
             else:
                 index = int(field, 10)
                 new_expressions = (
@@ -404,8 +499,8 @@ class GroupByClause(Node):
                     + [value]
                     + result.expressions[index + 1 :]
                 )
-                result = dataclasses.replace(self, expressions=new_expressions)
-        return dataclasses.replace(self, **changes)
+                result = dataclasses.replace(result, expressions=new_expressions)
+        return result
 
 
 @dataclass(frozen=True)
@@ -413,16 +508,11 @@ class HavingClause(Node):
     having: Keyword
     expression: ColumnExpression
 
-    def string(self) -> str:
-        return self.having.string() + " " + self.expression.string()
+    def string_parts(self) -> Parts:
+        return [self.having, " ", self.expression]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.having.original_string()
-            + self.expression.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.having, self.expression, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -431,23 +521,17 @@ class OrderByClause(Node):
     by: Keyword
     expressions: List[ColumnExpression]
 
-    def string(self) -> str:
-        return (
-            self.order.string()
-            + " "
-            + self.by.string()
-            + " "
-            + ", ".join([ex.string() for ex in self.expressions])
-        )
+    def string_parts(self) -> Parts:
+        return [self.order, " ", self.by, " ", *joined(", ", self.expressions)]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.order.original_string()
-            + self.by.original_string()
-            + ",".join([ex.original_string() for ex in self.expressions])
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            self.order,
+            self.by,
+            *joined(",", self.expressions),
+            *self.trailing,
+        ]
 
     def child_nodes(self) -> Dict[str, "Node"]:
         return {
@@ -469,7 +553,7 @@ class OrderByClause(Node):
         result = self
         for field, value in changes.items():
             if field in ("preceding", "trailing", "order", "by"):
-                result = dataclasses.replace(self, **{field: value})
+                result = dataclasses.replace(result, **{field: value})
             else:
                 index = int(field, 10)
                 new_expressions = (
@@ -477,8 +561,8 @@ class OrderByClause(Node):
                     + [value]
                     + result.expressions[index + 1 :]
                 )
-                result = dataclasses.replace(self, expressions=new_expressions)
-        return dataclasses.replace(self, **changes)
+                result = dataclasses.replace(result, expressions=new_expressions)
+        return result
 
 
 @dataclass(frozen=True)
@@ -486,16 +570,11 @@ class LimitClause(Node):
     limit: Keyword
     expression: ColumnExpression
 
-    def string(self) -> str:
-        return self.limit.string() + " " + self.expression.string()
+    def string_parts(self) -> Parts:
+        return [self.limit, " ", self.expression]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.limit.original_string()
-            + self.expression.original_string()
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.limit, self.expression, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -509,56 +588,87 @@ class Select(Statement):
     order_by: Optional[OrderByClause]
     limit: Optional[LimitClause]
 
-    def string(self) -> str:
-        return " ".join(
-            item
-            for item in [
-                self.select.string(),
-                self.results.string(),
-                self.from_.string() if self.from_ else "",
-                self.where.string() if self.where else "",
-                self.group_by.string() if self.group_by else "",
-                self.having.string() if self.having else "",
-                self.order_by.string() if self.order_by else "",
-                self.limit.string() if self.limit else "",
+    def clauses(self) -> List[Node]:
+        return [
+            clause
+            for clause in [
+                self.select,
+                self.results,
+                self.from_,
+                self.where,
+                self.group_by,
+                self.having,
+                self.order_by,
+                self.limit,
             ]
-            if item
-        )
+            if clause is not None
+        ]
 
-    def original_string(self) -> str:
-        return "".join(
-            item
-            for item in [
-                "".join(self.preceding),
-                self.select.original_string(),
-                self.results.original_string(),
-                self.from_.original_string() if self.from_ else "",
-                self.where.original_string() if self.where else "",
-                self.group_by.original_string() if self.group_by else "",
-                self.having.original_string() if self.having else "",
-                self.order_by.original_string() if self.order_by else "",
-                self.limit.original_string() if self.limit else "",
-                "".join(self.trailing),
-            ]
-            if item
-        )
+    def string_parts(self) -> Parts:
+        # Only an empty Error renders as nothing, and gets no space. The rest
+        # are left to render(), so that nested subqueries don't recurse.
+        clauses = [
+            clause
+            for clause in self.clauses()
+            if not (isinstance(clause, Error) and not clause.literal)
+        ]
+        return joined(" ", clauses)
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, *self.clauses(), *self.trailing]
+
+
+@dataclass(frozen=True)
+class ScriptStatement(Node):
+    # None for an empty statement, or for whitespace after the last statement
+    statement: Optional[Statement]
+    # None for the last statement, when the script doesn't end with a semicolon
+    semicolon: Optional[Keyword]
+
+    def string_parts(self) -> Parts:
+        return [node for node in (self.statement, self.semicolon) if node]
+
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            *(node for node in (self.statement, self.semicolon) if node),
+            *self.trailing,
+        ]
 
 
 @dataclass(frozen=True)
 class TableIdentifier(TableExpression):
     schema: Optional[str]
     table: str
+    # Redshift names tables in other databases as database.schema.table. Last,
+    # so that nodes built without it keep their fields in place
+    database: Optional[str] = None
 
-    def string(self) -> str:
-        return (self.schema + "." if self.schema else "") + self.table
-
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
+    def string_parts(self) -> Parts:
+        return [
+            (self.database + "." if self.database else "")
             + (self.schema + "." if self.schema else "")
             + self.table
-            + "".join(self.trailing)
-        )
+        ]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, *self.string_parts(), *self.trailing]
+
+
+@dataclass(frozen=True)
+class TablePlaceholder(TableExpression):
+    # Including the braces, e.g. "{{ table_name }}"
+    literal: str
+
+    @property
+    def name(self) -> str:
+        return self.literal[2:-2].strip()
+
+    def string_parts(self) -> Parts:
+        return [self.literal]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.literal, *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -567,21 +677,26 @@ class TableAlias(ColumnExpression):
     as_: Optional[Keyword]
     alias: str
 
-    def string(self) -> str:
-        return (
-            self.value.string()
-            + (" " + self.as_.string() + " " if self.as_ else " ")
-            + self.alias
-        )
+    def string_parts(self) -> Parts:
+        if self.as_:
+            return [self.value, " ", self.as_, " ", self.alias]
+        return [self.value, " ", self.alias]
 
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.value.original_string()
-            + (self.as_.original_string() if self.as_ else "")
-            + self.alias
-            + "".join(self.trailing)
-        )
+    def original_parts(self) -> Parts:
+        if self.as_:
+            return [*self.preceding, self.value, self.as_, self.alias, *self.trailing]
+        return [*self.preceding, self.value, self.alias, *self.trailing]
+
+
+@dataclass(frozen=True)
+class TableSubquery(TableExpression):
+    statement: Statement
+
+    def string_parts(self) -> Parts:
+        return ["(", self.statement, ")"]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, "(", self.statement, ")", *self.trailing]
 
 
 @dataclass(frozen=True)
@@ -589,6 +704,12 @@ class TablePrefixExpression(TableExpression):
     operator: Keyword
     right: TableExpression
 
+    def string_parts(self) -> Parts:
+        return [self.operator, " ", self.right]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.operator, self.right, *self.trailing]
+
 
 @dataclass(frozen=True)
 class TableInfixExpression(TableExpression):
@@ -596,6 +717,12 @@ class TableInfixExpression(TableExpression):
     operator: Keyword
     right: TableExpression
 
+    def string_parts(self) -> Parts:
+        return [self.left, " ", self.operator, " ", self.right]
+
+    def original_parts(self) -> Parts:
+        return [*self.preceding, self.left, self.operator, self.right, *self.trailing]
+
 
 @dataclass(frozen=True)
 class TableJoinExpression(TableExpression):
@@ -605,26 +732,74 @@ class TableJoinExpression(TableExpression):
     on: Keyword
     condition: ColumnExpression
 
-    def string(self) -> str:
-        return (
-            self.left.string()
-            + " "
-            + self.join.string()
-            + " "
-            + self.right.string()
-            + " "
-            + self.on.string()
-            + " "
-            + self.condition.string()
-        )
-
-    def original_string(self) -> str:
-        return (
-            "".join(self.preceding)
-            + self.left.original_string()
-            + self.join.original_string()
-            + self.right.original_string()
-            + self.on.original_string()
-            + self.condition.original_string()
-            + "".join(self.trailing)
-        )
+    def string_parts(self) -> Parts:
+        return [
+            self.left,
+            " ",
+            self.join,
+            " ",
+            self.right,
+            " ",
+            self.on,
+            " ",
+            self.condition,
+        ]
+
+    def original_parts(self) -> Parts:
+        return [
+            *self.preceding,
+            self.left,
+            self.join,
+            self.right,
+            self.on,
+            self.condition,
+            *self.trailing,
+        ]
+
+
+# Each of the literals in ColumnLiteralList.literal
+_literal_pattern = re.compile(r"'[^']*'|[0-9]+")
+
+
+def joined(separator: str, nodes: Sequence[Node]) -> Parts:
+    """The parts of nodes with separator between each of them."""
+    parts: Parts = []
+    for node in nodes:
+        parts.append(node)
+        parts.append(separator)
+    return parts[:-1]
+
+
+def render(node: Node, original: bool) -> str:
+    """
+    Render node by expanding its parts and those of each node below it, the
+    original_parts if original is set and the string_parts if not. The nodes
+    still to expand are kept on a stack rather than recursed into, so that the
+    deepest trees render, in time linear in their size.
+    """
+    output: List[str] = []
+    append = output.append
+    stack: Parts = [node]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        part = pop()
+        if isinstance(part, str):
+            append(part)
+        else:
+            parts = part.original_parts() if original else part.string_parts()
+            parts.reverse()
+            extend(parts)
+    return "".join(output)
+
+
+def lazy(node: N, pending: Dict[str, Callable[[], Any]]) -> N:
+    """
+    Leave each field of node named in pending unset, to be set to what its
+    function returns when it's first accessed. The node must be one that has
+    just been built and not yet handed out.
+    """
+    for name in pending:
+        del node.__dict__[name]
+    node.__dict__["_pending"] = dict(pending)
+    return node
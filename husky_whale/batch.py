@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from itertools import islice
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from husky_whale import ast
+from husky_whale import serialize
+from husky_whale.cache import ASTCache
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+# A text to parse, or the path of a file to read it from
+Source = Union[str, os.PathLike]
+# The encoded or parsed statement in a source, or the error from it
+ChunkResult = Tuple[Union[bytes, ast.Statement, None], Optional[Exception]]
+
+
+class ParseResult(NamedTuple):
+    # Position of the source in the inputs to parse_many
+    position: int
+    source: Source
+    # The statement in serialize's encoding, or None when there was an error or
+    # it was parsed on a thread
+    data: Optional[bytes]
+    error: Optional[Exception]
+    # The statement itself, when it was parsed on a thread
+    parsed: Optional[ast.Statement] = None
+
+    @property
+    def statement(self) -> Optional[ast.Statement]:
+        """
+        The parsed statement. Unless it was parsed on a thread, it's decoded
+        again on every access.
+        """
+        if self.parsed is not None:
+            return self.parsed
+        if self.data is None:
+            return None
+        return cast(ast.Statement, serialize.loads(self.data))
+
+
+def parse_many(
+    sources: Iterable[Source],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    cache: Optional[ASTCache] = None,
+    threads: bool = False,
+) -> Iterator[ParseResult]:
+    """
+    Parse the statement in each source on a pool of worker processes, or of
+    threads if threads is set.
+
+    Strings are parsed as SQL text, and path-like objects name files to read.
+    Sources are handed to the workers in chunks, with only a few chunks per
+    worker queued at a time, so any number of sources can be streamed through.
+    Results come in the order of sources, or else as each chunk completes.
+    Errors from reading or parsing a source are returned in its result rather
+    than raised.
+
+    Chunks go to a new pool unless an executor is given. A ThreadPoolExecutor
+    hands back statements as they are, rather than encoded for sending between
+    processes: threads only run in parallel on a free-threaded build of Python,
+    but then share the parsed trees for free. Workers look each text up in the
+    cache if one is given, and store what they parse in it.
+    """
+    if executor is None:
+        with ThreadPoolExecutor() if threads else ProcessPoolExecutor() as executor:
+            yield from parse_many(
+                sources, executor, chunk_size, ordered, cache, threads
+            )
+        return
+
+    encode = not isinstance(executor, ThreadPoolExecutor)
+
+    chunks = _chunks(enumerate(sources), chunk_size)
+    max_pending = (os.cpu_count() or 1) * 2
+    pending: Dict[Future, Tuple[int, List[Tuple[int, Source]]]] = {}
+    # Completed chunks waiting for an earlier one, when ordered
+    done_chunks: Dict[int, List[ParseResult]] = {}
+    next_chunk = 0
+    submitted = 0
+    exhausted = False
+
+    while True:
+        # Chunks held back for ordering count too, to bound memory
+        while not exhausted and len(pending) + len(done_chunks) < max_pending:
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                break
+            future = executor.submit(
+                _parse_chunk, [source for _, source in chunk], cache, encode
+            )
+            pending[future] = (submitted, chunk)
+            submitted += 1
+        if not pending:
+            return
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            number, chunk = pending.pop(future)
+            # Sources are taken from the chunk, rather than sent back
+            results = [
+                ParseResult(position, source, cast(Optional[bytes], result), error)
+                if encode
+                else ParseResult(
+                    position, source, None, error, cast(Optional[ast.Statement], result)
+                )
+                for (position, source), (result, error) in zip(chunk, future.result())
+            ]
+            if ordered:
+                done_chunks[number] = results
+            else:
+                yield from results
+        while next_chunk in done_chunks:
+            yield from done_chunks.pop(next_chunk)
+            next_chunk += 1
+
+
+def _chunks(
+    items: Iterator[Tuple[int, Source]], size: int
+) -> Iterator[List[Tuple[int, Source]]]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_chunk(
+    sources: List[Source], cache: Optional[ASTCache], encode: bool
+) -> List[ChunkResult]:
+    results: List[ChunkResult] = []
+    for source in sources:
+        try:
+            if isinstance(source, str):
+                text = source
+            else:
+                with open(source, encoding="utf-8") as f:
+                    text = f.read()
+            if cache is not None:
+                result = cache.parse_data(text) if encode else cache.parse(text)
+                results.append((result, None))
+                continue
+            statement = Parser(RegexLexer(text)).parse_statement()
+            results.append((serialize.dumps(statement) if encode else statement, None))
+        except Exception as error:
+            results.append((None, error))
+    return results
@@ -0,0 +1,177 @@
+"""
+A persistent cache of parsed statements, keyed by the hash of their text.
+
+Entries are stored in serialize's encoding after its CRC-32, one file per text,
+under a directory named for the grammar version so that trees from an older
+parser are never returned. Files are written to a temporary name and renamed into
+place, so that any number of processes can share a cache: readers see either
+a whole entry or none, and writers of the same text write the same bytes.
+"""
+import hashlib
+import importlib.machinery
+import os
+import tempfile
+import zlib
+from typing import Optional, Tuple, cast
+
+from husky_whale import ast
+from husky_whale import lexer
+from husky_whale import parser
+from husky_whale import precedence
+from husky_whale import serialize
+from husky_whale import token
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+
+
+def _source_path(path: str) -> str:
+    """The source of the module at path, which may be compiled."""
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        if path.endswith(suffix):
+            return path[: -len(suffix)] + ".py"
+    return path
+
+
+def _grammar_version() -> str:
+    # Any change to the modules that decide what tree a text parses to
+    # invalidates the cache. Their sources are hashed, so that compiled and
+    # interpreted builds of them share it.
+    digest = hashlib.sha256()
+    for module in (token, lexer, precedence, ast, parser, serialize):
+        with open(_source_path(cast(str, module.__file__)), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+grammar_version = _grammar_version()
+
+
+class ASTCache:
+    """
+    Parsed statements cached in directory, which is created as needed.
+
+    Once more than max_bytes are stored, entries are evicted in order of when
+    they were last read or written, as recorded by their modification times.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Eviction walks every entry, so it's only done once this many bytes
+        # have been written since the last time
+        self.evict_interval = max(max_bytes // 16, 1)
+        self.written = 0
+
+    def __getstate__(self):
+        # Each process counts its own writes
+        return dict(self.__dict__, written=0)
+
+    def path_of(self, text: str) -> str:
+        key = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.directory, grammar_version, key[:2], key[2:])
+
+    def load_data(self, text: str) -> Optional[bytes]:
+        """
+        The encoded statement for text, or None if it isn't cached or its entry
+        is damaged, which its checksum shows without decoding it.
+        """
+        path = self.path_of(text)
+        try:
+            with open(path, "rb") as f:
+                entry = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Possibly evicted by another process between the read and utime
+            return None
+        data = entry[_checksum_size:]
+        if entry[:_checksum_size] != _checksum(data):
+            # Parsed and written again by the caller
+            return None
+        return data
+
+    def store_data(self, text: str, data: bytes) -> None:
+        entry = _checksum(data) + data
+        path = self.path_of(text)
+        directory = os.path.dirname(path)
+        try:
+            fd, temporary = tempfile.mkstemp(dir=directory, prefix=".")
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=directory, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self.written += len(entry)
+        if self.written >= self.evict_interval:
+            self.evict()
+
+    def parse_data(self, text: str) -> bytes:
+        """
+        The encoded statement for text, parsed and stored if it isn't cached or
+        its entry is damaged. Parse errors are raised and not cached.
+        """
+        return self.lookup(text)[0]
+
+    def parse(self, text: str) -> ast.Statement:
+        data, statement = self.lookup(text)
+        if statement is None:
+            statement = cast(ast.Statement, serialize.loads(data))
+        return statement
+
+    def lookup(self, text: str) -> Tuple[bytes, Optional[ast.Statement]]:
+        """
+        The encoded statement for text as parse_data() returns it, and the
+        statement too if it was parsed rather than found.
+        """
+        data = self.load_data(text)
+        if data is not None:
+            return data, None
+        statement = Parser(RegexLexer(text)).parse_statement()
+        data = serialize.dumps(statement)
+        self.store_data(text, data)
+        return data, statement
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries, of any grammar version, until
+        no more than max_bytes are stored.
+        """
+        self.written = 0
+        entries = []
+        total = 0
+        for directory, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith("."):
+                    # Being written by another process
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Removed by another process
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                return
+
+
+# Each entry starts with the CRC-32 of the rest, little-endian
+_checksum_size = 4
+
+
+def _checksum(data: bytes) -> bytes:
+    return zlib.crc32(data).to_bytes(_checksum_size, "little")
@@ -0,0 +1,83 @@
+"""Sample queries shared by the tests and benchmarks."""
+import random
+from typing import Iterator, List
+
+# Inputs exercised by test_lexer.py, plus edge cases around token boundaries
+LEXER_QUERIES: List[str] = [
+    "+()",
+    """select 'hello' AS world, "select\"""",
+    "x IS NOT NULL",
+    """some_schema."some_table".some_field""",
+    "LEFT JOIN",
+    "LEFT()",
+    """
+SELECT u.id, u.first_name || ' ' || u.last_name AS user_name
+FROM users u
+""",
+    "a||b|c::d:e<>f<=g>=h!=i!j<k>l=m",
+    "x.y. z..w",
+    '"a"."b".c."d"',
+    '"a"b "c".1',
+    "'it''s' 'a'",
+    "1234abc 00_1 _x x_1",
+    "count(*) COUNT (*) sum(x)",
+    "\t\n  \n",
+    "a\r\nb",
+    "a ; b ? c @ d # e $ f",
+    "café",
+    "--comment\nx",
+    "",
+    "SELECT 'unterminated\nFROM t",
+    'SELECT "unterminated',
+    'x."y',
+    '"a"."b',
+    "date < {{input_date}}{{ x }} {{y",
+    "a--b;c\nd - -e /* f;\n*/ g / *h /* i",
+]
+
+# Inputs exercised by test_parser.py
+PARSER_QUERIES: List[str] = [
+    "SELECT u.id FROM users u JOIN schools ON u.school_id = schools.id",
+    "SELECT COUNT(*) FROM users WHERE is_active IS TRUE GROUP BY country HAVING COUNT(*) > 0 ORDER BY COUNT(*) DESC LIMIT 10",
+    """
+SELECT u.id, u.first_name || ' ' || u.last_name AS user_name
+FROM users u
+""",
+    "SELECT - 1 + 2 * (3 + 4) AS x, upper('hello') || concat(' ', lower('world')) y",
+    "SELECT x FROM s.t WHERE x = 1 AND y = 2 OR z IS NOT NULL",
+    "SELECT a FROM t WHERE x BETWEEN a AND b ORDER BY a ASC, b DESC",
+    "SELECT {{ column }} AS c FROM {{table}} t WHERE date < {{input_date}}",
+    "-- Active users\nSELECT a /* first */, b FROM t -- done\n",
+]
+
+# Characters that mutations insert, weighted towards those that start or end
+# multi-character tokens
+_fuzz_chars = "'\"(){}.,;:|!<>=+-*/ \n_a1é"
+
+
+def mutated_queries(count: int, seed: int = 0) -> Iterator[str]:
+    """
+    Yield `count` malformed variants of the sample queries, each made by
+    applying a few random truncations, deletions, duplications, insertions and
+    splices to one of them.
+    """
+    rng = random.Random(seed)
+    queries = [query for query in LEXER_QUERIES + PARSER_QUERIES if query]
+    for _ in range(count):
+        text = rng.choice(queries)
+        for _ in range(rng.randint(1, 4)):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, len(text))
+            mutation = rng.randrange(5)
+            if mutation == 0:
+                text = text[:start]
+            elif mutation == 1:
+                text = text[:start] + text[end:]
+            elif mutation == 2:
+                text = text[:end] + text[start:end] + text[end:]
+            elif mutation == 3:
+                text = text[:start] + rng.choice(_fuzz_chars) + text[start:]
+            else:
+                other = rng.choice(queries)
+                text = text[:start] + other[rng.randint(0, len(other)) :]
+        yield text
@@ -0,0 +1,242 @@
+from bisect import bisect_right
+from typing import Callable, List, NamedTuple, Optional, Tuple, cast
+
+from husky_whale import ast
+from husky_whale import token
+from husky_whale.lexer import RegexLexer, TokenSource, is_whitespace
+from husky_whale.parser import ParseError, Parser
+
+
+class ClauseSpan(NamedTuple):
+    field: str
+    start: int
+    end: int
+    # For clauses holding a comma-separated list, the (start, end) of each item
+    items: Optional[List[Tuple[int, int]]] = None
+
+
+# Select fields that can be re-parsed on their own, with the method that parses
+# them. The text of each starts at its keyword and runs up to the next clause.
+clause_parse_fns = {
+    "results": Parser.parse_results_clause,
+    "from_": Parser.parse_from_clause,
+    "where": Parser.parse_where_clause,
+    "group_by": Parser.parse_group_by_clause,
+    "having": Parser.parse_having_clause,
+    "order_by": Parser.parse_order_by_clause,
+    "limit": Parser.parse_limit_clause,
+}
+list_clause_fields = ("results", "group_by", "order_by")
+
+
+class IncrementalParse:
+    """
+    A parsed SELECT, together with its text and the offsets of its clauses, so
+    that after an edit only the smallest enclosing list item or clause is lexed
+    and parsed again. Every other node of the new statement is the same node as
+    before.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        statement: ast.Select,
+        spans: Optional[List[ClauseSpan]],
+        lexer_class: Callable[[str], TokenSource] = RegexLexer,
+    ):
+        self.text = text
+        self.statement = statement
+        # None when the statement doesn't reproduce the text exactly, in which
+        # case every edit falls back to a full parse
+        self.spans = spans
+        self.lexer_class = lexer_class
+
+    @classmethod
+    def parse(
+        cls, text: str, lexer_class: Callable[[str], TokenSource] = RegexLexer
+    ) -> "IncrementalParse":
+        statement = Parser(lexer_class(text)).parse_select()
+        return cls(text, statement, clause_spans(statement, text), lexer_class)
+
+    def edit(self, start: int, end: int, new_text: str) -> "IncrementalParse":
+        """Replace text[start:end] with new_text, and parse the result."""
+        text = self.text[:start] + new_text + self.text[end:]
+        delta = len(new_text) - (end - start)
+
+        span = self.enclosing_span(start, end)
+        if span is not None:
+            result = None
+            if span.items:
+                result = self.edit_item(span, text, start, end, delta)
+            if result is None:
+                result = self.edit_clause(span, text, delta)
+            if result is not None:
+                return result
+
+        return IncrementalParse.parse(text, self.lexer_class)
+
+    def enclosing_span(self, start: int, end: int) -> Optional[ClauseSpan]:
+        if self.spans is None:
+            return None
+        for span in self.spans:
+            if span.start <= start and end <= span.end:
+                return span
+        return None
+
+    def edit_item(
+        self, span: ClauseSpan, text: str, start: int, end: int, delta: int
+    ) -> Optional["IncrementalParse"]:
+        # Only called for spans with items
+        span_items = cast(List[Tuple[int, int]], span.items)
+        index = bisect_right(span_items, (start, len(text))) - 1
+        if index < 0:
+            return None
+        item_start, item_end = span_items[index]
+        if end > item_end:
+            return None
+
+        parser = self.parser_for(text, item_start, item_end + delta)
+        if parser is None:
+            return None
+        try:
+            item = parser.parse_column_expression()
+        except ParseError:
+            return None
+        item = parser.append_trailing(item)
+        if parser.current_token.type != token.EOF:
+            return None
+
+        clause = getattr(self.statement, span.field).replace({str(index): item})
+        items = span_items[:index] + [(item_start, item_end + delta)]
+        items.extend((s + delta, e + delta) for s, e in span_items[index + 1 :])
+        return self.replaced(span, clause, text, delta, items)
+
+    def edit_clause(
+        self, span: ClauseSpan, text: str, delta: int
+    ) -> Optional["IncrementalParse"]:
+        parser = self.parser_for(text, span.start, span.end + delta)
+        if parser is None:
+            return None
+        try:
+            clause = clause_parse_fns[span.field](parser)
+        except ParseError:
+            return None
+        if parser.current_token.type != token.EOF:
+            return None
+
+        items = list_items(clause, span.start, span.end + delta)
+        return self.replaced(span, clause, text, delta, items)
+
+    def parser_for(self, text: str, start: int, end: int) -> Optional[Parser]:
+        """
+        A parser for text[start:end] on its own, or None when lexing it on its
+        own could give different tokens than lexing the whole text.
+        """
+        if start == end:
+            return None
+        if not (_boundary_is_safe(text, start) and _boundary_is_safe(text, end)):
+            return None
+        if end < len(text) and not self.token_ends_at(text, start, end):
+            return None
+        return Parser(self.lexer_class(text[start:end]))
+
+    def token_ends_at(self, text: str, start: int, end: int) -> bool:
+        """
+        Whether lexing text from start on ends a token at end, rather than one
+        such as a comment, a quote or a placeholder running on past it.
+        """
+        lexer = self.lexer_class(text[start:])
+        length = end - start
+        while True:
+            whitespace, t = lexer.next_whitespace_and_token()
+            for each in whitespace + [t]:
+                if each.end >= length:
+                    return each.end == length
+            if t.type == token.EOF:
+                return False
+
+    def replaced(
+        self,
+        span: ClauseSpan,
+        clause: ast.Node,
+        text: str,
+        delta: int,
+        items: Optional[List[Tuple[int, int]]],
+    ) -> "IncrementalParse":
+        statement = cast(ast.Select, self.statement.replace({span.field: clause}))
+        spans = []
+        # Only called when there are spans to have found span in
+        for s in cast(List[ClauseSpan], self.spans):
+            if s.field == span.field:
+                s = ClauseSpan(s.field, s.start, s.end + delta, items)
+            elif s.start > span.start:
+                s = ClauseSpan(
+                    s.field,
+                    s.start + delta,
+                    s.end + delta,
+                    [(start + delta, end + delta) for start, end in s.items]
+                    if s.items
+                    else None,
+                )
+            spans.append(s)
+        return IncrementalParse(text, statement, spans, self.lexer_class)
+
+
+def clause_spans(statement: ast.Select, text: str) -> Optional[List[ClauseSpan]]:
+    """The offsets of each clause of statement within the text it was parsed from."""
+    if statement.original_string() != text:
+        return None
+    spans = []
+    offset = len("".join(statement.preceding)) + len(
+        statement.select.original_string()
+    )
+    for field in clause_parse_fns:
+        clause = getattr(statement, field)
+        if clause is None:
+            continue
+        end = offset + len(clause.original_string())
+        spans.append(ClauseSpan(field, offset, end, list_items(clause, offset, end)))
+        offset = end
+    return spans
+
+
+def list_items(
+    clause: ast.Node, start: int, end: int
+) -> Optional[List[Tuple[int, int]]]:
+    """The offsets of each item of a list clause spanning text[start:end]."""
+    expressions = getattr(clause, "expressions", None)
+    if expressions is None:
+        return None
+    lengths = [len(expression.original_string()) for expression in expressions]
+    # Items are separated by single commas, and followed by the clause trailing
+    offset = end - len("".join(clause.trailing)) - sum(lengths) - (len(lengths) - 1)
+    items = []
+    for length in lengths:
+        items.append((offset, offset + length))
+        offset += length + 1
+    return items
+
+
+_word_chars = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.\"'"
+)
+_operator_pairs = frozenset(["||", "::", "<>", "<=", ">=", "!="])
+
+
+def _boundary_is_safe(text: str, offset: int) -> bool:
+    """
+    Whether the token before offset is guaranteed to end there, so that text on
+    either side of it can be lexed separately.
+    """
+    if offset <= 0 or offset >= len(text):
+        return True
+    left, right = text[offset - 1], text[offset]
+    if left in _word_chars and right in _word_chars:
+        return False
+    if left + right in _operator_pairs:
+        return False
+    # A run of whitespace is a single token
+    if is_whitespace(left) and is_whitespace(right):
+        return False
+    # The keyword-followed-by-( rule looks across the boundary
+    return right != "("
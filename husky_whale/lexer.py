@@ -1,22 +1,59 @@
-from typing import List
+import mmap
+import re
+from contextlib import contextmanager
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    final,
+)
 
 from husky_whale import token
-from husky_whale.token import Token
+from husky_whale.position import LineIndex, Position
+from husky_whale.token import BytesToken, Token
 
 
+class TokenSource(Protocol):
+    """What Parser needs from a lexer."""
+
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
+        ...
+
+    # The text that the tokens are slices of
+    @property
+    def input(self) -> Union[str, bytes, mmap.mmap]:
+        ...
+
+    # Of the input, for the positions of errors
+    @property
+    def lines(self) -> Optional[LineIndex]:
+        ...
+
+
+# Tokens that parsers skip over, keeping them as whitespace
+_trivia_types = (token.WHITESPACE, token.COMMENT_SINGLE, token.COMMENT_MULTI)
+
+
+@final
 class Lexer:
     def __init__(self, input: str):
         self.input: str = input
         self.char: str = ""
         self.char_pos: int = 0
         self.read_pos: int = 0
+        self.lines = LineIndex(input)
         self.read_char()
 
-    def next_whitespace_and_token(self) -> (List[Token], Token):
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
         whitespace = []
         while True:
             t = self.next_token()
-            if t.type in (token.WHITESPACE, token.COMMENT_SINGLE):
+            if t.type in _trivia_types:
                 whitespace.append(t)
                 continue
             else:
@@ -24,83 +61,109 @@ class Lexer:
 
     def next_token(self) -> Token:
         c = self.char
-        t = Token(token.ILLEGAL, c)
+        start = self.char_pos
+        type_ = token.ILLEGAL
 
         if is_whitespace(c):
-            return Token(token.WHITESPACE, self.read_whitespace())
+            self.read_whitespace()
+            return self.token_from(token.WHITESPACE, start)
         elif c == '"':
-            return Token(token.IDENTIFIER, self.read_identifier())
+            if not self.read_identifier():
+                return self.token_from(token.ILLEGAL, start)
+            return self.token_from(token.IDENTIFIER, start)
         elif c == "'":
-            return Token(token.STRING, self.read_string())
+            if not self.read_string():
+                return self.token_from(token.ILLEGAL, start)
+            return self.token_from(token.STRING, start)
+        elif c == "{" and self.peek_char() == "{":
+            if not self.read_placeholder():
+                return self.token_from(token.ILLEGAL, start)
+            return self.token_from(token.PLACEHOLDER, start)
+        elif c == "-" and self.peek_char() == "-":
+            self.read_line_comment()
+            return self.token_from(token.COMMENT_SINGLE, start)
+        elif c == "/" and self.peek_char() == "*":
+            if not self.read_block_comment():
+                return self.token_from(token.ILLEGAL, start)
+            return self.token_from(token.COMMENT_MULTI, start)
         elif c == "+":
-            t = Token(token.PLUS, c)
+            type_ = token.PLUS
         elif c == "-":
-            t = Token(token.SUBTRACT, c)
+            type_ = token.SUBTRACT
         elif c == "*":
-            t = Token(token.ASTERISK, c)
+            type_ = token.ASTERISK
         elif c == "/":
-            t = Token(token.SLASH, c)
+            type_ = token.SLASH
         elif c == "|":
             if self.peek_char() == "|":
                 self.read_char()
-                t = Token(token.PIPEPIPE, c + self.char)
+                type_ = token.PIPEPIPE
             else:
-                t = Token(token.PIPE, c)
+                type_ = token.PIPE
         elif c == "=":
-            t = Token(token.EQUAL, c)
+            type_ = token.EQUAL
         elif c == "!":
             if self.peek_char() == "=":
                 self.read_char()
-                t = Token(token.BANGEQUAL, c + self.char)
+                type_ = token.BANGEQUAL
             else:
-                t = Token(token.BANG, c)
+                type_ = token.BANG
         elif c == "<":
             pc = self.peek_char()
             if pc == "=":
                 self.read_char()
-                t = Token(token.LTEQUAL, c + self.char)
+                type_ = token.LTEQUAL
             elif pc == ">":
                 self.read_char()
-                t = Token(token.LTGT, c + self.char)
+                type_ = token.LTGT
             else:
-                t = Token(token.LT, c)
+                type_ = token.LT
         elif c == ">":
             if self.peek_char() == "=":
                 self.read_char()
-                t = Token(token.GTEQUAL, c + self.char)
+                type_ = token.GTEQUAL
             else:
-                t = Token(token.GT, c)
+                type_ = token.GT
         elif c == ",":
-            t = Token(token.COMMA, c)
+            type_ = token.COMMA
+        elif c == ";":
+            type_ = token.SEMICOLON
         elif c == ".":
-            t = Token(token.FULLSTOP, c)
+            type_ = token.FULLSTOP
         elif c == ":":
             if self.peek_char() == ":":
                 self.read_char()
-                t = Token(token.COLONCOLON, c + self.char)
+                type_ = token.COLONCOLON
             else:
-                t = Token(token.COLON, c)
+                type_ = token.COLON
         elif c == "(":
-            t = Token(token.LPAREN, c)
+            type_ = token.LPAREN
         elif c == ")":
-            t = Token(token.RPAREN, c)
+            type_ = token.RPAREN
         elif c == "":
-            t = Token(token.EOF, c)
+            end = len(self.input)
+            return Token(token.EOF, self.input, end, end)
         else:
             if is_letter(c) or c == "_":
                 identifier = self.read_identifier()
                 identifier_upper = identifier.upper()
                 if identifier_upper in keyword_tokens and self.char != "(":
-                    return Token(keyword_tokens[identifier_upper], identifier)
+                    return self.token_from(keyword_tokens[identifier_upper], start)
                 else:
-                    return Token(token.IDENTIFIER, identifier)
+                    return self.token_from(token.IDENTIFIER, start)
             elif is_number(c):
-                integer = self.read_integer()
-                return Token(token.INTEGER, integer)
+                self.read_integer()
+                return self.token_from(token.INTEGER, start)
             else:
                 pass
         self.read_char()
-        return t
+        return self.token_from(type_, start)
+
+    def token_from(self, type_: int, start: int) -> Token:
+        return Token(type_, self.input, start, self.char_pos)
+
+    def position_of(self, offset: int) -> Position:
+        return self.lines.position_of(offset)
 
     def peek_char(self) -> str:
         if self.read_pos >= len(self.input):
@@ -122,14 +185,29 @@ class Lexer:
             self.read_char()
         return self.input[start : self.char_pos]
 
+    def seek(self, pos: int) -> None:
+        self.read_pos = pos
+        self.read_char()
+
     def read_identifier(self) -> str:
+        """
+        Read an identifier, or return an empty string when it starts with an
+        unterminated quote, in which case the rest of the input is read.
+        """
         start = self.char_pos
         while True:
             quoted = self.char == '"'
             if quoted:
+                quote_pos = self.char_pos
                 self.read_char()
-                while self.char != '"':
+                while self.char != '"' and self.char != "":
                     self.read_char()
+                if self.char == "":
+                    if quote_pos == start:
+                        return ""
+                    # Stop after the dot, leaving the quote for the next token
+                    self.seek(quote_pos)
+                    break
                 self.read_char()
             else:
                 while is_identifier_char(self.char):
@@ -142,13 +220,52 @@ class Lexer:
         return self.input[start : self.char_pos]
 
     def read_string(self) -> str:
+        """
+        Read a string, or return an empty string when it is unterminated, in
+        which case the rest of the input is read.
+        """
         start = self.char_pos
         self.read_char()
-        while self.char != "'":
+        while self.char != "'" and self.char != "":
             self.read_char()
+        if self.char == "":
+            return ""
         self.read_char()
         return self.input[start : self.char_pos]
 
+    def read_placeholder(self) -> str:
+        """
+        Read a {{...}} placeholder, or return an empty string when it is
+        unterminated, in which case the rest of the input is read.
+        """
+        start = self.char_pos
+        end = self.input.find("}}", start + 2)
+        if end == -1:
+            self.seek(len(self.input))
+            return ""
+        self.seek(end + 2)
+        return self.input[start : self.char_pos]
+
+    def read_line_comment(self) -> str:
+        """Read a -- comment, up to but not including the end of the line."""
+        start = self.char_pos
+        end = self.input.find("\n", start)
+        self.seek(len(self.input) if end == -1 else end)
+        return self.input[start : self.char_pos]
+
+    def read_block_comment(self) -> str:
+        """
+        Read a /* */ comment, or return an empty string when it is unterminated,
+        in which case the rest of the input is read.
+        """
+        start = self.char_pos
+        end = self.input.find("*/", start + 2)
+        if end == -1:
+            self.seek(len(self.input))
+            return ""
+        self.seek(end + 2)
+        return self.input[start : self.char_pos]
+
     def read_integer(self) -> str:
         start = self.char_pos
         while is_number(self.char):
@@ -156,6 +273,443 @@ class Lexer:
         return self.input[start : self.char_pos]
 
 
+# The patterns of the tokens that the scanners which step over text without
+# lexing it need to tell apart: skip_tokens(), parallel.statement_boundaries()
+# and tables.scan_tables(). They're built from these, so that they always find
+# the same tokens as the lexer.
+_segment = r'(?:"[^"]*"|[A-Za-z0-9_]*)'
+whitespace_pattern = r"[ \n\t]+"
+# Unquoted identifiers, which may turn out to be keywords
+word_pattern = r"[A-Za-z_][A-Za-z0-9_]*(?:\." + _segment + r")*"
+quoted_identifier_pattern = r'"[^"]*"(?:\.' + _segment + r")*"
+string_pattern = r"'[^']*'"
+placeholder_pattern = r"\{\{.*?\}\}"
+line_comment_pattern = r"--[^\n]*"
+block_comment_pattern = r"/\*.*?\*/"
+# An unterminated quote, placeholder or comment is illegal, up to the end of the
+# input
+unterminated_pattern = r"['\"].*|\{\{.*|/\*.*"
+comment_pattern = line_comment_pattern + "|" + block_comment_pattern
+# Strings and placeholders, and anything unterminated
+literal_pattern = "|".join([string_pattern, placeholder_pattern, unterminated_pattern])
+# The characters that may start a quoted identifier, a comment or a literal,
+# which can hold any other characters, for the character classes of runs of text
+# that hold none of them. "-" comes last, as it can't go anywhere else in a class.
+opaque_starts = "'\"{/-"
+
+# Each pattern matches one whole token, so the scanner takes a single step per
+# token. Order matters: earlier patterns win, and multi-char operators come
+# before their single-char prefixes.
+token_patterns = [
+    (token.WHITESPACE, whitespace_pattern),
+    (token.IDENTIFIER, word_pattern),
+    (token.IDENTIFIER, quoted_identifier_pattern),
+    (token.STRING, string_pattern),
+    (token.PLACEHOLDER, placeholder_pattern),
+    (token.COMMENT_SINGLE, line_comment_pattern),
+    (token.COMMENT_MULTI, block_comment_pattern),
+    (token.ILLEGAL, unterminated_pattern),
+    (token.INTEGER, r"[0-9]+"),
+    (token.PIPEPIPE, r"\|\|"),
+    (token.COLONCOLON, r"::"),
+    (token.LTGT, r"<>"),
+    (token.LTEQUAL, r"<="),
+    (token.GTEQUAL, r">="),
+    (token.BANGEQUAL, r"!="),
+    (token.PLUS, r"\+"),
+    (token.SUBTRACT, r"-"),
+    (token.ASTERISK, r"\*"),
+    (token.SLASH, r"/"),
+    (token.PIPE, r"\|"),
+    (token.EQUAL, r"="),
+    (token.BANG, r"!"),
+    (token.LT, r"<"),
+    (token.GT, r">"),
+    (token.COMMA, r","),
+    (token.SEMICOLON, r";"),
+    (token.FULLSTOP, r"\."),
+    (token.COLON, r":"),
+    (token.LPAREN, r"\("),
+    (token.RPAREN, r"\)"),
+    (token.ILLEGAL, r"."),
+]
+
+_master_pattern = re.compile(
+    "|".join(f"({pattern})" for _, pattern in token_patterns), re.DOTALL
+)
+# Indexed by match.lastindex, so slot 0 is unused
+_group_token_types = (token.ILLEGAL, *(type_ for type_, _ in token_patterns))
+# Only unquoted identifiers may turn out to be keywords
+_keyword_group = 2
+
+
+@final
+class RegexLexer:
+    """
+    Produces the same token stream as Lexer, but matches each token with one
+    step of a compiled master regex instead of reading character by character.
+    """
+
+    def __init__(self, input: str, start: int = 0, end: Optional[int] = None):
+        self.input: str = input
+        self.pos: int = start
+        # Once the token at end has been lexed, only EOF follows
+        self.end: int = len(input) if end is None else end
+        self.lines = LineIndex(input)
+        # The offset of the right parenthesis of each left one found by skip(),
+        # by the offset of the left one. Shared by the lexers that relex parts
+        # of the input, which may be on other threads, but every one of them
+        # only ever stores the same value for an offset.
+        self.paren_ends: Dict[int, int] = {}
+
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
+        whitespace = []
+        while True:
+            t = self.next_token()
+            if t.type in _trivia_types:
+                whitespace.append(t)
+                continue
+            else:
+                return whitespace, t
+
+    def next_token(self) -> Token:
+        input = self.input
+        start = self.pos
+        if start > self.end:
+            return Token(token.EOF, input, start, start)
+        match = _master_pattern.match(input, start)
+        if match is None:
+            end = len(input)
+            return Token(token.EOF, input, end, end)
+
+        # Each token starts where the previous one ended, so tokens share
+        # their offset ints rather than allocating two each
+        end = match.end()
+        self.pos = end
+        # Never None, as every alternative of the pattern is a group
+        group = match.lastindex or 0
+        if group == _keyword_group and input[end : end + 1] != "(":
+            keyword = keyword_tokens.get(match.group().upper())
+            if keyword is not None:
+                return Token(keyword, input, start, end)
+        return Token(_group_token_types[group], input, start, end)
+
+    def position_of(self, offset: int) -> Position:
+        return self.lines.position_of(offset)
+
+    def skip(
+        self, pos: int, end_types: FrozenSet[int], open_paren: Optional[int] = None
+    ) -> int:
+        """
+        Go to the first token from pos on that is one of end_types outside of
+        parentheses, or a semicolon or the end of the input, without lexing
+        the tokens before it, and return its offset. open_paren is the offset
+        of a left parenthesis that pos is just inside of, if any.
+        """
+        end = skip_tokens(self.input, pos, end_types, self.paren_ends, open_paren)
+        self.pos = end
+        return end
+
+    def skip_literal_list(self, pos: int) -> Optional[int]:
+        """
+        If the tokens from pos on are integers, or strings, separated by commas
+        and followed by a right parenthesis, go past the parenthesis without
+        lexing them and return its offset. Otherwise return None.
+        """
+        input = self.input
+        match = _integer_list_pattern.match(input, pos)
+        if match is not None:
+            if not is_integer_list(input[pos : match.end() - 1]):
+                return None
+        else:
+            for pattern in _literal_list_patterns:
+                match = pattern.match(input, pos)
+                if match is not None:
+                    break
+            else:
+                return None
+        end = match.end()
+        self.pos = end
+        return end - 1
+
+    def relex(self, start: int, end: int) -> "RegexLexer":
+        """A lexer for the tokens from start up to and including the one at end."""
+        lexer = RegexLexer(self.input, start, end)
+        lexer.lines = self.lines
+        lexer.paren_ends = self.paren_ends
+        return lexer
+
+
+# Steps over text that a lazy parser skips, in the same tokens as
+# _master_pattern but only stopping at those that matter to skip_tokens(): words
+# that may be keywords, parentheses and semicolons. Runs of characters that
+# can't start one of them, or a token that could contain one, take one step.
+_skip_pattern = re.compile(
+    "[^A-Za-z_;()" + opaque_starts + "]+"
+    "|(" + word_pattern + ")"
+    "|" + quoted_identifier_pattern
+    + "|" + comment_pattern
+    + "|" + literal_pattern
+    + r"|(\()|(\))|(;)|.",
+    re.DOTALL,
+)
+
+
+_right_paren_types = frozenset([token.RPAREN])
+
+
+def skip_tokens(
+    input: str,
+    pos: int,
+    end_types: FrozenSet[int],
+    paren_ends: Optional[Dict[int, int]] = None,
+    open_paren: Optional[int] = None,
+) -> int:
+    """
+    The offset of the first token in input from pos on that is one of
+    end_types outside of parentheses, or a semicolon, or else the end of the
+    input. Gives the same result as going through the tokens one by one.
+
+    The right parenthesis of each left one that's found is recorded in
+    paren_ends, by their offsets, and parentheses already in it are stepped
+    over in one go. So skipping the clauses of subqueries nested in text that
+    was skipped before doesn't go through the text again. When pos is just
+    inside the left parenthesis at open_paren, its right parenthesis is
+    recorded too, and looked up if only a right parenthesis is in end_types.
+    """
+    if paren_ends is None:
+        paren_ends = {}
+    elif (
+        open_paren is not None
+        and open_paren in paren_ends
+        and end_types == _right_paren_types
+    ):
+        return paren_ends[open_paren]
+    match = _skip_pattern.match
+    depth = 0
+    # The offsets of the left parentheses not yet closed, innermost last
+    opened: List[int] = []
+    while True:
+        m = match(input, pos)
+        if m is None:
+            return len(input)
+        group = m.lastindex
+        if group == 1:
+            end = m.end()
+            if (
+                depth == 0
+                and keyword_tokens.get(m.group().upper()) in end_types
+                and input[end : end + 1] != "("
+            ):
+                return m.start()
+        elif group == 2:
+            start = m.start()
+            if start in paren_ends:
+                pos = paren_ends[start] + 1
+                continue
+            depth += 1
+            opened.append(start)
+        elif group == 3:
+            if depth == 0 and token.RPAREN in end_types:
+                if open_paren is not None:
+                    paren_ends[open_paren] = m.start()
+                return m.start()
+            depth -= 1
+            if opened:
+                paren_ends[opened.pop()] = m.start()
+        elif group == 4:
+            return m.start()
+        pos = m.end()
+
+
+# Integers or strings separated by commas, up to a right parenthesis, with
+# whitespace and comments anywhere between them. Each comment can only match
+# as the whole comment the lexer would find, so that backtracking can't match
+# what the lexer wouldn't.
+_list_trivia = r"(?:[ \n\t]|--[^\n]*(?![^\n])|/\*(?:[^*]|\*(?!/))*\*/)*"
+_list_separator = _list_trivia + "," + _list_trivia
+_literal_list_pattern = re.compile(
+    _list_trivia
+    + r"(?:[0-9]+(?:" + _list_separator + r"[0-9]+)*"
+    + r"|'[^']*'(?:" + _list_separator + r"'[^']*')*)"
+    + _list_trivia
+    + r"\)",
+    re.DOTALL,
+)
+# Patterns for the usual lists without comments, tried first as they're faster.
+# A repeated group keeps state for backtracking on each repeat, while a
+# repeated character class doesn't, so integer lists are matched by their
+# characters and then checked by is_integer_list().
+_integer_list_pattern = re.compile(r"[0-9, \t\n]*\)")
+_string_list_pattern = re.compile(r"'[^']*'(?:, '[^']*')*\)")
+_spaced_string_list_pattern = re.compile(
+    r"[ \t\n]*'[^']*'(?:[ \t\n]*,[ \t\n]*'[^']*')*[ \t\n]*\)"
+)
+# What's tried for a list that isn't only integers, in order
+_literal_list_patterns = (
+    _string_list_pattern,
+    _spaced_string_list_pattern,
+    _literal_list_pattern,
+)
+
+# The same tokens over UTF-8 bytes, except that an illegal character is matched
+# as a whole multi-byte sequence rather than as a single byte
+_utf8_char = rb"[\x00-\x7f]|[\xc0-\xdf][\x80-\xbf]|[\xe0-\xef][\x80-\xbf]{2}|[\xf0-\xf7][\x80-\xbf]{3}|."
+_byte_master_pattern = re.compile(
+    b"|".join(b"(" + pattern.encode() + b")" for _, pattern in token_patterns[:-1])
+    + b"|(" + _utf8_char + b")",
+    re.DOTALL,
+)
+# Mapped pages behind the lexer are released in chunks of this many bytes
+_release_chunk = 16 * 1024 * 1024
+
+
+@final
+class BytesLexer:
+    """
+    Lexes UTF-8 bytes, such as an mmap of a file, without decoding them.
+
+    Tokens are BytesTokens with byte offsets, and only decode their literal
+    when it is read. When lexing an mmap, pages that the lexer has moved past
+    are handed back to the OS, so resident memory stays bounded however large
+    the file is.
+    """
+
+    def __init__(self, input: Union[bytes, mmap.mmap]):
+        self.input = input
+        self.pos: int = 0
+        self.lines = LineIndex(input)
+        self.released: int = 0
+        self.madvise = getattr(input, "madvise", None)
+        # Only mmaps can release pages, so other inputs never reach this offset
+        self.release_at: int = _release_chunk if self.madvise else len(input) + 1
+
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
+        whitespace = []
+        while True:
+            t = self.next_token()
+            if t.type in _trivia_types:
+                whitespace.append(t)
+                continue
+            else:
+                return whitespace, t
+
+    def next_token(self) -> Token:
+        input = self.input
+        start = self.pos
+        match = _byte_master_pattern.match(input, start)
+        if match is None:
+            end = len(input)
+            return BytesToken(token.EOF, input, end, end)
+
+        end = match.end()
+        self.pos = end
+        if end >= self.release_at:
+            self.release_pages()
+        # Never None, as every alternative of the pattern is a group
+        group = match.lastindex or 0
+        if group == _keyword_group and input[end : end + 1] != b"(":
+            keyword = _byte_keyword_tokens.get(match.group().upper())
+            if keyword is not None:
+                return BytesToken(keyword, input, start, end)
+        return BytesToken(_group_token_types[group], input, start, end)
+
+    def position_of(self, offset: int) -> Position:
+        return self.lines.position_of(offset)
+
+    def release_pages(self) -> None:
+        if self.madvise is None:
+            return
+        release_to = self.pos - self.pos % mmap.PAGESIZE
+        self.madvise(mmap.MADV_DONTNEED, self.released, release_to - self.released)
+        self.released = release_to
+        self.release_at = release_to + _release_chunk
+
+
+@final
+class ReplayLexer:
+    """
+    Replays (whitespace, token) pairs that were lexed before, such as those of
+    a clause that a lazy parser skipped, followed by EOF tokens at the offset
+    of the last one.
+
+    Only pairs[start:stop] are replayed, so that the lazy parsers of clauses
+    and subqueries within them can share the list rather than copy out their
+    parts. The whitespace of the first pair is replaced with whitespace, if
+    given, for when it was taken by the node before.
+    """
+
+    def __init__(
+        self,
+        pairs: List[Tuple[List[Token], Token]],
+        lines: Optional[LineIndex] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        whitespace: Optional[List[Token]] = None,
+        paren_ends: Optional[Dict[int, int]] = None,
+    ):
+        self.pairs = pairs
+        # Of the next pair, which goes on past stop as EOFs are replayed
+        self.index = start
+        self.start = start
+        self.stop: int = len(pairs) if stop is None else stop
+        # The lines of the input the tokens came from, for errors
+        self.lines = lines
+        # The index in pairs of the right parenthesis of each left one, by the
+        # offset of the left one
+        self.paren_ends: Dict[int, int] = {} if paren_ends is None else paren_ends
+        last = pairs[self.stop - 1][1]
+        self.input: Union[str, bytes, mmap.mmap] = last.source
+        self.eof: Tuple[List[Token], Token] = (
+            [],
+            type(last)(token.EOF, last.source, last.end, last.end),
+        )
+        first = pairs[start] if start < self.stop else self.eof
+        self.first = first if whitespace is None else (whitespace, first[1])
+
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
+        index = self.index
+        self.index = index + 1
+        if index >= self.stop:
+            return self.eof
+        if index == self.start:
+            return self.first
+        return self.pairs[index]
+
+
+@contextmanager
+def mapped_file(path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Map a file read-only, for lexing with BytesLexer."""
+    with open(path, "rb") as f:
+        buffer: Optional[mmap.mmap]
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            buffer = None
+        # Yielding only outside the try, as mypyc loses track of a with's exit
+        # when a generator returns from an except inside it
+        if buffer is None:
+            yield b""
+        else:
+            with buffer:
+                if hasattr(buffer, "madvise"):
+                    buffer.madvise(mmap.MADV_SEQUENTIAL)
+                yield buffer
+
+
+def is_integer_list(text: str) -> bool:
+    """
+    Whether text, of only digits, commas and whitespace, is integers separated
+    by commas. String methods check the usual ", " separators much faster than
+    a regex can.
+    """
+    if text.count(" ") == text.count(", ") == text.count(","):
+        if "\t" not in text and "\n" not in text and ", ," not in text:
+            return text[:1].isdigit() and text[-1:].isdigit()
+    return all(item.strip().isdigit() for item in text.split(","))
+
+
 def is_letter(c: str) -> bool:
     return "a" <= c <= "z" or "A" <= c <= "Z"
 
@@ -172,6 +726,9 @@ def is_whitespace(c: str) -> bool:
     return c == " " or c == "\n" or c == "\t"
 
 
+# Read by lexers on any number of threads, and never changed after import. A
+# dict rather than a read-only MappingProxyType, which takes three times as
+# long per lookup.
 keyword_tokens = {
     "AES128": token.AES128,
     "AES256": token.AES256,
@@ -331,3 +888,7 @@ keyword_tokens = {
     "WITH": token.WITH,
     "WITHOUT": token.WITHOUT,
 }
+
+_byte_keyword_tokens = {
+    keyword.encode(): type_ for keyword, type_ in keyword_tokens.items()
+}
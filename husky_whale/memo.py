@@ -0,0 +1,82 @@
+"""
+An in-memory memo of parsed statements, for inputs such as query logs where
+the same texts come up again and again.
+
+Nodes are frozen, so a statement can be handed to any number of callers, as
+long as none of them changes the lists in its nodes in place. Texts
+that fail to parse are memoised too, and raise a new ParseError each time.
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Union
+
+from husky_whale import ast
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import ParseError, Parser
+
+
+class MemoStats(NamedTuple):
+    hits: int
+    misses: int
+    # Entries dropped to make room for newer ones
+    evictions: int
+    # Entries held now
+    size: int
+
+
+class ParseMemo:
+    """
+    Statements parsed from up to max_entries texts, dropping the least
+    recently used text once full. Safe to share between threads: a text missed
+    by two threads at once is parsed by both, and stored once.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Union[ast.Statement, ParseError]]" = (
+            OrderedDict()
+        )
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, text: str) -> ast.Statement:
+        entries = self.entries
+        with self.lock:
+            result = entries.get(text)
+            if result is not None:
+                entries.move_to_end(text)
+                self.hits += 1
+        if result is None:
+            try:
+                result = Parser(RegexLexer(text)).parse_statement()
+            except ParseError as error:
+                result = error
+            self.store(text, result)
+        if isinstance(result, ParseError):
+            # Raising the stored error would grow its traceback on every hit
+            raise ParseError(result.message, result.offset, result.lines)
+        return result
+
+    def store(self, text: str, result: Union[ast.Statement, ParseError]) -> None:
+        entries = self.entries
+        with self.lock:
+            self.misses += 1
+            entries[text] = result
+            entries.move_to_end(text)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> MemoStats:
+        with self.lock:
+            return MemoStats(self.hits, self.misses, self.evictions, len(self.entries))
+
+    def clear(self) -> None:
+        """Drop every entry and zero the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
@@ -0,0 +1,90 @@
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from husky_whale import ast
+from husky_whale.lexer import (
+    RegexLexer,
+    comment_pattern,
+    literal_pattern,
+    quoted_identifier_pattern,
+    opaque_starts,
+)
+from husky_whale.parser import ParseError, Parser
+from husky_whale.position import LineIndex
+
+# Finds each semicolon that ends a statement, stepping over everything the
+# lexer would read as a single token that can contain one. Unterminated forms
+# run to the end of the input, as they do in the lexer. Runs of characters that
+# can't start any of these are skipped in one step.
+_boundary_pattern = re.compile(
+    "[^;" + opaque_starts + "]+"
+    "|" + quoted_identifier_pattern
+    + "|" + comment_pattern
+    + "|" + literal_pattern
+    + "|(;)",
+    re.DOTALL,
+)
+# Chunks handed to each worker are at least this many characters long
+min_chunk_size = 256 * 1024
+
+
+def statement_boundaries(text: str) -> List[int]:
+    """The offset just after each semicolon that ends a statement in text."""
+    return [match.end() for match in _boundary_pattern.finditer(text) if match.group(1)]
+
+
+def parse_script_parallel(
+    text: str,
+    executor: Optional[Executor] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[Tuple[int, ast.ScriptStatement]]:
+    """
+    Parse a script like Parser.parse_script, but split at statement boundaries
+    into chunks that are parsed in parallel. Yields the offset of each
+    statement in text along with the statement, in order.
+
+    Chunks go to a new process pool unless an executor is given.
+    """
+    if executor is None:
+        with ProcessPoolExecutor() as executor:
+            yield from parse_script_parallel(text, executor, chunk_size)
+        return
+
+    boundaries = statement_boundaries(text)
+    if chunk_size is None:
+        # Several chunks per worker, so that uneven chunks still balance out
+        chunk_size = max(len(text) // ((os.cpu_count() or 1) * 4), min_chunk_size)
+    chunks = []
+    start = 0
+    for end in boundaries:
+        if end - start >= chunk_size:
+            chunks.append((start, end))
+            start = end
+    chunks.append((start, len(text)))
+
+    futures = [
+        executor.submit(_parse_chunk, text[start:end], start) for start, end in chunks
+    ]
+    # Each statement starts where the one before it ended
+    offsets = iter([0] + boundaries)
+    for future in futures:
+        try:
+            statements = future.result()
+        except ParseError as error:
+            for other in futures:
+                other.cancel()
+            raise ParseError(error.message, error.offset, LineIndex(text)) from None
+        for statement in statements:
+            yield next(offsets), statement
+
+
+def _parse_chunk(chunk: str, start: int) -> List[ast.ScriptStatement]:
+    try:
+        return list(Parser(RegexLexer(chunk)).parse_script())
+    except ParseError as error:
+        # The offset is made relative to the whole text, which the worker
+        # doesn't have the lines of
+        offset = None if error.offset is None else start + error.offset
+        raise ParseError(error.message, offset) from None
@@ -1,95 +1,638 @@
-from typing import Callable, List, Optional
+import re
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    FrozenSet,
+    Generator,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    final,
+)
 
 from husky_whale import ast
 from husky_whale import token
-from husky_whale.lexer import Lexer
+from husky_whale.ast import N
+from husky_whale.lexer import RegexLexer, ReplayLexer, TokenSource
+from husky_whale.position import LineIndex, Position
 from husky_whale.precedence import (
     ColumnExpressionPrecedence,
     TableExpressionPrecedence,
-    token_column_precedences,
-    token_table_precedences,
+    column_precedences,
+    table_precedences,
 )
 from husky_whale.token import Token
 
 
 class ParseError(Exception):
-    pass
+    """
+    A parse failure at an offset into the input. The offset is only converted
+    to a line and column when the error is shown.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        offset: Optional[int] = None,
+        lines: Optional[LineIndex] = None,
+    ):
+        super().__init__(message)
+        self.message = message
+        self.offset = offset
+        self.lines = lines
+
+    @property
+    def position(self) -> Optional[Position]:
+        if self.offset is None or self.lines is None:
+            return None
+        return self.lines.position_of(self.offset)
+
+    def __str__(self) -> str:
+        position = self.position
+        if position is None:
+            return self.message
+        return f"{self.message} at line {position.line}, column {position.column}"
+
+    def __reduce__(self):
+        return ParseError, (self.message, self.offset, self.lines)
+
+
+class ParseBudget(NamedTuple):
+    """
+    Limits on the work of parsing, for input that can't be trusted. Each is
+    checked once every _window_compact_size tokens, so may be passed by up to
+    that many tokens' worth before it's noticed.
+    """
+
+    # Tokens read by the parser, and by those of any lazy clauses it skipped
+    max_tokens: Optional[int] = None
+    # Operators, parentheses, function calls and subqueries left open around
+    # the current token
+    max_depth: Optional[int] = None
+    # Spent parsing, by the parser and by those of any lazy clauses it skipped,
+    # but not waiting between statements or before a clause is accessed
+    max_seconds: Optional[float] = None
+
+
+class ParseStats(NamedTuple):
+    tokens: int
+    depth: int
+    seconds: float
+
+
+class Skipped(NamedTuple):
+    """
+    A function that parses tokens a lazy parser skipped, and the Skipped for
+    those skipped before them, by the same parser or by the parsers that
+    skipped the tokens it parses.
+    """
+
+    parse: Callable[[], ast.Node]
+    before: Optional["Skipped"]
+
+
+# Named tuples made by compiled code are given the module of the nearest
+# interpreted caller, where pickle then can't find them
+for _named_tuple in (ParseBudget, ParseStats):
+    setattr(_named_tuple, "__module__", __name__)
+
+
+class BudgetExceeded(Exception):
+    """
+    Parsing went over one of the limits of a ParseBudget. Not a ParseError, so
+    a recovering parser doesn't carry on after it.
+    """
+
+    def __init__(
+        self,
+        limit: str,
+        stats: ParseStats,
+        offset: Optional[int] = None,
+        lines: Optional[LineIndex] = None,
+    ):
+        super().__init__(limit, stats)
+        # The name of the ParseBudget field that was gone over
+        self.limit = limit
+        # How far parsing had got
+        self.stats = stats
+        self.offset = offset
+        self.lines = lines
+
+    @property
+    def position(self) -> Optional[Position]:
+        if self.offset is None or self.lines is None:
+            return None
+        return self.lines.position_of(self.offset)
+
+    def __str__(self) -> str:
+        tokens, depth, seconds = self.stats
+        message = (
+            f"{self.limit} exceeded after {tokens} tokens, at depth {depth}, "
+            f"in {seconds:.3f} seconds"
+        )
+        position = self.position
+        if position is None:
+            return message
+        return f"{message} at line {position.line}, column {position.column}"
+
+    def __reduce__(self):
+        return BudgetExceeded, (self.limit, self.stats, self.offset, self.lines)
 
 
+# Consumed tokens are dropped from the window in batches of this size, which is
+# also how often a ParseBudget is checked
+_window_compact_size: Final = 64
+
+
+@final
 class Parser:
-    def __init__(self, lexer: Lexer):
+    def __init__(
+        self,
+        lexer: TokenSource,
+        recover: bool = False,
+        lazy: bool = False,
+        budget: Optional[ParseBudget] = None,
+    ):
+        if recover and lazy:
+            raise ValueError("a lazy parser can't recover from errors")
         self.lexer = lexer
-        self.current_whitespace: List[Token] = []
-        self.current_token: Token = Token(token.ILLEGAL, "")
-        self.peek_whitespace: List[Token] = []
-        self.peek_token: Token = Token(token.ILLEGAL, "")
-        # Fill current and peek values
-        self.next_token()
-        self.next_token()
+        # Limits to raise BudgetExceeded at, see check_budget()
+        self.budget = budget
+        # When the parser last started or carried on parsing, and the seconds
+        # spent parsing before then by it and the lazy parsers of its clauses,
+        # which share its budget. See count_time()
+        self.started = time.perf_counter()
+        self.elapsed = [0.0]
+        # Tokens counted so far by this parser and the lazy parsers of its
+        # clauses, which share its budget, and how many of this parser's own
+        # tokens that includes. See count_tokens()
+        self.counted = [0]
+        self.own_counted = 0
+        # How many expressions are left open around the current token
+        self.depth = 0
+        # Whether to carry on after an error, see parse_recovering()
+        self.recover = recover
+        # Whether to leave clauses to be parsed when accessed, see
+        # parse_lazy_select()
+        self.lazy = lazy
+        # The last tokens skipped by a lazy parser, see error()
+        self.skipped: Optional[Skipped] = None
+        # The errors recovered from, in order
+        self.errors: List[ParseError] = []
+        # The (whitespace, token) pairs lexed so far that may still be needed:
+        # the current token, any lookahead, and everything since the oldest mark
+        self.window: List[Tuple[List[Token], Token]] = [
+            lexer.next_whitespace_and_token(),
+            lexer.next_whitespace_and_token(),
+        ]
+        # Index of the current token in the window, and how many tokens have
+        # been dropped from its front
+        self.index = 0
+        self.dropped = 0
+        self.marks: List[int] = []
+        self.current_whitespace, self.current_token = self.window[0]
+        self.peek_whitespace, self.peek_token = self.window[1]
 
     def next_token(self) -> None:
-        self.current_whitespace, self.current_token = (
-            self.peek_whitespace,
-            self.peek_token,
+        index = self.index + 1
+        window = self.window
+        if index >= _window_compact_size:
+            # Every _window_compact_size tokens, whether or not the window is
+            # compacted
+            if self.budget is not None and index % _window_compact_size == 0:
+                self.check_budget()
+            if not self.marks:
+                del window[:index]
+                self.dropped += index
+                index = 0
+        if index + 1 == len(window):
+            window.append(self.lexer.next_whitespace_and_token())
+        self.index = index
+        self.current_whitespace, self.current_token = window[index]
+        self.peek_whitespace, self.peek_token = window[index + 1]
+
+    def restart_window(self, lexer: TokenSource) -> None:
+        """
+        Start the window again at the next token from lexer, which has skipped
+        past every token in it. The budget is checked here too, as the window
+        may never fill up far enough for next_token() to check it.
+        """
+        self.dropped += len(self.window)
+        self.window = [lexer.next_whitespace_and_token()]
+        self.index = -1
+        self.next_token()
+        if self.budget is not None:
+            self.check_budget()
+
+    def peek(self, k: int = 1) -> Token:
+        """The token k tokens after the current one, lexing ahead as needed."""
+        window = self.window
+        while self.index + k >= len(window):
+            window.append(self.lexer.next_whitespace_and_token())
+        return window[self.index + k][1]
+
+    def mark(self) -> int:
+        """
+        Remember the current position, so that a speculative parse can go back
+        to it with reset() without lexing again. Every mark must be passed to
+        either reset() or release().
+        """
+        position = self.dropped + self.index
+        self.marks.append(position)
+        return position
+
+    def reset(self, mark: int) -> None:
+        """Go back to the position of mark, and release it."""
+        self.release(mark)
+        self.index = mark - self.dropped
+        self.current_whitespace, self.current_token = self.window[self.index]
+        self.peek_whitespace, self.peek_token = self.window[self.index + 1]
+
+    def release(self, mark: int) -> None:
+        """Forget mark, keeping the current position."""
+        self.marks.remove(mark)
+
+    def stats(self) -> ParseStats:
+        """How far parsing has got."""
+        return ParseStats(
+            # Up to and including the current token
+            tokens=self.counted[0] + self.dropped + self.index + 1 - self.own_counted,
+            depth=self.depth,
+            seconds=self.elapsed[0] + time.perf_counter() - self.started,
+        )
+
+    def count_tokens(self) -> None:
+        """Add the tokens read since the last call to those counted."""
+        tokens = self.dropped + self.index + 1
+        self.counted[0] += tokens - self.own_counted
+        self.own_counted = tokens
+
+    def count_time(self) -> None:
+        """
+        Add the time since parsing last started or carried on to that counted,
+        and carry on counting from now. Called before the parser stops, as the
+        time until it carries on again isn't spent parsing.
+        """
+        now = time.perf_counter()
+        self.elapsed[0] += now - self.started
+        self.started = now
+
+    def lazy_parser(self, lexer: TokenSource) -> "Parser":
+        """
+        A lazy parser for a clause that this parser skipped, sharing its
+        budget: seconds and tokens are counted along with this parser's and
+        those of other clauses parsed before.
+        """
+        self.count_tokens()
+        parser = Parser(lexer, lazy=True, budget=self.budget)
+        parser.elapsed = self.elapsed
+        parser.counted = self.counted
+        return parser
+
+    def check_budget(self) -> None:
+        """Raise BudgetExceeded if parsing has gone over any limit of budget."""
+        budget = self.budget
+        if budget is None:
+            return
+        stats = self.stats()
+        for limit, maximum, value in (
+            ("max_tokens", budget.max_tokens, stats.tokens),
+            ("max_depth", budget.max_depth, stats.depth),
+            ("max_seconds", budget.max_seconds, stats.seconds),
+        ):
+            if maximum is not None and value > maximum:
+                raise BudgetExceeded(
+                    limit, stats, self.current_token.start, self.lexer.lines
+                )
+
+    def error(self, message: str) -> ParseError:
+        """
+        A ParseError at the current token.
+
+        A lazy parser first parses the tokens of the statement skipped before
+        the current one, which an eager parser would have parsed already, so
+        that an error in them is raised instead, as it would have been.
+        """
+        skipped = []
+        before = self.skipped
+        while before is not None:
+            skipped.append(before.parse)
+            before = before.before
+        for parse in reversed(skipped):
+            # Parses any fields of the node left to parse too
+            parse().original_string()
+        return ParseError(message, self.current_token.start, self.lexer.lines)
+
+    def unexpected_token(self) -> ParseError:
+        """A ParseError for the current token, which can't come where it is."""
+        return self.error(f"unexpected token {self.current_token_name()}")
+
+    def current_token_name(self) -> str:
+        return token.type_names[self.current_token.type]
+
+    def expect(self, *types: int) -> None:
+        """Raise a ParseError unless the current token is one of types."""
+        if self.current_token.type not in types:
+            expected = " or ".join(token.type_names[type_] for type_ in types)
+            raise self.error(f"expected {expected}, got {self.current_token_name()}")
+
+    def parse_recovering(
+        self, parse_fn: Callable[["Parser"], N], sync_types: FrozenSet[int]
+    ) -> N:
+        """
+        Parse with parse_fn, which may fail.
+
+        When recovering from errors, a failure is recorded in errors, and the
+        tokens from where parse_fn started up to the next one of sync_types
+        outside of parentheses are skipped and returned as an ast.Error instead.
+        Only the first error recorded since then is kept, as any after it are
+        likely to have been caused by it. Otherwise the failure is raised.
+        """
+        if not self.recover:
+            return parse_fn(self)
+        state = self.start_recovering()
+        try:
+            node = parse_fn(self)
+        except ParseError as error:
+            # The Error stands in for whichever node failed to parse
+            return cast(N, self.recovered(state, error, sync_types))
+        self.release(state[2])
+        return node
+
+    def start_recovering(self) -> Tuple[int, List[Token], int, int, int]:
+        """
+        What recovered() needs to go back to the current position: its offset,
+        whitespace, mark, number of errors and depth. The mark must be released
+        if recovered() isn't called.
+        """
+        # Going back to the mark restores whitespace that may already have been
+        # taken
+        return (
+            self.current_token.start,
+            self.current_whitespace,
+            self.mark(),
+            len(self.errors),
+            self.depth,
         )
-        self.peek_whitespace, self.peek_token = self.lexer.next_whitespace_and_token()
+
+    def recovered(
+        self,
+        state: Tuple[int, List[Token], int, int, int],
+        error: ParseError,
+        sync_types: FrozenSet[int],
+    ) -> ast.Error:
+        """Record error, and skip from the position of state as parse_recovering()."""
+        start, whitespace, mark, errors, depth = state
+        self.reset(mark)
+        # Anything left open by parse_fn is closed by skipping it
+        self.depth = depth
+        self.current_whitespace = whitespace
+        if len(self.errors) > errors:
+            error = self.errors[errors]
+            del self.errors[errors:]
+        self.errors.append(error)
+        # A clause keyword that parse_fn got past isn't the place to carry on
+        # from, but one that it failed at is
+        return self.parse_error(sync_types, error.offset != start)
+
+    def parse_error(
+        self, sync_types: FrozenSet[int], skip_first: bool = False
+    ) -> ast.Error:
+        """
+        Skip tokens up to the next one of sync_types that isn't inside
+        parentheses, or the end of the statement. If a parenthesis is left
+        open at the end, it's skipped only up to the first one of sync_types
+        instead.
+        """
+        preceding = self.parse_whitespace()
+        parts: List[str] = []
+        depth = 0
+        # Where the first of sync_types inside parentheses was, and how many
+        # parts had been skipped before it
+        fallback: Optional[Tuple[int, int]] = None
+        while True:
+            type_ = self.current_token.type
+            if type_ in _statement_end_types:
+                break
+            if type_ in sync_types and (parts or not skip_first):
+                if depth == 0:
+                    break
+                if fallback is None:
+                    fallback = (self.mark(), len(parts))
+            if type_ == token.LPAREN:
+                depth += 1
+            elif type_ == token.RPAREN and depth:
+                depth -= 1
+            parts.extend(w.literal for w in self.current_whitespace)
+            parts.append(self.current_token.literal)
+            self.next_token()
+        if fallback is not None:
+            mark, skipped = fallback
+            if depth:
+                self.reset(mark)
+                del parts[skipped:]
+            else:
+                self.release(mark)
+        return ast.Error(preceding=preceding, literal="".join(parts), trailing=[])
 
     def current_token_is(self, *types):
-        return any(self.current_token.type == type_ for type_ in types)
+        return self.current_token.type in types
 
     def peek_token_is(self, *types):
-        return any(self.peek_token.type == type_ for type_ in types)
+        return self.peek_token.type in types
 
-    def current_column_precedence(self) -> ColumnExpressionPrecedence:
-        return token_column_precedences.get(
-            self.current_token.type, ColumnExpressionPrecedence.LOWEST
-        )
+    def current_column_precedence(self) -> int:
+        return column_precedences[self.current_token.type]
 
-    def peek_column_precedence(self) -> ColumnExpressionPrecedence:
-        return token_column_precedences.get(
-            self.peek_token.type, ColumnExpressionPrecedence.LOWEST
-        )
+    def peek_column_precedence(self) -> int:
+        return column_precedences[self.peek_token.type]
 
     def parse_whitespace(self) -> List[str]:
         w = [w.literal for w in self.current_whitespace]
         self.current_whitespace = []
         return w
 
+    def append_trailing(self, node: N) -> N:
+        """
+        Attach the whitespace before the current token to the end of node.
+
+        The node must be one that this parser has just built and not yet handed
+        out, since it is finished in place rather than copied.
+        """
+        whitespace = self.parse_whitespace()
+        if not whitespace:
+            return node
+        object.__setattr__(node, "trailing", node.trailing + whitespace)
+        return node
+
     def parse_statement(self) -> ast.Statement:
-        return self.parse_select()
+        """
+        Parse a statement, which must be followed by a semicolon or the end of
+        the input. A recovering parser leaves any other tokens after it for the
+        caller, as parse_script() skips them into a statement of their own.
+        """
+        if self.recover and self.current_token.type != token.SELECT:
+            self.errors.append(self.unexpected_token())
+            error = self.append_trailing(self.parse_error(frozenset()))
+            return cast(ast.Statement, error)
+        # Only the tokens skipped of this statement are parsed before an error,
+        # as earlier statements have been handed out on their own
+        self.skipped = None
+        statement = self.parse_select()
+        if not self.recover and self.current_token.type not in _statement_end_types:
+            raise self.unexpected_token()
+        return statement
+
+    def parse_script(self) -> Iterator[ast.ScriptStatement]:
+        """
+        Parse statements separated by semicolons up to the end of the input,
+        yielding each one as soon as it has been parsed.
+
+        Together the yielded nodes reproduce the whole input, including any
+        whitespace after the last statement. Only the tokens of the current
+        statement are held, so a script of any size parses in constant memory
+        when the lexer reads from an mmap.
+        """
+        while True:
+            if self.current_token.type == token.EOF:
+                preceding = self.parse_whitespace()
+                if preceding:
+                    yield ast.ScriptStatement(
+                        preceding=preceding,
+                        statement=None,
+                        semicolon=None,
+                        trailing=[],
+                    )
+                return
+
+            statement = None
+            if self.current_token.type != token.SEMICOLON:
+                statement = self.parse_statement()
+
+            if self.current_token.type not in _statement_end_types:
+                error = self.unexpected_token()
+                if not self.recover:
+                    raise error
+                # The rest of the statement is yielded on its own
+                self.count_time()
+                yield ast.ScriptStatement(
+                    preceding=[], statement=statement, semicolon=None, trailing=[]
+                )
+                self.started = time.perf_counter()
+                self.errors.append(error)
+                statement = cast(
+                    ast.Statement, self.append_trailing(self.parse_error(frozenset()))
+                )
+
+            if self.current_token.type == token.SEMICOLON:
+                semicolon = self.parse_keyword()
+            else:
+                semicolon = None
+
+            # The caller's time with the statement isn't counted
+            self.count_time()
+            yield ast.ScriptStatement(
+                preceding=[], statement=statement, semicolon=semicolon, trailing=[]
+            )
+            if semicolon is None:
+                return
+            self.started = time.perf_counter()
 
     def parse_select(self) -> ast.Select:
+        if self.lazy:
+            return self.parse_lazy_select()
+        return self.run_steps(self.select_steps())
+
+    def run_steps(self, steps: Generator[Any, Any, N]) -> N:
+        """
+        Run steps, a generator that yields each parse that may nest to any
+        depth rather than calling it, as another generator. Each is run in
+        turn, and the node it returns is sent back, or what it raised thrown
+        in. They wait on a stack, so that subqueries don't recurse.
+        """
+        stack = [steps]
+        node: Any = None
+        error: Optional[Exception] = None
+        while True:
+            try:
+                if error is None:
+                    nested = stack[-1].send(node)
+                else:
+                    raised, error = error, None
+                    nested = stack[-1].throw(raised)
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                node = stop.value
+                continue
+            except Exception as raised:
+                stack.pop()
+                if not stack:
+                    raise
+                error = raised
+                continue
+            stack.append(nested)
+            node = None
+
+    def recovering_steps(
+        self, steps: Generator[Any, Any, N], sync_types: FrozenSet[int]
+    ) -> Generator[Any, Any, N]:
+        """parse_recovering() for steps, as run by run_steps()."""
+        if not self.recover:
+            return (yield steps)
+        state = self.start_recovering()
+        try:
+            node = yield steps
+        except ParseError as error:
+            return cast(N, self.recovered(state, error, sync_types))
+        self.release(state[2])
+        return node
+
+    def select_steps(self) -> Generator[Any, Any, ast.Select]:
         preceding = self.parse_whitespace()
 
-        assert self.current_token.type == token.SELECT
+        self.expect(token.SELECT)
         select = self.parse_keyword()
 
-        results = self.parse_results_clause()
-        from_ = (
-            self.parse_from_clause() if self.current_token.type == token.FROM else None
-        )
+        # Each clause is skipped on its own when recovering from errors
+        recovering = self.parse_recovering
+        results = recovering(Parser.parse_results_clause, _clause_sync_types)
+        from_ = None
+        if self.current_token.type == token.FROM:
+            from_ = yield self.recovering_steps(
+                self.from_clause_steps(), _clause_sync_types
+            )
         where = (
-            self.parse_where_clause()
+            recovering(Parser.parse_where_clause, _clause_sync_types)
             if self.current_token.type == token.WHERE
             else None
         )
         group_by = (
-            self.parse_group_by_clause()
+            recovering(Parser.parse_group_by_clause, _clause_sync_types)
             if self.current_token.type == token.GROUP
             else None
         )
         having = (
-            self.parse_having_clause()
+            recovering(Parser.parse_having_clause, _clause_sync_types)
             if self.current_token.type == token.HAVING
             else None
         )
         order_by = (
-            self.parse_order_by_clause()
+            recovering(Parser.parse_order_by_clause, _clause_sync_types)
             if self.current_token.type == token.ORDER
             else None
         )
         limit = (
-            self.parse_limit_clause()
+            recovering(Parser.parse_limit_clause, _clause_sync_types)
             if self.current_token.type == token.LIMIT
             else None
         )
@@ -109,11 +652,256 @@ class Parser:
             trailing=trailing,
         )
 
+    def parse_lazy_select(self) -> ast.Select:
+        """
+        Parse a SELECT, but only skip over the tokens of each clause apart from
+        FROM, and parse them when the clause is first accessed. Subqueries are
+        parsed the same way. Errors in a skipped clause are raised when it is
+        accessed, or here when the tokens after it don't parse either, as the
+        same error that an eager parse raises: see error().
+
+        FROM is parsed straight away, as it is what most analyses look at.
+        """
+        preceding = self.parse_whitespace()
+
+        self.expect(token.SELECT)
+        select = self.parse_keyword()
+
+        pending = {
+            "results": self.skip_lazily(
+                Parser.parse_results_clause, _clause_end_types, skip_first=False
+            )
+        }
+        from_ = (
+            self.parse_from_clause()
+            if self.current_token.type == token.FROM
+            else None
+        )
+        # Every clause but FROM is left unset by ast.lazy()
+        clauses: Dict[str, Any] = {"results": None}
+        for field, type_, parse_fn in _lazy_clauses:
+            if self.current_token.type == type_:
+                pending[field] = self.skip_lazily(parse_fn, _clause_end_types)
+            clauses[field] = None
+
+        trailing = self.parse_whitespace()
+
+        statement = ast.Select(
+            preceding=preceding,
+            select=select,
+            from_=from_,
+            **clauses,
+            trailing=trailing,
+        )
+        # Before any of the clauses can be parsed
+        self.count_time()
+        return ast.lazy(statement, pending)
+
+    def skip_lazily(
+        self,
+        parse_fn: Callable[["Parser"], ast.Node],
+        end_types: FrozenSet[int],
+        skip_first: bool = True,
+        open_paren: Optional[int] = None,
+    ) -> Callable[[], ast.Node]:
+        """
+        Skip tokens up to the next one of end_types that isn't inside
+        parentheses, or the end of the statement, and return a function that
+        parses them with parse_fn. open_paren is the offset of the left
+        parenthesis that the tokens are just inside of, for a subquery.
+
+        The whitespace before the token skipped to is taken too, as parse_fn
+        would have taken it. The function raises a ParseError if parse_fn
+        doesn't parse all of the tokens.
+
+        Where each parenthesis skipped over ends is kept for the lazy parsers
+        of the tokens, so that they step over nested subqueries in one go
+        rather than skip the same tokens again at every level.
+        """
+        lexer = self.lexer
+        if not self.marks and len(self.window) == self.index + 2:
+            if isinstance(lexer, RegexLexer):
+                return self.skip_text_lazily(
+                    lexer, parse_fn, end_types, skip_first, open_paren
+                )
+            if isinstance(lexer, ReplayLexer):
+                return self.skip_replay_lazily(
+                    lexer, parse_fn, end_types, skip_first, open_paren
+                )
+
+        pairs: List[Tuple[List[Token], Token]] = []
+        # The index in pairs of the right parenthesis of each left one, by the
+        # offset of the left one, and those of the left ones not yet closed
+        paren_ends: Dict[int, int] = {}
+        opened: List[int] = []
+        depth = 0
+        while True:
+            type_ = self.current_token.type
+            if type_ in _statement_end_types:
+                break
+            if depth == 0 and type_ in end_types and (pairs or not skip_first):
+                break
+            if type_ == token.LPAREN:
+                depth += 1
+                opened.append(self.current_token.start)
+            elif type_ == token.RPAREN:
+                depth -= 1
+                if opened:
+                    paren_ends[opened.pop()] = len(pairs)
+            pairs.append((self.current_whitespace, self.current_token))
+            self.next_token()
+        end = self.current_token
+        pairs.append((self.current_whitespace, end))
+        self.current_whitespace = []
+        lines = lexer.lines
+        # Kept only to share a budget with, as it holds on to its window
+        parent = self if self.budget is not None else None
+        before = self.skipped
+
+        def parse() -> ast.Node:
+            replay = ReplayLexer(pairs, lines, paren_ends=paren_ends)
+            if parent is None:
+                parser = Parser(replay, lazy=True)
+            else:
+                parser = parent.lazy_parser(replay)
+            parser.skipped = before
+            try:
+                node = parse_fn(parser)
+            finally:
+                parser.count_tokens()
+                parser.count_time()
+            if parser.current_token is not end:
+                raise parser.unexpected_token()
+            return node
+
+        self.skipped = Skipped(parse, before)
+        return parse
+
+    def skip_text_lazily(
+        self,
+        lexer: RegexLexer,
+        parse_fn: Callable[["Parser"], ast.Node],
+        end_types: FrozenSet[int],
+        skip_first: bool,
+        open_paren: Optional[int],
+    ) -> Callable[[], ast.Node]:
+        """
+        skip_lazily() for the parser's lexer, a RegexLexer, which can skip over
+        text without lexing it and lex it again later. Only the offsets of the
+        tokens are kept.
+        """
+        whitespace = self.current_whitespace
+        start = whitespace[0].start if whitespace else self.current_token.start
+        # Kept only to share a budget with, as it holds on to its window
+        parent = self if self.budget is not None else None
+        before = self.skipped
+        end = lexer.skip(
+            self.current_token.end if skip_first else self.current_token.start,
+            end_types,
+            open_paren,
+        )
+        # The lexer has moved past any tokens in the window, which start again
+        # from the one at end
+        self.restart_window(lexer)
+
+        def parse() -> ast.Node:
+            relexer = lexer.relex(start, end)
+            if parent is None:
+                parser = Parser(relexer, lazy=True)
+            else:
+                parser = parent.lazy_parser(relexer)
+            parser.skipped = before
+            try:
+                node = parse_fn(parser)
+            finally:
+                parser.count_tokens()
+                parser.count_time()
+            if parser.current_token.start != end:
+                raise parser.unexpected_token()
+            return node
+
+        self.skipped = Skipped(parse, before)
+        return parse
+
+    def skip_replay_lazily(
+        self,
+        lexer: ReplayLexer,
+        parse_fn: Callable[["Parser"], ast.Node],
+        end_types: FrozenSet[int],
+        skip_first: bool,
+        open_paren: Optional[int],
+    ) -> Callable[[], ast.Node]:
+        """
+        skip_lazily() for the parser's lexer, a ReplayLexer, whose tokens are
+        already in a list. Only the range of them is kept, and parentheses are
+        stepped over to the right ones that the parser which listed them found.
+        """
+        pairs = lexer.pairs
+        paren_ends = lexer.paren_ends
+        stop = lexer.stop
+        # The index of the current token, the last but one replayed
+        start = lexer.index - 2
+        whitespace = self.current_whitespace
+        end = -1
+        if open_paren is not None and end_types == _subquery_end_types:
+            end = paren_ends.get(open_paren, -1)
+        if end == -1:
+            end = start
+            depth = 0
+            while end < stop:
+                current = pairs[end][1]
+                type_ = current.type
+                if type_ in _statement_end_types:
+                    break
+                if depth == 0 and type_ in end_types:
+                    if end > start or not skip_first:
+                        break
+                if type_ == token.LPAREN:
+                    close = paren_ends.get(current.start, stop)
+                    if close < stop:
+                        end = close + 1
+                        continue
+                    depth += 1
+                elif type_ == token.RPAREN:
+                    depth -= 1
+                end += 1
+        end_token = pairs[end][1] if end < stop else lexer.eof[1]
+        lines = lexer.lines
+        # Kept only to share a budget with, as it holds on to its window
+        parent = self if self.budget is not None else None
+        before = self.skipped
+        # The replay carries on from the token at end, whose whitespace is
+        # taken along with the tokens before it
+        lexer.index = end
+        self.restart_window(lexer)
+        self.current_whitespace = []
+
+        def parse() -> ast.Node:
+            replay = ReplayLexer(
+                pairs, lines, start, min(end + 1, stop), whitespace, paren_ends
+            )
+            if parent is None:
+                parser = Parser(replay, lazy=True)
+            else:
+                parser = parent.lazy_parser(replay)
+            parser.skipped = before
+            try:
+                node = parse_fn(parser)
+            finally:
+                parser.count_tokens()
+                parser.count_time()
+            if parser.current_token.start != end_token.start:
+                raise parser.unexpected_token()
+            return node
+
+        self.skipped = Skipped(parse, before)
+        return parse
+
     def parse_keyword(self) -> ast.Keyword:
         preceding = self.parse_whitespace()
         keyword = ast.Keyword(
             preceding=preceding,
-            keyword=self.current_token.type,
+            keyword=token.type_names[self.current_token.type],
             literal=self.current_token.literal,
             trailing=[],
         )
@@ -125,8 +913,7 @@ class Parser:
         expressions = []
         while True:
             expression = self.parse_column_expression()
-            trailing = self.parse_whitespace()
-            expression = expression.replace(dict(trailing=trailing))
+            expression = self.append_trailing(expression)
             expressions.append(expression)
             if self.current_token_is(token.COMMA):
                 self.next_token()
@@ -139,12 +926,15 @@ class Parser:
         )
 
     def parse_from_clause(self) -> ast.FromClause:
+        return self.run_steps(self.from_clause_steps())
+
+    def from_clause_steps(self) -> Generator[Any, Any, ast.FromClause]:
         preceding = self.parse_whitespace()
 
-        assert self.current_token.type == token.FROM
+        self.expect(token.FROM)
         from_ = self.parse_keyword()
 
-        expression = self.parse_table_expression()
+        expression = yield self.table_expression_steps()
 
         trailing = self.parse_whitespace()
         # self.next_token()
@@ -155,7 +945,7 @@ class Parser:
     def parse_where_clause(self) -> ast.WhereClause:
         preceding = self.parse_whitespace()
 
-        assert self.current_token.type == token.WHERE
+        self.expect(token.WHERE)
         where = self.parse_keyword()
 
         expression = self.parse_column_expression()
@@ -166,15 +956,14 @@ class Parser:
 
     def parse_group_by_clause(self) -> ast.GroupByClause:
         preceding = self.parse_whitespace()
-        assert self.current_token.type == token.GROUP
+        self.expect(token.GROUP)
         group = self.parse_keyword()
-        assert self.current_token.type == token.BY
+        self.expect(token.BY)
         by = self.parse_keyword()
         expressions = []
         while True:
             expression = self.parse_column_expression()
-            trailing = self.parse_whitespace()
-            expression = expression.replace(dict(trailing=trailing))
+            expression = self.append_trailing(expression)
             expressions.append(expression)
             if self.current_token_is(token.COMMA):
                 self.next_token()
@@ -193,7 +982,7 @@ class Parser:
     def parse_having_clause(self) -> ast.HavingClause:
         preceding = self.parse_whitespace()
 
-        assert self.current_token.type == token.HAVING
+        self.expect(token.HAVING)
         having = self.parse_keyword()
 
         expression = self.parse_column_expression()
@@ -207,15 +996,14 @@ class Parser:
 
     def parse_order_by_clause(self) -> ast.OrderByClause:
         preceding = self.parse_whitespace()
-        assert self.current_token.type == token.ORDER
+        self.expect(token.ORDER)
         order = self.parse_keyword()
-        assert self.current_token.type == token.BY
+        self.expect(token.BY)
         by = self.parse_keyword()
         expressions = []
         while True:
             expression = self.parse_column_expression()
-            trailing = self.parse_whitespace()
-            expression = expression.replace(dict(trailing=trailing))
+            expression = self.append_trailing(expression)
             expressions.append(expression)
             if self.current_token_is(token.COMMA):
                 self.next_token()
@@ -234,173 +1022,343 @@ class Parser:
     def parse_limit_clause(self) -> ast.LimitClause:
         preceding = self.parse_whitespace()
 
-        assert self.current_token.type == token.LIMIT
+        self.expect(token.LIMIT)
         limit = self.parse_keyword()
 
         expression = self.parse_column_expression()
         trailing = self.parse_whitespace()
-        self.next_token()
         return ast.LimitClause(
             preceding=preceding, limit=limit, expression=expression, trailing=trailing,
         )
 
     # Pratt parser algorithm
     def parse_column_expression(
-        self, precedence: ColumnExpressionPrecedence = ColumnExpressionPrecedence.LOWEST
+        self, precedence: int = ColumnExpressionPrecedence.LOWEST
     ) -> ast.ColumnExpression:
-        prefix_fn = self.column_prefix_parse_fn(self.current_token.type)
-        if not prefix_fn:
-            raise ParseError(
-                f"no prefix parse function for token {self.current_token.type}"
-            )
-
-        left_exp = prefix_fn()
-
-        while (
-            self.current_token.type != token.EOF
-            and precedence.value < self.current_column_precedence().value
-        ):
-            infix_fn = self.column_infix_parse_fn(self.current_token.type)
-            if not infix_fn:
-                return left_exp
-            left_exp = infix_fn(left_exp)
-        return left_exp
-
-    def parse_column_prefix_expression(self) -> ast.ColumnPrefixExpression:
-        preceding = self.parse_whitespace()
-        operator = self.parse_keyword()
-        return ast.ColumnPrefixExpression(
-            preceding=preceding,
-            operator=operator,
-            right=self.parse_column_expression(ColumnExpressionPrecedence.PREFIX),
-            trailing=[],
-        )
-
-    def parse_column_infix_expression(
-        self, left_exp: ast.ColumnExpression
-    ) -> ast.ColumnInfixExpression:
-        precedence = self.current_column_precedence()
-        operator = self.parse_keyword()
-        expression = ast.ColumnInfixExpression(
-            preceding=[],
-            left=left_exp,
-            operator=operator,
-            right=self.parse_column_expression(precedence),
-            trailing=[],
-        )
-        return expression
-
-    def parse_column_group_expression(self) -> ast.ColumnGroupExpression:
+        """
+        Parse a column expression that binds tighter than precedence.
+
+        Prefix and infix operators, groups, BETWEEN, function calls and IN
+        lists have no parse functions, but a kind in the dispatch tables, and
+        are parsed here. Each waits on a stack for the expression to its right,
+        or for the next item of its list, so that deeply nested expressions
+        don't recurse.
+        """
+        return self.parse_column_frames(precedence, [])
+
+    def parse_column_frames(
+        self, precedence: int, frames: List[Tuple[int, int, Any, Any, Any]]
+    ) -> ast.ColumnExpression:
+        """
+        Parse a column expression that binds tighter than precedence, and finish
+        those waiting on frames with it, for parse_column_expression().
+
+        frames holds the (kind, precedence to go back to, two values from the
+        start of the expression, and the state to recover to if it's a group or
+        an item of a list that can recover) of each expression waiting,
+        innermost last.
+        """
+        precedences = column_precedences
+        prefix_parse_fns = column_prefix_parse_fns
+        infix_parse_fns = column_infix_parse_fns
+        left_exp: Optional[ast.ColumnExpression] = None
+        while True:
+            try:
+                if left_exp is None:
+                    prefix_fn = prefix_parse_fns[self.current_token.type]
+                    if isinstance(prefix_fn, int):
+                        preceding = self.parse_whitespace()
+                        self.depth += 1
+                        if prefix_fn == _PREFIX:
+                            operator = self.parse_keyword()
+                            frames.append(
+                                (_PREFIX, precedence, preceding, operator, None)
+                            )
+                            precedence = ColumnExpressionPrecedence.PREFIX
+                            continue
+                        # A group
+                        self.next_token()
+                        state = self.start_recovering() if self.recover else None
+                        frames.append((_GROUP, precedence, preceding, None, state))
+                        precedence = ColumnExpressionPrecedence.LOWEST
+                        continue
+                    if prefix_fn is None:
+                        raise self.error(
+                            "no prefix parse function for token "
+                            f"{self.current_token_name()}"
+                        )
+                    left_exp = prefix_fn(self)
+
+                # EOF has the lowest precedence, so it always ends the loop
+                type_ = self.current_token.type
+                if precedence < precedences[type_]:
+                    infix_fn = infix_parse_fns[type_]
+                    if infix_fn == _INFIX:
+                        operator = self.parse_keyword()
+                        frames.append((_INFIX, precedence, left_exp, operator, None))
+                        self.depth += 1
+                        precedence = precedences[type_]
+                        left_exp = None
+                        continue
+                    if infix_fn == _BETWEEN:
+                        between = self.parse_keyword()
+                        frames.append((_BETWEEN, precedence, left_exp, between, None))
+                        self.depth += 1
+                        precedence = precedences[type_]
+                        left_exp = None
+                        continue
+                    if infix_fn == _CALL:
+                        # Whitespace before the parenthesis belongs to the
+                        # function name
+                        function = cast(
+                            ast.ColumnIdentifier, self.append_trailing(left_exp)
+                        )
+                        self.next_token()
+                        if self.current_token.type == token.RPAREN:
+                            self.next_token()
+                            left_exp = ast.ColumnCallExpression(
+                                preceding=[],
+                                function=function,
+                                arguments=[],
+                                trailing=[],
+                            )
+                            continue
+                        self.depth += 1
+                        state = self.start_recovering() if self.recover else None
+                        frames.append((_CALL, precedence, function, [], state))
+                        precedence = ColumnExpressionPrecedence.LOWEST
+                        left_exp = None
+                        continue
+                    if infix_fn == _LIST:
+                        in_ = self.parse_keyword()
+                        values = self.parse_column_literal_list()
+                        if values is not None:
+                            left_exp = ast.ColumnInExpression(
+                                preceding=[],
+                                left=left_exp,
+                                in_=in_,
+                                values=values,
+                                trailing=[],
+                            )
+                            continue
+                        preceding = self.parse_whitespace()
+                        self.next_token()
+                        self.depth += 1
+                        state = self.start_recovering() if self.recover else None
+                        in_list = (left_exp, in_, preceding)
+                        frames.append((_LIST, precedence, in_list, [], state))
+                        precedence = ColumnExpressionPrecedence.LOWEST
+                        left_exp = None
+                        continue
+                    if callable(infix_fn):
+                        left_exp = infix_fn(self, left_exp)
+                        continue
+
+                if not frames:
+                    return left_exp
+                kind, precedence, first, second, state = frames.pop()
+                self.depth -= 1
+                if kind == _INFIX:
+                    left_exp = ast.ColumnInfixExpression(
+                        preceding=[],
+                        left=first,
+                        operator=second,
+                        right=left_exp,
+                        trailing=[],
+                    )
+                elif kind == _PREFIX:
+                    left_exp = ast.ColumnPrefixExpression(
+                        preceding=first, operator=second, right=left_exp, trailing=[],
+                    )
+                elif kind == _GROUP:
+                    if state is not None:
+                        self.release(state[2])
+                    self.expect(token.RPAREN)
+                    expression = self.append_trailing(left_exp)
+                    self.next_token()
+                    left_exp = ast.ColumnGroupExpression(
+                        preceding=first, expression=expression, trailing=[],
+                    )
+                elif kind == _BETWEEN:
+                    self.expect(token.AND)
+                    and_ = self.parse_keyword()
+                    started = (first, second, left_exp)
+                    frames.append((_BETWEEN_AND, precedence, started, and_, None))
+                    self.depth += 1
+                    precedence = precedences[token.BETWEEN]
+                    left_exp = None
+                elif kind == _BETWEEN_AND:
+                    left, between, start = first
+                    left_exp = ast.ColumnBetweenExpression(
+                        preceding=[],
+                        left=left,
+                        between=between,
+                        start=start,
+                        and_=second,
+                        end=left_exp,
+                        trailing=[],
+                    )
+                else:
+                    # An argument of a call, or an item of an IN list
+                    if state is not None:
+                        self.release(state[2])
+                    second.append(self.append_trailing(left_exp))
+                    if self.current_token.type == token.COMMA:
+                        self.next_token()
+                        self.depth += 1
+                        state = self.start_recovering() if self.recover else None
+                        frames.append((kind, precedence, first, second, state))
+                        precedence = ColumnExpressionPrecedence.LOWEST
+                        left_exp = None
+                        continue
+                    if self.current_token.type != token.RPAREN:
+                        raise self.unexpected_token()
+                    self.next_token()
+                    if kind == _CALL:
+                        left_exp = ast.ColumnCallExpression(
+                            preceding=[], function=first, arguments=second, trailing=[]
+                        )
+                    else:
+                        left, in_, preceding = first
+                        left_exp = ast.ColumnList(
+                            preceding=preceding, expressions=second, trailing=[]
+                        )
+                        # Otherwise a list on its own, for parse_column_list()
+                        if in_ is not None:
+                            left_exp = ast.ColumnInExpression(
+                                preceding=[],
+                                left=left,
+                                in_=in_,
+                                values=left_exp,
+                                trailing=[],
+                            )
+            except ParseError as error:
+                # As parse_recovering() would around a group, an argument or an
+                # item, the innermost one that can recover does so
+                while frames and frames[-1][4] is None:
+                    frames.pop()
+                if not frames:
+                    raise
+                kind, outer_precedence, first, second, item_state = frames.pop()
+                if kind == _GROUP:
+                    sync_types = _paren_sync_types
+                else:
+                    sync_types = _argument_sync_types
+                left_exp = cast(
+                    ast.ColumnExpression, self.recovered(item_state, error, sync_types)
+                )
+                # It's finished next, as nothing binds to the error
+                frames.append((kind, outer_precedence, first, second, None))
+                precedence = ColumnExpressionPrecedence.LOWEST
+
+    def parse_column_list(self) -> ast.ColumnList:
+        """The parenthesised list of an IN expression, on its own."""
         preceding = self.parse_whitespace()
-        assert self.current_token.type == token.LPAREN
-        self.next_token()
-        expression = self.parse_column_expression()
-        assert self.current_token.type == token.RPAREN
-        trailing = self.parse_whitespace()
+        self.expect(token.LPAREN)
         self.next_token()
-        return ast.ColumnGroupExpression(
-            preceding=preceding, expression=expression, trailing=trailing,
+        self.depth += 1
+        state = self.start_recovering() if self.recover else None
+        # The list is finished once its last item is, and nothing binds to it
+        in_list = (None, None, preceding)
+        list_ = self.parse_column_frames(
+            ColumnExpressionPrecedence.LOWEST,
+            [(_LIST, ColumnExpressionPrecedence.CALL, in_list, [], state)],
         )
-
-    def parse_column_call_expression(
-        self, function: ast.ColumnIdentifier
-    ) -> ast.ColumnCallExpression:
-        arguments = []
-
-        preceding = self.parse_whitespace()
-        assert self.current_token.type == token.LPAREN
-        self.next_token()
-
-        if self.current_token.type == token.RPAREN:
+        return cast(ast.ColumnList, list_)
+
+    def parse_column_literal_list(self) -> Optional[ast.ColumnLiteralList]:
+        """
+        Parse a parenthesised list of integers, or of strings, as one node.
+        Return None without taking any tokens if it's any other list.
+
+        A lexer that can skip over such a list without lexing it is asked to,
+        so that the literals are never made into tokens.
+        """
+        self.expect(token.LPAREN)
+        whitespace = self.current_whitespace
+        lparen = self.current_token
+        lexer = self.lexer
+        if (
+            isinstance(lexer, RegexLexer)
+            and not self.marks
+            and len(self.window) == self.index + 2
+        ):
+            end = lexer.skip_literal_list(lparen.end)
+            if end is None:
+                return None
+            # As in skip_text_lazily(), the window starts again after the list
+            self.restart_window(lexer)
+
+            text = lparen.source[lparen.end : end]
+            if is_plain_literal_list(text):
+                literal, original_literal = text, None
+            else:
+                items = _literal_list_item_pattern.findall(text)
+                items = [item for item in items if item]
+                literal, original_literal = ", ".join(items), text
+        else:
+            mark = self.mark()
             self.next_token()
-            return ast.ColumnCallExpression(
-                preceding=preceding, function=function, arguments=arguments, trailing=[]
-            )
-
-        while True:
-            argument = self.parse_column_expression()
-            trailing = self.parse_whitespace()
-            argument = argument.replace(dict(trailing=trailing))
-            arguments.append(argument)
-            if self.current_token_is(token.COMMA):
+            type_ = self.current_token.type
+            if type_ != token.INTEGER and type_ != token.STRING:
+                self.reset(mark)
+                return None
+            values: List[str] = []
+            parts: List[str] = []
+            while True:
+                current = self.current_token
+                if current.type != type_:
+                    self.reset(mark)
+                    return None
+                values.append(current.literal)
+                parts.extend(w.literal for w in self.current_whitespace)
+                parts.append(current.literal)
                 self.next_token()
-                continue
-            elif self.current_token_is(token.RPAREN):
-                self.next_token()
-                break
-            else:
-                raise ParseError("unexpected token " + self.current_token.type)
+                parts.extend(w.literal for w in self.current_whitespace)
+                if self.current_token.type == token.COMMA:
+                    parts.append(",")
+                    self.next_token()
+                    continue
+                if self.current_token.type == token.RPAREN:
+                    break
+                self.reset(mark)
+                return None
+            self.release(mark)
+            self.next_token()
 
-        return ast.ColumnCallExpression(
-            preceding=preceding, function=function, arguments=arguments, trailing=[]
-        )
+            literal = ", ".join(values)
+            original_literal = "".join(parts)
+            if original_literal == literal:
+                original_literal = None
 
-    def parse_column_between_expression(
-        self, left_exp: ast.ColumnExpression
-    ) -> ast.ColumnBetweenExpression:
-        assert self.current_token.type == token.BETWEEN
-        precedence = self.current_column_precedence()
-        between = self.parse_keyword()
-        start = self.parse_column_expression(precedence)
-        assert self.current_token.type == token.AND
-        and_ = self.parse_keyword()
-        expression = ast.ColumnBetweenExpression(
-            preceding=[],
-            left=left_exp,
-            between=between,
-            start=start,
-            and_=and_,
-            end=self.parse_column_expression(precedence),
+        return ast.ColumnLiteralList(
+            preceding=[w.literal for w in whitespace],
+            literal=literal,
+            original_literal=original_literal,
             trailing=[],
         )
-        return expression
 
     def column_prefix_parse_fn(
-        self, token_type: str
-    ) -> Callable[[], ast.ColumnPrefixExpression]:
-        prefix_parse_fns = {
-            token.INTEGER: self.parse_column_integer,
-            token.STRING: self.parse_column_string,
-            token.NULL: self.parse_keyword,
-            token.TRUE: self.parse_keyword,
-            token.FALSE: self.parse_keyword,
-            token.IDENTIFIER: self.parse_column_identifier,
-            token.ASTERISK: self.parse_keyword,
-            token.NOT: self.parse_column_prefix_expression,
-            token.SUBTRACT: self.parse_column_prefix_expression,
-            token.LPAREN: self.parse_column_group_expression,
-            # TODO: token.WHEN: self.parse_column_when_expression,
-        }
-        return prefix_parse_fns.get(token_type, None)
+        self, token_type: int
+    ) -> Optional[Callable[[], ast.ColumnPrefixExpression]]:
+        """
+        The parse function for a column expression starting with token_type,
+        or None if there isn't one, including for the operators and groups
+        that parse_column_expression() parses itself.
+        """
+        fn = column_prefix_parse_fns[token_type]
+        return fn.__get__(self) if callable(fn) else None
 
     def column_infix_parse_fn(
-        self, token_type: str
-    ) -> Callable[[ast.ColumnExpression], ast.ColumnInfixExpression]:
-        infix_parse_fns = {
-            token.AS: self.parse_column_alias_expression,
-            token.IDENTIFIER: self.parse_column_alias_expression,
-            token.DESC: self.parse_column_order_expression,
-            token.ASC: self.parse_column_order_expression,
-            token.AND: self.parse_column_infix_expression,
-            token.OR: self.parse_column_infix_expression,
-            token.IS: self.parse_column_infix_expression,
-            token.BETWEEN: self.parse_column_between_expression,
-            token.EQUAL: self.parse_column_infix_expression,
-            token.BANGEQUAL: self.parse_column_infix_expression,
-            token.LTGT: self.parse_column_infix_expression,
-            token.GT: self.parse_column_infix_expression,
-            token.LT: self.parse_column_infix_expression,
-            token.GTEQUAL: self.parse_column_infix_expression,
-            token.LTEQUAL: self.parse_column_infix_expression,
-            token.PLUS: self.parse_column_infix_expression,
-            token.MINUS: self.parse_column_infix_expression,
-            token.ASTERISK: self.parse_column_infix_expression,
-            token.SLASH: self.parse_column_infix_expression,
-            token.COLONCOLON: self.parse_column_infix_expression,
-            token.PIPEPIPE: self.parse_column_infix_expression,
-            token.LPAREN: self.parse_column_call_expression,
-        }
-        return infix_parse_fns.get(token_type, None)
+        self, token_type: int
+    ) -> Optional[Callable[[ast.ColumnExpression], ast.ColumnInfixExpression]]:
+        """
+        The parse function for a column expression continuing with token_type,
+        or None if there isn't one, including for the operators, calls and
+        lists that parse_column_expression() parses itself.
+        """
+        fn = column_infix_parse_fns[token_type]
+        return fn.__get__(self) if callable(fn) else None
 
     def parse_column_integer(self) -> ast.ColumnLiteral:
         preceding = self.parse_whitespace()
@@ -414,11 +1372,18 @@ class Parser:
         self.next_token()
         return ast.ColumnLiteral(preceding=preceding, literal=literal, trailing=[],)
 
+    def parse_column_placeholder(self) -> ast.ColumnPlaceholder:
+        preceding = self.parse_whitespace()
+        literal = self.current_token.literal
+        self.next_token()
+        return ast.ColumnPlaceholder(preceding=preceding, literal=literal, trailing=[])
+
     def parse_column_identifier(self) -> ast.ColumnIdentifier:
         preceding = self.parse_whitespace()
         # TODO: parse properly
         parts = self.current_token.literal.split(".")
-        assert len(parts) <= 3
+        if len(parts) > 3:
+            raise self.error("too many parts in identifier")
         self.next_token()
         return ast.ColumnIdentifier(
             preceding=preceding,
@@ -431,80 +1396,80 @@ class Parser:
     def parse_column_alias_expression(
         self, left_exp: ast.ColumnExpression
     ) -> ast.ColumnAlias:
-        preceding = self.parse_whitespace()
-
-        as_ = self.parse_keyword() if self.current_token.type == token.AS else None
+        if self.current_token.type == token.AS:
+            as_ = self.append_trailing(self.parse_keyword())
+        else:
+            as_ = None
+            left_exp = self.append_trailing(left_exp)
 
-        assert self.current_token.type == token.IDENTIFIER
+        self.expect(token.IDENTIFIER)
         alias = self.current_token.literal
         self.next_token()
 
         return ast.ColumnAlias(
-            preceding=preceding, value=left_exp, as_=as_, alias=alias, trailing=[],
+            preceding=[], value=left_exp, as_=as_, alias=alias, trailing=[],
         )
 
     def parse_column_order_expression(
         self, left_exp: ast.ColumnExpression
     ) -> ast.ColumnOrderExpression:
-        preceding = self.parse_whitespace()
-
-        assert self.current_token.type in (token.ASC, token.DESC)
+        self.expect(token.ASC, token.DESC)
         order = self.parse_keyword()
 
         return ast.ColumnOrderExpression(
-            preceding=preceding, value=left_exp, order=order, trailing=[],
+            preceding=[], value=left_exp, order=order, trailing=[],
         )
 
-    def current_table_precedence(self) -> TableExpressionPrecedence:
-        return token_table_precedences.get(
-            self.current_token.type, TableExpressionPrecedence.LOWEST
-        )
+    def current_table_precedence(self) -> int:
+        return table_precedences[self.current_token.type]
 
-    def peek_table_precedence(self) -> TableExpressionPrecedence:
-        return token_table_precedences.get(
-            self.peek_token.type, TableExpressionPrecedence.LOWEST
-        )
+    def peek_table_precedence(self) -> int:
+        return table_precedences[self.peek_token.type]
 
-    # Pratt parser algorithm
     def parse_table_expression(
-        self, precedence: TableExpressionPrecedence = TableExpressionPrecedence.LOWEST
+        self, precedence: int = TableExpressionPrecedence.LOWEST
     ) -> ast.TableExpression:
-        prefix_fn = self.table_prefix_parse_fn(self.current_token.type)
-        if not prefix_fn:
-            raise ParseError(
-                f"no prefix parse function for token {self.current_token.type}"
-            )
+        return self.run_steps(self.table_expression_steps(precedence))
 
-        left_exp = prefix_fn()
+    # Pratt parser algorithm
+    def table_expression_steps(
+        self, precedence: int = TableExpressionPrecedence.LOWEST
+    ) -> Generator[Any, Any, ast.TableExpression]:
+        """
+        parse_table_expression() as steps for run_steps(), which subqueries
+        and joins are yielded to.
+        """
+        prefix_fn = table_prefix_parse_fns[self.current_token.type]
+        if prefix_fn is None:
+            raise self.error(
+                f"no prefix parse function for token {self.current_token_name()}"
+            )
 
-        while (
-            self.current_token.type != token.EOF
-            and precedence.value < self.current_table_precedence().value
-        ):
-            infix_fn = self.table_infix_parse_fn(self.current_token.type)
-            if not infix_fn:
+        if prefix_fn is _parse_table_subquery:
+            left_exp = yield self.table_subquery_steps()
+        else:
+            left_exp = prefix_fn(self)
+
+        # EOF has the lowest precedence, so it always ends the loop
+        precedences = table_precedences
+        infix_parse_fns = table_infix_parse_fns
+        while precedence < precedences[self.current_token.type]:
+            infix_fn = infix_parse_fns[self.current_token.type]
+            if infix_fn is None:
                 return left_exp
-            left_exp = infix_fn(left_exp)
+            if infix_fn is _parse_table_join:
+                left_exp = yield self.table_join_steps(left_exp)
+            else:
+                left_exp = infix_fn(self, left_exp)
         return left_exp
 
-    def parse_table_prefix_expression(self) -> ast.TablePrefixExpression:
-        preceding = self.parse_whitespace()
-        operator = self.parse_keyword()
-        return ast.TablePrefixExpression(
-            preceding=preceding,
-            operator=operator,
-            right=self.parse_table_expression(TableExpressionPrecedence.PREFIX),
-            trailing=[],
-        )
-
     def parse_table_infix_expression(
         self, left_exp: ast.TableExpression
     ) -> ast.TableInfixExpression:
-        preceding = self.parse_whitespace()
         precedence = self.current_table_precedence()
         operator = self.parse_keyword()
         expression = ast.TableInfixExpression(
-            preceding=preceding,
+            preceding=[],
             left=left_exp,
             operator=operator,
             right=self.parse_table_expression(precedence),
@@ -515,19 +1480,22 @@ class Parser:
     def parse_table_join(
         self, left_exp: ast.TableExpression
     ) -> ast.TableJoinExpression:
-        preceding = self.parse_whitespace()
+        return self.run_steps(self.table_join_steps(left_exp))
 
-        assert self.current_token.type == token.JOIN
+    def table_join_steps(
+        self, left_exp: ast.TableExpression
+    ) -> Generator[Any, Any, ast.TableJoinExpression]:
+        self.expect(token.JOIN)
         join = self.parse_keyword()
-        right_exp = self.parse_table_expression()
+        right_exp = yield self.table_expression_steps()
 
-        assert self.current_token.type == token.ON
+        self.expect(token.ON)
         on = self.parse_keyword()
         condition = self.parse_column_expression()
         trailing = self.parse_whitespace()
 
         return ast.TableJoinExpression(
-            preceding=preceding,
+            preceding=[],
             left=left_exp,
             join=join,
             right=right_exp,
@@ -537,49 +1505,213 @@ class Parser:
         )
 
     def table_prefix_parse_fn(
-        self, token_type: str
+        self, token_type: int
     ) -> Optional[Callable[[], ast.TablePrefixExpression]]:
-        prefix_parse_fns = {
-            token.IDENTIFIER: self.parse_table_identifier,
-            # TODO: subquery
-            # token.LPAREN: self.parse_prefix_expression,
-        }
-        return prefix_parse_fns.get(token_type, None)
+        fn = table_prefix_parse_fns[token_type]
+        return fn.__get__(self) if fn else None
 
     def table_infix_parse_fn(
-        self, token_type: str
+        self, token_type: int
     ) -> Optional[Callable[[ast.TableExpression], ast.TableInfixExpression]]:
-        infix_parse_fns = {
-            token.JOIN: self.parse_table_join,
-            token.AS: self.parse_table_alias_expression,
-            token.IDENTIFIER: self.parse_table_alias_expression,
-        }
-        return infix_parse_fns.get(token_type, None)
+        fn = table_infix_parse_fns[token_type]
+        return fn.__get__(self) if fn else None
 
     def parse_table_identifier(self) -> ast.TableIdentifier:
         preceding = self.parse_whitespace()
         # TODO: parse properly
         parts = self.current_token.literal.split(".")
-        assert len(parts) <= 3
+        if len(parts) > 3:
+            raise self.error("too many parts in identifier")
         self.next_token()
         return ast.TableIdentifier(
             preceding=preceding,
-            schema=parts[-2] if len(parts) == 2 else None,
+            schema=parts[-2] if len(parts) >= 2 else None,
             table=parts[-1],
+            database=parts[-3] if len(parts) == 3 else None,
             trailing=[],
         )
 
+    def parse_table_subquery(self) -> ast.TableSubquery:
+        return self.run_steps(self.table_subquery_steps())
+
+    def table_subquery_steps(self) -> Generator[Any, Any, ast.TableSubquery]:
+        preceding = self.parse_whitespace()
+        self.expect(token.LPAREN)
+        open_paren = self.current_token.start
+        self.next_token()
+        if self.lazy:
+            self.expect(token.SELECT)
+            parse = self.skip_lazily(
+                Parser.parse_select, _subquery_end_types, open_paren=open_paren
+            )
+            self.expect(token.RPAREN)
+            self.next_token()
+            # The statement is left unset by ast.lazy()
+            subquery = ast.TableSubquery(
+                preceding=preceding, statement=cast(ast.Statement, None), trailing=[]
+            )
+            return ast.lazy(subquery, {"statement": parse})
+
+        self.depth += 1
+        statement = yield self.select_steps()
+        self.depth -= 1
+        self.expect(token.RPAREN)
+        self.next_token()
+        return ast.TableSubquery(
+            preceding=preceding, statement=statement, trailing=[]
+        )
+
+    def parse_table_placeholder(self) -> ast.TablePlaceholder:
+        preceding = self.parse_whitespace()
+        literal = self.current_token.literal
+        self.next_token()
+        return ast.TablePlaceholder(preceding=preceding, literal=literal, trailing=[])
+
     def parse_table_alias_expression(
         self, left_exp: ast.TableExpression
     ) -> ast.TableAlias:
-        preceding = self.parse_whitespace()
+        if self.current_token.type == token.AS:
+            as_ = self.append_trailing(self.parse_keyword())
+        else:
+            as_ = None
+            left_exp = self.append_trailing(left_exp)
 
-        as_ = self.parse_keyword() if self.current_token.type == token.AS else None
-
-        assert self.current_token.type == token.IDENTIFIER
+        self.expect(token.IDENTIFIER)
         alias = self.current_token.literal
         self.next_token()
 
         return ast.TableAlias(
-            preceding=preceding, value=left_exp, as_=as_, alias=alias, trailing=[],
+            preceding=[], value=left_exp, as_=as_, alias=alias, trailing=[],
         )
+
+
+# The kinds of expression that parse_column_expression keeps on its stack, which
+# stand in for their parse functions in the column dispatch tables
+_PREFIX = 0
+_INFIX = 1
+_GROUP = 2
+# BETWEEN waiting for its start, then for its end
+_BETWEEN = 3
+_BETWEEN_AND = 4
+# A function call waiting for an argument, and an IN list for an item
+_CALL = 5
+_LIST = 6
+
+# Where a recovering parser carries on from after an error in a statement, a
+# group or a function argument
+_statement_end_types = frozenset([token.SEMICOLON, token.EOF])
+_clause_sync_types = frozenset(
+    [token.FROM, token.WHERE, token.GROUP, token.HAVING, token.ORDER, token.LIMIT]
+)
+_paren_sync_types = _clause_sync_types | {token.RPAREN}
+_argument_sync_types = _paren_sync_types | {token.COMMA}
+
+# The text between the parentheses of a plain list of strings, and each of the
+# literals in that of any literal list
+_plain_string_list_pattern = re.compile(r"'[^']*'(?:, '[^']*')*")
+_literal_list_item_pattern = re.compile(
+    r"[ \n\t]+|--[^\n]*|/\*.*?\*/|,|('[^']*'|[0-9]+)", re.DOTALL
+)
+
+# Where a lazy parser stops skipping a clause or a subquery
+_clause_end_types = _paren_sync_types
+_subquery_end_types = frozenset([token.RPAREN])
+# The fields of Select that a lazy parser skips after FROM, in order, with the
+# keyword each starts with and the function that parses it
+_lazy_clauses = [
+    ("where", token.WHERE, Parser.parse_where_clause),
+    ("group_by", token.GROUP, Parser.parse_group_by_clause),
+    ("having", token.HAVING, Parser.parse_having_clause),
+    ("order_by", token.ORDER, Parser.parse_order_by_clause),
+    ("limit", token.LIMIT, Parser.parse_limit_clause),
+]
+
+
+def is_plain_literal_list(text: str) -> bool:
+    """
+    Whether the text between the parentheses of a literal list is just the
+    literals separated by ", ".
+    """
+    if text[:1] == "'":
+        return _plain_string_list_pattern.fullmatch(text) is not None
+    # Integers, perhaps with comments, which need a "/" or a "-"
+    for char in "\t\n/-":
+        if char in text:
+            return False
+    return text.count(" ") == text.count(", ") == text.count(",")
+
+
+# A parse function, or in a column table the kind of expression in its place
+P = TypeVar("P")
+ColumnParseFn = Union[Callable, int]
+
+
+def parse_fns_by_kind(parse_fns: Dict[int, P]) -> Tuple[Optional[P], ...]:
+    """A parse function or None for every token kind, indexed by the kind."""
+    return tuple(parse_fns.get(kind) for kind in token.kinds)
+
+
+# Built once, rather than per token. They hold plain functions, which the
+# parser calls with itself, and are tuples so that parsers on any number of
+# threads can share them. The column tables hold the kind of each expression
+# that parse_column_expression() parses itself in place of a function.
+column_prefix_parse_fns: Tuple[Optional[ColumnParseFn], ...] = parse_fns_by_kind(
+    {
+        token.INTEGER: Parser.parse_column_integer,
+        token.STRING: Parser.parse_column_string,
+        token.NULL: Parser.parse_keyword,
+        token.TRUE: Parser.parse_keyword,
+        token.FALSE: Parser.parse_keyword,
+        token.IDENTIFIER: Parser.parse_column_identifier,
+        token.ASTERISK: Parser.parse_keyword,
+        token.NOT: _PREFIX,
+        token.SUBTRACT: _PREFIX,
+        token.LPAREN: _GROUP,
+        token.PLACEHOLDER: Parser.parse_column_placeholder,
+        # TODO: token.WHEN: Parser.parse_column_when_expression,
+    }
+)
+column_infix_parse_fns: Tuple[Optional[ColumnParseFn], ...] = parse_fns_by_kind(
+    {
+        token.AS: Parser.parse_column_alias_expression,
+        token.IDENTIFIER: Parser.parse_column_alias_expression,
+        token.DESC: Parser.parse_column_order_expression,
+        token.ASC: Parser.parse_column_order_expression,
+        token.AND: _INFIX,
+        token.OR: _INFIX,
+        token.IS: _INFIX,
+        token.BETWEEN: _BETWEEN,
+        token.IN: _LIST,
+        token.EQUAL: _INFIX,
+        token.BANGEQUAL: _INFIX,
+        token.LTGT: _INFIX,
+        token.GT: _INFIX,
+        token.LT: _INFIX,
+        token.GTEQUAL: _INFIX,
+        token.LTEQUAL: _INFIX,
+        token.PLUS: _INFIX,
+        token.MINUS: _INFIX,
+        token.ASTERISK: _INFIX,
+        token.SLASH: _INFIX,
+        token.COLONCOLON: _INFIX,
+        token.PIPEPIPE: _INFIX,
+        token.LPAREN: _CALL,
+    }
+)
+# Handled by table_expression_steps, which yields them
+_parse_table_subquery = Parser.parse_table_subquery
+_parse_table_join = Parser.parse_table_join
+table_prefix_parse_fns = parse_fns_by_kind(
+    {
+        token.IDENTIFIER: Parser.parse_table_identifier,
+        token.PLACEHOLDER: Parser.parse_table_placeholder,
+        token.LPAREN: Parser.parse_table_subquery,
+    }
+)
+table_infix_parse_fns = parse_fns_by_kind(
+    {
+        token.JOIN: Parser.parse_table_join,
+        token.AS: Parser.parse_table_alias_expression,
+        token.IDENTIFIER: Parser.parse_table_alias_expression,
+    }
+)
@@ -0,0 +1,72 @@
+import mmap
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Callable, NamedTuple, Union, final
+
+
+class Position(NamedTuple):
+    # Both start from 1. Columns count characters, or bytes for byte input.
+    line: int
+    column: int
+
+
+# As for parser's named tuples, when compiled
+setattr(Position, "__module__", __name__)
+
+
+@final
+class LineIndex:
+    """
+    The offset at which each line of an input starts, so that offsets can be
+    turned into positions with a binary search.
+
+    Lines are found on demand, only as far as the furthest offset looked up so
+    far, so lexing doesn't pay for positions that are never asked for. Lookups
+    take a lock, as the errors and lazy nodes that hold an index may be shared
+    between threads.
+    """
+
+    def __init__(self, input: Union[str, bytes, mmap.mmap]):
+        self.input = input
+        self.newline: Union[str, bytes] = "\n" if isinstance(input, str) else b"\n"
+        self.line_starts = array("q", [0])
+        # Every newline before this offset has been recorded
+        self.scanned = 0
+        self.lock = threading.Lock()
+
+    def __reduce__(self):
+        # Only the line starts are pickled, not the input, which is scanned to
+        # its end first so that the copy has every line. Compiled, a LineIndex
+        # has no __dict__, and can only be made by calling it, so it's pickled
+        # as a call for an empty input of the same type followed by its state.
+        with self.lock:
+            self.add(self.scanned, len(self.input))
+            state = (self.line_starts, self.scanned)
+        return LineIndex, (self.newline[:0],), state
+
+    def __setstate__(self, state):
+        self.line_starts, self.scanned = state
+
+    def add(self, start: int, end: int) -> None:
+        """Record the newlines in input[start:end]."""
+        if end <= self.scanned:
+            return
+        if start < self.scanned:
+            start = self.scanned
+        # The find of whichever type the input is
+        find: Callable[..., int] = self.input.find
+        newline = self.newline
+        index = find(newline, start, end)
+        while index != -1:
+            self.line_starts.append(index + 1)
+            index = find(newline, index + 1, end)
+        self.scanned = end
+
+    def position_of(self, offset: int) -> Position:
+        with self.lock:
+            if offset > self.scanned:
+                self.add(self.scanned, offset)
+            line_starts = self.line_starts
+            line = bisect_right(line_starts, offset)
+            return Position(line, offset - line_starts[line - 1] + 1)
@@ -1,9 +1,10 @@
-from enum import Enum
+from enum import IntEnum
+from typing import Mapping, Tuple
 
 from husky_whale import token
 
 
-class ColumnExpressionPrecedence(Enum):
+class ColumnExpressionPrecedence(IntEnum):
     LOWEST = 0
     ASC_DESC = 1
     AS = 2
@@ -51,7 +52,7 @@ token_column_precedences = {
 }
 
 
-class TableExpressionPrecedence(Enum):
+class TableExpressionPrecedence(IntEnum):
     LOWEST = 0
     JOIN = 1
     AS = 2
@@ -62,3 +63,17 @@ token_table_precedences = {
     token.AS: TableExpressionPrecedence.AS,
     token.IDENTIFIER: TableExpressionPrecedence.AS,
 }
+
+
+def by_kind(precedences: Mapping[int, int], lowest: int) -> Tuple[int, ...]:
+    """A precedence for every token kind, as a tuple indexed by the kind."""
+    return tuple(int(precedences.get(kind, lowest)) for kind in token.kinds)
+
+
+# The same precedences as plain ints, for the parser's inner loops
+column_precedences: Tuple[int, ...] = by_kind(
+    token_column_precedences, ColumnExpressionPrecedence.LOWEST
+)
+table_precedences: Tuple[int, ...] = by_kind(
+    token_table_precedences, TableExpressionPrecedence.LOWEST
+)
@@ -0,0 +1,139 @@
+"""
+A compact encoding of syntax trees, for passing them between processes or
+storing them.
+
+A tree is flattened into a single list in post-order. Each node is its class
+number followed by its own string fields, with the nodes below it popped off a
+stack as it is decoded, so neither encoding nor decoding recurses however deep
+the tree is. The list is then encoded with marshal.
+"""
+import dataclasses
+import marshal
+import typing
+from typing import Any, Dict, List, Tuple
+
+from husky_whale import ast
+
+# Every node class, numbered in the order ast defines them. Encoded trees can
+# only be decoded by the same version of ast.
+node_classes: Tuple[type, ...] = tuple(
+    value
+    for value in vars(ast).values()
+    if isinstance(value, type) and issubclass(value, ast.Node)
+)
+_class_numbers: Dict[type, int] = {cls: i for i, cls in enumerate(node_classes)}
+
+# What each field of a node holds
+_VALUE = 0  # Strings, lists of strings, or None
+_NODE = 1  # A node, or None
+_NODES = 2  # A list of nodes
+
+
+def _field_kind(type_: Any) -> int:
+    if typing.get_origin(type_) is list:
+        item = typing.get_args(type_)[0]
+        if isinstance(item, type) and issubclass(item, ast.Node):
+            return _NODES
+        return _VALUE
+    if typing.get_origin(type_) is typing.Union:
+        type_ = typing.get_args(type_)[0]
+    return _NODE if isinstance(type_, type) and issubclass(type_, ast.Node) else _VALUE
+
+
+# For each class, its (field name, field kind) pairs
+_layouts: Tuple[Tuple[Tuple[str, int], ...], ...] = tuple(
+    tuple((field.name, _field_kind(field.type)) for field in dataclasses.fields(cls))
+    for cls in node_classes
+)
+# For each class, what from_list needs to build a node: the class, its number of
+# fields, their names, and the (index, kind) of those that hold nodes
+_Plan = Tuple[type, int, Tuple[str, ...], Tuple[Tuple[int, int], ...]]
+_plans: Tuple[_Plan, ...] = tuple(
+    (
+        cls,
+        len(layout),
+        tuple(name for name, _ in layout),
+        tuple((i, kind) for i, (_, kind) in enumerate(layout) if kind != _VALUE),
+    )
+    for cls, layout in zip(node_classes, _layouts)
+)
+
+
+def to_list(node: ast.Node) -> list:
+    """The nodes of a tree in post-order, each as its class number and values."""
+    result = []
+    # Nodes are pushed twice: first to push their children, then to be output
+    stack: List[Tuple[ast.Node, bool]] = [(node, False)]
+    while stack:
+        node, children_done = stack.pop()
+        number = _class_numbers[type(node)]
+        layout = _layouts[number]
+        if children_done:
+            result.append(number)
+            for name, kind in layout:
+                value = getattr(node, name)
+                if kind == _VALUE:
+                    result.append(value)
+                elif kind == _NODE:
+                    # Whether a node was pushed for this field
+                    result.append(value is not None)
+                else:
+                    result.append(len(value))
+            continue
+        stack.append((node, True))
+        # Reversed, so that children are output in field order
+        for name, kind in reversed(layout):
+            value = getattr(node, name)
+            if kind == _NODE:
+                if value is not None:
+                    stack.append((value, False))
+            elif kind == _NODES:
+                stack.extend((item, False) for item in reversed(value))
+    return result
+
+
+def from_list(values: list) -> ast.Node:
+    """The inverse of to_list."""
+    stack: List[ast.Node] = []
+    new = object.__new__
+    index = 0
+    end = len(values)
+    while index < end:
+        cls, size, names, children = _plans[values[index]]
+        start = index + 1
+        index = start + size
+        fields = values[start:index]
+
+        # Fields holding nodes are replaced by the nodes at the top of the
+        # stack, the last field's last
+        if children:
+            count = 0
+            for i, _ in children:
+                count += fields[i]
+            position = len(stack) - count
+            for i, kind in children:
+                value = fields[i]
+                if kind == _NODES:
+                    fields[i] = stack[position : position + value]
+                    position += value
+                elif value:
+                    fields[i] = stack[position]
+                    position += 1
+                else:
+                    fields[i] = None
+            if count:
+                del stack[len(stack) - count :]
+
+        node = new(cls)
+        # Set directly, as nodes are frozen
+        node.__dict__.update(zip(names, fields))
+        stack.append(node)
+    return stack[0]
+
+
+def dumps(node: ast.Node) -> bytes:
+    return marshal.dumps(to_list(node))
+
+
+def loads(data: bytes) -> ast.Node:
+    return from_list(marshal.loads(data))
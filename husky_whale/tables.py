@@ -0,0 +1,90 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from husky_whale import token
+from husky_whale.lexer import (
+    comment_pattern,
+    keyword_tokens,
+    literal_pattern,
+    quoted_identifier_pattern,
+    opaque_starts,
+    whitespace_pattern,
+    word_pattern,
+)
+from husky_whale.parser import ParseError
+from husky_whale.position import LineIndex
+
+
+class TableReference(NamedTuple):
+    # Split as Parser.parse_table_identifier splits it, keeping any quotes
+    database: Optional[str]
+    schema: Optional[str]
+    table: str
+    # Of the identifier in the input
+    start: int
+    end: int
+
+
+# Steps over the same tokens as the lexer's master pattern, but only tells
+# apart what scan_tables() needs: words that may be keywords, quoted
+# identifiers and everything else. Whitespace and comments aren't captured, so
+# they leave the scanner's state alone.
+_scan_pattern = re.compile(
+    whitespace_pattern
+    + "|" + comment_pattern
+    + "|(" + word_pattern + ")"
+    + "|(" + quoted_identifier_pattern + ")"
+    + "|(" + literal_pattern + "|[^A-Za-z_ \n\t" + opaque_starts + "]+|.)",
+    re.DOTALL,
+)
+_word_group = 1
+_quoted_group = 2
+# Keywords after which an identifier names a table
+_table_keywords = (token.FROM, token.JOIN)
+
+
+def scan_tables(input: str) -> List[TableReference]:
+    """
+    The tables that the statements in input read from, in the order they
+    appear: each identifier straight after FROM or JOIN, including those of
+    subqueries.
+
+    Gives the TableIdentifier nodes that parsing the statements would, without
+    lexing them into tokens or building any nodes. Placeholders in place of a
+    table aren't included.
+    """
+    tables: List[TableReference] = []
+    match = _scan_pattern.match
+    # Whether the last token that wasn't whitespace was FROM or JOIN
+    after_keyword = False
+    pos = 0
+    while True:
+        m = match(input, pos)
+        if m is None:
+            return tables
+        pos = m.end()
+        group = m.lastindex
+        if group is None:
+            continue
+        if group == _word_group and input[pos : pos + 1] != "(":
+            keyword = keyword_tokens.get(m.group().upper())
+            if keyword is not None:
+                after_keyword = keyword in _table_keywords
+                continue
+        if after_keyword and group <= _quoted_group:
+            start = m.start()
+            parts = m.group().split(".")
+            if len(parts) > 3:
+                raise ParseError(
+                    "too many parts in identifier", start, LineIndex(input)
+                )
+            tables.append(
+                TableReference(
+                    database=parts[-3] if len(parts) == 3 else None,
+                    schema=parts[-2] if len(parts) >= 2 else None,
+                    table=parts[-1],
+                    start=start,
+                    end=pos,
+                )
+            )
+        after_keyword = False
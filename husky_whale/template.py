@@ -0,0 +1,262 @@
+import functools
+import re
+from typing import Dict, List, Mapping, Optional, Tuple, cast
+
+from husky_whale import ast
+from husky_whale import token
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import Parser
+from husky_whale.token_arrays import TokenArrayLexer, TokenArrays, tokenize
+
+# The keys from a node down to a placeholder, as accepted by Node.replace()
+Path = Tuple[str, ...]
+
+# Values that are one integer or string token, bound without a parser
+_literal_pattern = re.compile(r"[0-9]+|'[^']*'")
+
+# Values that parse to one of these bind as they would parse in place of their
+# placeholder, as nothing around the placeholder can take part of them
+_column_value_types = (
+    ast.ColumnLiteral,
+    ast.ColumnIdentifier,
+    ast.Keyword,
+    ast.ColumnPlaceholder,
+    ast.ColumnGroupExpression,
+    ast.ColumnCallExpression,
+)
+_table_value_types = (ast.TableIdentifier, ast.TablePlaceholder, ast.TableSubquery)
+
+# Nodes whose children are whole expressions, ended by a comma, a parenthesis or
+# a keyword, so that any value parses the same in place of one
+_delimiting_types = (
+    ast.ResultsClause,
+    ast.FromClause,
+    ast.WhereClause,
+    ast.GroupByClause,
+    ast.HavingClause,
+    ast.OrderByClause,
+    ast.LimitClause,
+    ast.ColumnGroupExpression,
+)
+
+
+class Template:
+    """
+    A query containing {{...}} placeholders, lexed and parsed once so that it
+    can be rendered with many sets of values.
+
+    Values are SQL text and are inserted as they are, so any quoting is up to
+    the caller. Placeholders without a value are left in place.
+
+    bind() parses each value where its placeholder is, so that it gives the
+    same statement as parsing render(). A value that an operator next to its
+    placeholder would take part of, such as "y + 1" in "x * {{v}}", must be
+    parenthesised to be bound.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        statement: ast.Statement,
+        format_string: str,
+        placeholders: List[Tuple[str, str]],
+        paths: List[Tuple[Path, List[ast.Node], str]],
+    ):
+        self.text = text
+        self.statement = statement
+        # The text with the nth placeholder replaced by {n}, for str.format
+        self.format_string = format_string
+        # The (name, literal) of each placeholder, in order
+        self.placeholders = placeholders
+        # Where each placeholder node is in the statement, the nodes from the
+        # statement down to it, and its name
+        self.paths = paths
+
+    @classmethod
+    def parse(cls, text: str) -> "Template":
+        arrays = tokenize(text)
+        statement = Parser(TokenArrayLexer(arrays)).parse_statement()
+        format_string, placeholders = compile_format(arrays)
+        return cls(
+            text, statement, format_string, placeholders, placeholder_paths(statement)
+        )
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self.placeholders]
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """The text with each placeholder replaced by its value."""
+        get = values.get
+        return self.format_string.format(
+            *[get(name, literal) for name, literal in self.placeholders]
+        )
+
+    def bind(self, values: Mapping[str, str]) -> ast.Statement:
+        """
+        The statement with each placeholder node replaced by the node its value
+        parses to. Only the nodes on the way down to a placeholder are copied.
+
+        An IN list with a placeholder in it is parsed again as a whole, as the
+        values can make it a list of literals. Raises ValueError for a value
+        that would not parse the same on its own as in place.
+        """
+        replacements = []
+        lists: Dict[Path, List[Tuple[Path, List[ast.Node], ast.Node]]] = {}
+        for path, spine, name in self.paths:
+            if name not in values:
+                continue
+            value = values[name]
+            depth = outermost_list_depth(spine)
+            if depth is None:
+                node = bound_node(spine[-1], value, spine[-2], path[-1])
+                replacements.append((path, spine, node))
+                continue
+            # The value as it is, to be parsed with the rest of the list
+            placeholder = spine[-1]
+            node = ast.ColumnLiteral(
+                preceding=placeholder.preceding,
+                literal=value,
+                trailing=placeholder.trailing,
+            )
+            lists.setdefault(path[:depth], []).append((path, spine, node))
+        for list_path, group in lists.items():
+            list_spine = group[0][1][: len(list_path) + 1]
+            text = replaced(list_spine[-1], group, len(list_path)).original_string()
+            replacements.append((list_path, list_spine, parsed_list(text)))
+        if not replacements:
+            return self.statement
+        return cast(ast.Statement, replaced(self.statement, replacements, 0))
+
+
+def compile_format(arrays: TokenArrays) -> Tuple[str, List[Tuple[str, str]]]:
+    text = arrays.input
+    parts = []
+    placeholders: List[Tuple[str, str]] = []
+    offset = 0
+    for index, type_ in enumerate(arrays.types):
+        if type_ != token.PLACEHOLDER:
+            continue
+        start, end = arrays.starts[index], arrays.ends[index]
+        literal = text[start:end]
+        parts.append(_escape_braces(text[offset:start]))
+        parts.append("{%d}" % len(placeholders))
+        placeholders.append((literal[2:-2].strip(), literal))
+        offset = end
+    parts.append(_escape_braces(text[offset:]))
+    return "".join(parts), placeholders
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def placeholder_paths(
+    statement: ast.Statement,
+) -> List[Tuple[Path, List[ast.Node], str]]:
+    paths = []
+    stack: List[Tuple[Path, List[ast.Node]]] = [((), [statement])]
+    while stack:
+        path, spine = stack.pop()
+        node = spine[-1]
+        if isinstance(node, (ast.ColumnPlaceholder, ast.TablePlaceholder)):
+            paths.append((path, spine, node.name))
+            continue
+        for key, child in node.child_nodes().items():
+            stack.append((path + (key,), spine + [child]))
+    return paths
+
+
+def outermost_list_depth(spine: List[ast.Node]) -> Optional[int]:
+    """The depth of the first IN list in spine, if there is one."""
+    for depth, node in enumerate(spine):
+        if isinstance(node, ast.ColumnList):
+            return depth
+    return None
+
+
+def bound_node(
+    placeholder: ast.Node, value: str, parent: ast.Node, key: str
+) -> ast.Node:
+    """
+    The node that replaces placeholder, which is parent's child at key, with
+    value.
+    """
+    if value[:1].isspace() or value[-1:].isspace():
+        raise ValueError(f"value {value!r} starts or ends with whitespace")
+    table = isinstance(placeholder, ast.TablePlaceholder)
+    if not table and _literal_pattern.fullmatch(value):
+        return ast.ColumnLiteral(
+            preceding=placeholder.preceding,
+            literal=value,
+            trailing=placeholder.trailing,
+        )
+    text = "".join(placeholder.preceding) + value + "".join(placeholder.trailing)
+    node = parsed_value(text, table)
+    if isinstance(node, _table_value_types if table else _column_value_types):
+        return node
+    if isinstance(parent, _delimiting_types) or (
+        isinstance(parent, ast.ColumnCallExpression) and key != "function"
+    ):
+        return node
+    raise ValueError(
+        f"value {value!r} would not parse the same in place: parenthesise it"
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def parsed_value(text: str, table: bool) -> ast.Node:
+    """
+    The column or table expression in text, a value with the whitespace around
+    its placeholder. Nodes are never changed, so each is shared by every bind.
+    """
+    parser = Parser(RegexLexer(text))
+    node: ast.Node
+    if table:
+        node = parser.parse_table_expression()
+    else:
+        node = parser.parse_column_expression()
+    return parsed_to_end(parser, node)
+
+
+@functools.lru_cache(maxsize=4096)
+def parsed_list(text: str) -> ast.ColumnExpression:
+    """The values of an IN expression in text, parsed as IN would parse them."""
+    parser = Parser(RegexLexer(text))
+    values: ast.ColumnExpression
+    literal_list = parser.parse_column_literal_list()
+    if literal_list is not None:
+        values = literal_list
+    else:
+        values = parser.parse_column_list()
+    return parsed_to_end(parser, values)
+
+
+def parsed_to_end(parser: Parser, node: ast.N) -> ast.N:
+    node = parser.append_trailing(node)
+    if parser.current_token.type != token.EOF:
+        raise parser.unexpected_token()
+    return node
+
+
+def replaced(
+    node: ast.Node,
+    replacements: List[Tuple[Path, List[ast.Node], ast.Node]],
+    depth: int,
+) -> ast.Node:
+    """
+    A copy of node, which is at depth in each path, with the node at the end of
+    each path replaced. Each node on the way is copied once, however many
+    placeholders are below it.
+    """
+    changes: Dict[str, ast.Node] = {}
+    below: Dict[str, List[Tuple[Path, List[ast.Node], ast.Node]]] = {}
+    for replacement in replacements:
+        path = replacement[0]
+        if len(path) == depth + 1:
+            changes[path[depth]] = replacement[2]
+        else:
+            below.setdefault(path[depth], []).append(replacement)
+    for key, group in below.items():
+        changes[key] = replaced(group[0][1][depth + 1], group, depth + 1)
+    return node.replace(changes)
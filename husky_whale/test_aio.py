@@ -0,0 +1,164 @@
+import asyncio
+import random
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+from husky_whale.aio import AsyncParser
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import BudgetExceeded, ParseBudget, ParseError, Parser
+from husky_whale.serialize import to_list
+
+SCRIPT = (
+    "".join(query.strip() + "\n;\n" for query in PARSER_QUERIES)
+    + "SELECT 'é;', \"a;b\" -- ;\n FROM t /* ; */ ;;\n SELECT 1 \n"
+)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Records how many calls are in flight at once, and what each raised."""
+
+    def __init__(self, max_workers: int, delay: float = 0):
+        super().__init__(max_workers)
+        # Added to each call, so that calls overlap however fast parsing is
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.started = threading.Event()
+        self.errors: List[BaseException] = []
+
+    def submit(self, fn, *args):
+        # Counted from submission, as the parses are too quick to overlap
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        def counted():
+            self.started.set()
+            time.sleep(self.delay)
+            try:
+                return fn(*args)
+            except Exception as error:
+                self.errors.append(error)
+                raise
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+        return super().submit(counted)
+
+
+async def chunks(data: bytes, seed: int):
+    rng = random.Random(seed)
+    position = 0
+    while position < len(data):
+        size = rng.randrange(1, 64)
+        yield data[position : position + size]
+        position += size
+        await asyncio.sleep(0)
+
+
+class AsyncParserTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_parse(self):
+        parser = AsyncParser()
+        statements = await asyncio.gather(*map(parser.parse, PARSER_QUERIES))
+        self.assertEqual(
+            statements,
+            [Parser(RegexLexer(query)).parse_statement() for query in PARSER_QUERIES],
+        )
+        with self.assertRaises(ParseError):
+            await parser.parse("SELECT )")
+
+    async def test_max_in_flight(self):
+        with CountingExecutor(8, delay=0.001) as executor:
+            parser = AsyncParser(executor, max_in_flight=2)
+            await asyncio.gather(*map(parser.parse, PARSER_QUERIES * 20))
+        self.assertEqual(executor.max_running, 2)
+
+    async def test_budget(self):
+        parser = AsyncParser(budget=ParseBudget(max_tokens=100))
+        with self.assertRaises(BudgetExceeded):
+            await parser.parse("SELECT " + " + ".join(["a"] * 1000))
+
+    async def test_cancel(self):
+        for query in (
+            "SELECT " + " + ".join(["a"] * 200_000),
+            # Lists of literals are skipped over rather than lexed
+            "SELECT a FROM t WHERE " + " OR ".join(["x IN (1)"] * 200_000),
+        ):
+            with self.subTest(query=query[:30]):
+                await self.check_cancel(query)
+
+    async def check_cancel(self, query):
+        with CountingExecutor(1) as executor:
+            parser = AsyncParser(executor)
+            task = asyncio.ensure_future(parser.parse(query))
+            while not executor.started.is_set():
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The parse stopped, rather than running on after the cancel
+            self.assertEqual(executor.running, 0)
+            self.assertEqual(
+                [type(error) for error in executor.errors], [BudgetExceeded]
+            )
+            # Every slot was given back
+            for _ in range(parser.max_in_flight):
+                await asyncio.wait_for(parser.slots.acquire(), timeout=1)
+
+    async def test_parse_stream(self):
+        expected = list(Parser(RegexLexer(SCRIPT)).parse_script())
+        parser = AsyncParser(max_in_flight=3)
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                statements = [
+                    statement
+                    async for statement in parser.parse_stream(
+                        chunks(SCRIPT.encode("utf-8"), seed)
+                    )
+                ]
+                self.assertEqual(statements, expected)
+        self.assertEqual(
+            [
+                statement
+                async for statement in parser.parse_stream(chunks(b"SELECT 1;", 0))
+            ],
+            list(Parser(RegexLexer("SELECT 1;")).parse_script()),
+        )
+        self.assertEqual([s async for s in parser.parse_stream(chunks(b"", 0))], [])
+
+    async def test_processes(self):
+        deep = "SELECT " + " AND ".join(["a"] * 5000)
+        with ProcessPoolExecutor(1) as executor:
+            parser = AsyncParser(executor)
+            # Compared as lists, as comparing deep trees recurses
+            self.assertEqual(
+                to_list(await parser.parse(deep)),
+                to_list(Parser(RegexLexer(deep)).parse_statement()),
+            )
+            statements = [
+                statement
+                async for statement in parser.parse_stream(
+                    chunks(SCRIPT.encode("utf-8"), 0)
+                )
+            ]
+        self.assertEqual(statements, list(Parser(RegexLexer(SCRIPT)).parse_script()))
+
+    async def test_parse_stream_error(self):
+        script = "SELECT a FROM t;\nSELECT ) FROM u;\nSELECT b;"
+        parser = AsyncParser()
+        statements = []
+        with self.assertRaises(ParseError) as context:
+            async for statement in parser.parse_stream(chunks(script.encode(), 0)):
+                statements.append(statement)
+        self.assertEqual(context.exception.offset, script.index(")"))
+        self.assertEqual(len(statements), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import pathlib
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from husky_whale import serialize
+from husky_whale.batch import parse_many
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import Lexer
+from husky_whale.parser import ParseError, Parser
+
+
+class SerializeTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                statement = Parser(Lexer(query)).parse_statement()
+                data = serialize.dumps(statement)
+                self.assertEqual(serialize.loads(data), statement)
+
+    def test_deep_tree(self):
+        query = "SELECT " + " + ".join(["a"] * 5000)
+        statement = Parser(Lexer(query)).parse_statement()
+        decoded = serialize.loads(serialize.dumps(statement))
+        self.assertEqual(decoded.select, statement.select)
+        self.assertEqual(serialize.to_list(decoded), serialize.to_list(statement))
+
+
+class ParseManyTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_texts_and_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, "query.sql")
+            path.write_text(PARSER_QUERIES[0], encoding="utf-8")
+            missing = pathlib.Path(directory, "missing.sql")
+            sources = PARSER_QUERIES * 5 + [path, "SELECT )", missing]
+
+            results = list(parse_many(sources, self.executor, chunk_size=3))
+
+        self.assertEqual(
+            [result.position for result in results], list(range(len(sources)))
+        )
+        for result, source in zip(results[:-3], sources):
+            self.assertIsNone(result.error)
+            self.assertEqual(
+                result.statement, Parser(Lexer(source)).parse_statement()
+            )
+        self.assertEqual(
+            results[-3].statement, Parser(Lexer(PARSER_QUERIES[0])).parse_statement()
+        )
+        self.assertIsInstance(results[-2].error, ParseError)
+        self.assertEqual(
+            results[-2].error.message, "no prefix parse function for token RPAREN"
+        )
+        self.assertEqual(results[-2].error.position, (1, 8))
+        self.assertIsNone(results[-2].statement)
+        self.assertIsInstance(results[-1].error, FileNotFoundError)
+        self.assertEqual(results[-1].source, missing)
+
+    def test_unordered(self):
+        sources = PARSER_QUERIES * 10
+        results = list(parse_many(sources, self.executor, chunk_size=4, ordered=False))
+        self.assertEqual(
+            sorted(result.position for result in results), list(range(len(sources)))
+        )
+        for result in results:
+            self.assertEqual(result.source, sources[result.position])
+
+    def test_threads(self):
+        sources = PARSER_QUERIES * 5 + ["SELECT )"]
+        for results in (
+            list(parse_many(sources, chunk_size=3, threads=True)),
+            list(parse_many(sources, ThreadPoolExecutor(2), chunk_size=3)),
+        ):
+            self.assertEqual(
+                [result.position for result in results], list(range(len(sources)))
+            )
+            for result, source in zip(results[:-1], sources):
+                self.assertIsNone(result.data)
+                self.assertEqual(
+                    result.statement, Parser(Lexer(source)).parse_statement()
+                )
+                self.assertIs(result.statement, result.statement)
+            self.assertIsInstance(results[-1].error, ParseError)
+            self.assertIsNone(results[-1].statement)
+
+
+if __name__ == "__main__":
+    unittest.main()
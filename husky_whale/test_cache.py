@@ -0,0 +1,121 @@
+import importlib.machinery
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from husky_whale import cache
+from husky_whale import parser
+from husky_whale import serialize
+from husky_whale.batch import parse_many
+from husky_whale.cache import ASTCache
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import Lexer
+from husky_whale.parser import ParseError, Parser
+
+
+def cached_files(directory):
+    return [
+        os.path.join(path, name)
+        for path, _, names in os.walk(directory)
+        for name in names
+    ]
+
+
+class ASTCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ASTCache(self.directory.name)
+
+    def test_miss_then_hit(self):
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                expected = Parser(Lexer(query)).parse_statement()
+                self.assertIsNone(self.cache.load_data(query))
+                self.assertEqual(self.cache.parse(query), expected)
+                self.assertIsNotNone(self.cache.load_data(query))
+                self.assertEqual(self.cache.parse(query), expected)
+        self.assertEqual(
+            len(cached_files(self.directory.name)), len(set(PARSER_QUERIES))
+        )
+
+    def test_grammar_version(self):
+        self.cache.parse(PARSER_QUERIES[0])
+        path = self.cache.path_of(PARSER_QUERIES[0])
+        self.assertIn(cache.grammar_version, path)
+        # The same sources give the same version, compiled or not
+        for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+            self.assertEqual(
+                cache._source_path(os.path.join("husky_whale", "parser" + suffix)),
+                os.path.join("husky_whale", "parser.py"),
+            )
+        self.assertEqual(
+            os.path.basename(cache._source_path(parser.__file__)), "parser.py"
+        )
+
+    def test_damaged_entry(self):
+        query = PARSER_QUERIES[0]
+        self.cache.parse(query)
+        with open(self.cache.path_of(query), "wb") as f:
+            f.write(b"\x00")
+        expected = Parser(Lexer(query)).parse_statement()
+        self.assertEqual(self.cache.parse(query), expected)
+        self.assertEqual(self.cache.parse(query), expected)
+
+        with open(self.cache.path_of(query), "wb") as f:
+            f.write(b"\x00")
+        data = self.cache.parse_data(query)
+        self.assertEqual(serialize.loads(data), expected)
+        self.assertEqual(self.cache.load_data(query), data)
+
+        # A changed byte that still decodes is found by the checksum
+        with open(self.cache.path_of(query), "rb") as f:
+            entry = f.read().replace(b"SELECT", b"select", 1)
+        serialize.loads(entry[4:])
+        with open(self.cache.path_of(query), "wb") as f:
+            f.write(entry)
+        self.assertIsNone(self.cache.load_data(query))
+        self.assertEqual(self.cache.parse_data(query), data)
+        self.assertEqual(self.cache.load_data(query), data)
+
+    def test_parse_error_not_cached(self):
+        with self.assertRaises(ParseError):
+            self.cache.parse_data("SELECT )")
+        self.assertEqual(cached_files(self.directory.name), [])
+
+    def test_evict_least_recently_used(self):
+        queries = PARSER_QUERIES[:4]
+        for i, query in enumerate(queries):
+            self.cache.parse(query)
+            os.utime(self.cache.path_of(query), (i, i))
+        # The oldest is read, so becomes the most recently used
+        self.cache.load_data(queries[0])
+        sizes = [os.path.getsize(self.cache.path_of(query)) for query in queries]
+        self.cache.max_bytes = sizes[0] + sizes[3]
+        self.cache.evict()
+
+        self.assertIsNotNone(self.cache.load_data(queries[0]))
+        self.assertIsNone(self.cache.load_data(queries[1]))
+        self.assertIsNone(self.cache.load_data(queries[2]))
+        self.assertIsNotNone(self.cache.load_data(queries[3]))
+
+    def test_parse_many(self):
+        sources = PARSER_QUERIES * 3 + ["SELECT )"]
+        with ProcessPoolExecutor(2) as executor:
+            for _ in range(2):
+                results = list(
+                    parse_many(sources, executor, chunk_size=4, cache=self.cache)
+                )
+                for result, source in zip(results[:-1], sources):
+                    self.assertEqual(
+                        result.statement, Parser(Lexer(source)).parse_statement()
+                    )
+                self.assertIsInstance(results[-1].error, ParseError)
+        self.assertEqual(
+            len(cached_files(self.directory.name)), len(set(PARSER_QUERIES))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import time
+import unittest
+
+from husky_whale.corpus import mutated_queries
+from husky_whale.lexer import BytesLexer, Lexer, RegexLexer
+from husky_whale.parser import ParseError, Parser
+from husky_whale.test_lexer import read_all_tokens
+
+# Generous enough for a slow machine, while anything that stops consuming input
+# or rescans it per token still goes far over
+MAX_SECONDS_PER_BYTE = 0.001
+MIN_BYTES = 100
+
+
+class FuzzTestCase(unittest.TestCase):
+    def test_mutated_queries(self):
+        for query in mutated_queries(2000):
+            with self.subTest(query=query):
+                start = time.perf_counter()
+                tokens = read_all_tokens(Lexer(query))
+                self.assertEqual(read_all_tokens(RegexLexer(query)), tokens)
+                self.assertEqual(read_all_tokens(BytesLexer(query.encode())), tokens)
+                try:
+                    Parser(RegexLexer(query)).parse_statement()
+                except ParseError:
+                    pass
+                # Recovering never fails, and loses none of the input
+                statements = Parser(RegexLexer(query), recover=True).parse_script()
+                self.assertEqual(
+                    "".join(s.original_string() for s in statements), query
+                )
+                seconds = time.perf_counter() - start
+                self.assertLess(
+                    seconds, MAX_SECONDS_PER_BYTE * max(len(query), MIN_BYTES)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
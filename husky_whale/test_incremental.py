@@ -0,0 +1,139 @@
+import random
+import unittest
+
+from husky_whale import token
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.incremental import IncrementalParse
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import ParseError, Parser
+
+
+class IncrementalParseTestCase(unittest.TestCase):
+    def assertSameAsFullParse(self, result: IncrementalParse):
+        parser = Parser(RegexLexer(result.text))
+        self.assertEqual(result.statement, parser.parse_select())
+        if parser.current_token.type == token.EOF:
+            self.assertEqual(result.statement.original_string(), result.text)
+
+    def test_edit_within_clause_reuses_other_clauses(self):
+        query = "SELECT a, b FROM users u WHERE x = 1 GROUP BY a ORDER BY b DESC"
+        previous = IncrementalParse.parse(query)
+        start = query.index("1")
+        result = previous.edit(start, start + 1, "42")
+        self.assertSameAsFullParse(result)
+        self.assertEqual(result.text, query.replace("1", "42"))
+        self.assertIsNot(result.statement.where, previous.statement.where)
+        for field in ("select", "results", "from_", "group_by", "order_by"):
+            self.assertIs(
+                getattr(result.statement, field), getattr(previous.statement, field)
+            )
+
+        start = result.text.index("DESC")
+        result = result.edit(start, start + 4, "ASC")
+        self.assertSameAsFullParse(result)
+        self.assertEqual(result.statement.where.expression.right.literal, "42")
+
+    def test_edit_within_list_item_reuses_other_items(self):
+        query = "SELECT a, b + 1 AS c, d FROM t GROUP BY a, d ORDER BY a"
+        previous = IncrementalParse.parse(query)
+        start = query.index("1")
+        result = previous.edit(start, start + 1, "x")
+        self.assertSameAsFullParse(result)
+        old_results = previous.statement.results.expressions
+        new_results = result.statement.results.expressions
+        self.assertIs(new_results[0], old_results[0])
+        self.assertIsNot(new_results[1], old_results[1])
+        self.assertIs(new_results[2], old_results[2])
+
+        start = result.text.index("d ORDER")
+        previous = result
+        result = previous.edit(start, start + 1, "  e")
+        self.assertSameAsFullParse(result)
+        self.assertIs(result.statement.results, previous.statement.results)
+        # The item includes the whitespace on either side of it
+        self.assertEqual(result.spans[2].items[1], (start - 1, start + 4))
+
+        # Adding an item can't be done within a single item
+        result = result.edit(start, start, "f,")
+        self.assertSameAsFullParse(result)
+        self.assertEqual(len(result.statement.group_by.expressions), 3)
+
+    def test_edit_that_changes_clauses_falls_back_to_full_parse(self):
+        query = "SELECT a FROM t WHERE x = 1"
+        previous = IncrementalParse.parse(query)
+        result = previous.edit(len(query), len(query), " ORDER BY a")
+        self.assertSameAsFullParse(result)
+        self.assertIsNotNone(result.statement.order_by)
+
+        start = query.index(" = 1")
+        result = previous.edit(start, len(query), "")
+        self.assertSameAsFullParse(result)
+
+    def test_edit_across_clause_boundary(self):
+        query = "SELECT a FROM t WHERE x = 1"
+        previous = IncrementalParse.parse(query)
+        # Would join "t" and "x" into one identifier if only FROM were re-lexed
+        start = query.index(" WHERE")
+        result = previous.edit(start, start + 1, "")
+        self.assertEqual(result.text, "SELECT a FROM tWHERE x = 1")
+        self.assertSameAsFullParse(result)
+        self.assertEqual(result.statement.from_.expression.value.table, "tWHERE")
+        self.assertIsNone(result.statement.where)
+
+    def test_edit_that_comments_out_later_clauses(self):
+        query = "SELECT a FROM t WHERE x = 1 GROUP BY a"
+        previous = IncrementalParse.parse(query)
+        start = query.index("GROUP")
+        result = previous.edit(start, start, "-- ")
+        self.assertSameAsFullParse(result)
+        self.assertIsNone(result.statement.group_by)
+
+        query = "SELECT a FROM t WHERE x = 1 /* y */ GROUP BY a"
+        previous = IncrementalParse.parse(query)
+        start = query.index("*/")
+        result = previous.edit(start, start + 2, "")
+        self.assertSameAsFullParse(result)
+        self.assertIsNone(result.statement.group_by)
+
+    def test_edit_that_opens_a_quote(self):
+        query = "SELECT a FROM t WHERE x = 1 GROUP BY a -- it's"
+        previous = IncrementalParse.parse(query)
+        start = query.index("1")
+        # The string runs on to the quote in the comment
+        result = previous.edit(start, start, "'")
+        self.assertSameAsFullParse(result)
+        self.assertIsNone(result.statement.group_by)
+
+        query = "SELECT a, b FROM t WHERE x = '1'"
+        previous = IncrementalParse.parse(query)
+        start = query.index("b")
+        result = previous.edit(start, start, "'")
+        self.assertSameAsFullParse(result)
+        self.assertIsNone(result.statement.from_)
+
+    def test_random_edits(self):
+        rng = random.Random(5)
+        replacements = [
+            "", " ", "x", "1", ",", "(", ")", "'", '"', "-- ", "/*", "{{", "\n",
+            " AND y ", "ORDER BY",
+        ]
+        for query in PARSER_QUERIES:
+            previous = IncrementalParse.parse(query)
+            for _ in range(50):
+                start = rng.randint(0, len(query))
+                end = min(len(query), start + rng.randint(0, 3))
+                replacement = rng.choice(replacements)
+                try:
+                    result = previous.edit(start, end, replacement)
+                except ParseError:
+                    # The new text doesn't parse at all
+                    text = query[:start] + replacement + query[end:]
+                    with self.assertRaises(ParseError, msg=text):
+                        Parser(RegexLexer(text)).parse_select()
+                    continue
+                with self.subTest(text=result.text):
+                    self.assertSameAsFullParse(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
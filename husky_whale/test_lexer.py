@@ -1,12 +1,16 @@
+import os
+import random
+import tempfile
 import unittest
 from typing import List
 
 from husky_whale import token
-from husky_whale.lexer import Lexer
+from husky_whale.corpus import LEXER_QUERIES, PARSER_QUERIES, mutated_queries
+from husky_whale.lexer import BytesLexer, Lexer, RegexLexer, mapped_file, skip_tokens
 from husky_whale.token import Token
 
 
-def read_all_tokens(lexer: Lexer) -> List[Token]:
+def read_all_tokens(lexer) -> List[Token]:
     tokens = []
     while True:
         t = lexer.next_token()
@@ -149,6 +153,191 @@ FROM users u
             ],
         )
 
+    def test_unterminated_quotes(self):
+        cases = [
+            ("'abc\nd", [Token(token.ILLEGAL, "'abc\nd")]),
+            ('"abc', [Token(token.ILLEGAL, '"abc')]),
+            (
+                'x."y z',
+                [Token(token.IDENTIFIER, "x."), Token(token.ILLEGAL, '"y z')],
+            ),
+            (
+                "'a' 'b",
+                [
+                    Token(token.STRING, "'a'"),
+                    Token(token.WHITESPACE, " "),
+                    Token(token.ILLEGAL, "'b"),
+                ],
+            ),
+        ]
+        for query, expected in cases:
+            for lexer_class in (Lexer, RegexLexer):
+                with self.subTest(query=query, lexer=lexer_class.__name__):
+                    self.assertEqual(
+                        read_all_tokens(lexer_class(query)),
+                        expected + [Token(token.EOF, "")],
+                    )
+
+    def test_token_offsets(self):
+        query = "a <> 'b'"
+        for lexer_class in (Lexer, RegexLexer):
+            with self.subTest(lexer=lexer_class.__name__):
+                tokens = read_all_tokens(lexer_class(query))
+                self.assertEqual(
+                    [(t.start, t.end) for t in tokens],
+                    [(0, 1), (1, 2), (2, 4), (4, 5), (5, 8), (8, 8)],
+                )
+                self.assertTrue(all(t.source is query for t in tokens))
+
+    def test_token_type_names(self):
+        t = Lexer("select").next_token()
+        self.assertEqual(t.type, token.SELECT)
+        self.assertIs(type(t.type), int)
+        self.assertEqual(token.type_names[t.type], "SELECT")
+        self.assertEqual(token.type_ids["SELECT"], token.SELECT)
+        self.assertIs(token.kinds[t.type], token.TokenType.SELECT)
+        self.assertEqual(f"{token.kinds[t.type]}", "SELECT")
+        self.assertEqual(repr(t), "Token(type=SELECT, literal='select')")
+
+
+class RegexLexerTestCase(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        for query in LEXER_QUERIES + PARSER_QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    read_all_tokens(RegexLexer(query)), read_all_tokens(Lexer(query))
+                )
+
+    def test_same_whitespace_and_tokens_as_lexer(self):
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                expected_lexer = Lexer(query)
+                lexer = RegexLexer(query)
+                while True:
+                    expected = expected_lexer.next_whitespace_and_token()
+                    self.assertEqual(lexer.next_whitespace_and_token(), expected)
+                    if expected[1].type == token.EOF:
+                        break
+
+    def test_same_tokens_as_lexer_random(self):
+        pieces = list("aZ_09 \t\n.,:;|!<>=+-*/()$'\"") + ["'s t'", '"q.r"', "select"]
+        rng = random.Random(1)
+        for _ in range(500):
+            query = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            with self.subTest(query=query):
+                self.assertEqual(
+                    read_all_tokens(RegexLexer(query)), read_all_tokens(Lexer(query))
+                )
+
+    def test_eof_repeats(self):
+        lexer = RegexLexer("x")
+        lexer.next_token()
+        self.assertEqual(lexer.next_token(), Token(token.EOF, ""))
+        self.assertEqual(lexer.next_token(), Token(token.EOF, ""))
+
+    def test_skip_tokens(self):
+        end_types = [
+            frozenset([token.FROM, token.WHERE, token.RPAREN]),
+            frozenset([token.RPAREN]),
+        ]
+        for query in LEXER_QUERIES + PARSER_QUERIES + list(mutated_queries(500)):
+            tokens = [
+                t
+                for t in read_all_tokens(RegexLexer(query))
+                if t.type
+                not in (token.WHITESPACE, token.COMMENT_SINGLE, token.COMMENT_MULTI)
+            ]
+            # Filled in by the skips, which then step over what's in it
+            paren_ends = {}
+            for start in range(len(tokens)):
+                for types in end_types:
+                    with self.subTest(query=query, start=start, types=types):
+                        # Going through the tokens one by one
+                        depth = 0
+                        for t in tokens[start:]:
+                            if t.type in (token.SEMICOLON, token.EOF):
+                                break
+                            if depth == 0 and t.type in types:
+                                break
+                            if t.type == token.LPAREN:
+                                depth += 1
+                            elif t.type == token.RPAREN:
+                                depth -= 1
+                        self.assertEqual(
+                            skip_tokens(query, tokens[start].start, types), t.start
+                        )
+                        self.assertEqual(
+                            skip_tokens(
+                                query, tokens[start].start, types, paren_ends
+                            ),
+                            t.start,
+                        )
+
+            # Each recorded right parenthesis is the one of its left one
+            opened = []
+            matched = {}
+            for t in tokens:
+                if t.type == token.LPAREN:
+                    opened.append(t.start)
+                elif t.type == token.RPAREN and opened:
+                    matched[opened.pop()] = t.start
+                elif t.type == token.SEMICOLON:
+                    opened = []
+            for start, end in paren_ends.items():
+                self.assertEqual(matched[start], end)
+
+    def test_relex(self):
+        query = "SELECT a FROM t WHERE x = 1"
+        lexer = RegexLexer(query).relex(query.index(" a"), query.index("FROM"))
+        self.assertEqual(
+            read_all_tokens(lexer),
+            [
+                Token(token.WHITESPACE, " "),
+                Token(token.IDENTIFIER, "a"),
+                Token(token.WHITESPACE, " "),
+                Token(token.FROM, "FROM"),
+                Token(token.EOF, ""),
+            ],
+        )
+
+
+class BytesLexerTestCase(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        for query in LEXER_QUERIES + PARSER_QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    read_all_tokens(BytesLexer(query.encode())),
+                    read_all_tokens(Lexer(query)),
+                )
+
+    def test_byte_offsets(self):
+        query = "'é' x"
+        tokens = read_all_tokens(BytesLexer(query.encode()))
+        self.assertEqual(
+            [(t.start, t.end) for t in tokens], [(0, 4), (4, 5), (5, 6), (6, 6)]
+        )
+        self.assertEqual(tokens[0].literal, "'é'")
+
+    def test_mapped_file(self):
+        query = PARSER_QUERIES[1]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "query.sql")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(query)
+            with mapped_file(path) as buffer:
+                lexer = BytesLexer(buffer)
+                tokens = [lexer.next_token(), lexer.next_token()]
+                lexer.release_pages()
+                tokens += read_all_tokens(lexer)
+                self.assertEqual(tokens, read_all_tokens(Lexer(query)))
+
+            empty_path = os.path.join(directory, "empty.sql")
+            open(empty_path, "w").close()
+            with mapped_file(empty_path) as buffer:
+                self.assertEqual(
+                    read_all_tokens(BytesLexer(buffer)), [Token(token.EOF, "")]
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
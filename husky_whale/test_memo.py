@@ -0,0 +1,78 @@
+import threading
+import unittest
+
+import husky_whale
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import Lexer
+from husky_whale.memo import MemoStats, ParseMemo
+from husky_whale.parser import ParseError, Parser
+
+
+class ParseMemoTestCase(unittest.TestCase):
+    def test_hit(self):
+        memo = ParseMemo()
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                expected = Parser(Lexer(query)).parse_statement()
+                statement = memo.parse(query)
+                self.assertEqual(statement, expected)
+                self.assertIs(memo.parse(query), statement)
+        distinct = len(set(PARSER_QUERIES))
+        self.assertEqual(
+            memo.stats(),
+            MemoStats(len(PARSER_QUERIES) * 2 - distinct, distinct, 0, distinct),
+        )
+
+    def test_evict_least_recently_used(self):
+        memo = ParseMemo(max_entries=2)
+        memo.parse("SELECT a")
+        memo.parse("SELECT b")
+        memo.parse("SELECT a")
+        memo.parse("SELECT c")
+        self.assertEqual(list(memo.entries), ["SELECT a", "SELECT c"])
+        self.assertEqual(memo.stats(), MemoStats(1, 3, 1, 2))
+        memo.clear()
+        self.assertEqual(memo.stats(), MemoStats(0, 0, 0, 0))
+
+    def test_error(self):
+        memo = ParseMemo()
+        errors = []
+        for _ in range(2):
+            with self.assertRaises(ParseError) as context:
+                memo.parse("SELECT )")
+            errors.append(context.exception)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(str(errors[0]), str(errors[1]))
+        self.assertEqual(errors[1].offset, 7)
+        self.assertEqual(memo.stats(), MemoStats(1, 1, 0, 1))
+
+    def test_threads(self):
+        memo = ParseMemo(max_entries=len(PARSER_QUERIES) // 2)
+        results = []
+
+        def run():
+            for _ in range(20):
+                results.append([memo.parse(query) for query in PARSER_QUERIES])
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [Parser(Lexer(query)).parse_statement() for query in PARSER_QUERIES]
+        for result in results:
+            self.assertEqual(result, expected)
+        stats = memo.stats()
+        self.assertEqual(stats.hits + stats.misses, len(PARSER_QUERIES) * 80)
+        self.assertLessEqual(stats.size, memo.max_entries)
+
+    def test_parse(self):
+        query = PARSER_QUERIES[0]
+        self.assertEqual(
+            husky_whale.parse(query), Parser(Lexer(query)).parse_statement()
+        )
+        self.assertIs(husky_whale.parse(query), husky_whale.parse(query))
+
+
+if __name__ == "__main__":
+    unittest.main()
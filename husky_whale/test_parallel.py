@@ -0,0 +1,51 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from husky_whale.corpus import PARSER_QUERIES
+from husky_whale.lexer import Lexer
+from husky_whale.parallel import parse_script_parallel, statement_boundaries
+from husky_whale.parser import ParseError, Parser
+
+SCRIPT = (
+    "".join(query + ";\n" for query in PARSER_QUERIES) * 10
+    + "SELECT 'a;b', \"c;\" -- d;\n/* ; */ FROM t;;\n  "
+)
+
+
+class ParallelTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_statement_boundaries(self):
+        text = "a;'b;';\"c;\";--d;\n/*e;*/;{{f;}};g"
+        self.assertEqual(statement_boundaries(text), [2, 7, 12, 24, 31])
+        self.assertEqual(statement_boundaries("a; 'b;"), [2])
+
+    def test_same_as_serial(self):
+        expected = list(Parser(Lexer(SCRIPT)).parse_script())
+        for chunk_size in (1, 200, len(SCRIPT)):
+            with self.subTest(chunk_size=chunk_size):
+                results = list(
+                    parse_script_parallel(SCRIPT, self.executor, chunk_size)
+                )
+                self.assertEqual([statement for _, statement in results], expected)
+                for offset, statement in results:
+                    self.assertTrue(
+                        SCRIPT.startswith(statement.original_string(), offset)
+                    )
+
+    def test_parse_error_offset(self):
+        text = "SELECT a;\n" * 50 + "SELECT )"
+        with self.assertRaises(ParseError) as context:
+            list(parse_script_parallel(text, self.executor, 100))
+        self.assertEqual(context.exception.offset, text.index(")"))
+        self.assertEqual(context.exception.position.line, 51)
+
+
+if __name__ == "__main__":
+    unittest.main()
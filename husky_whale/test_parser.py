@@ -1,11 +1,30 @@
+import dataclasses
+import pickle
 import pprint
+import random
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
 
+from husky_whale import ast
+from husky_whale import lexer
+from husky_whale import parser
+from husky_whale import precedence
 from husky_whale import token
 from husky_whale.ast import Node
-from husky_whale.lexer import Lexer
-from husky_whale.parser import Parser
-from husky_whale.utils import node_to_dict, node_to_tree
+from husky_whale.corpus import PARSER_QUERIES, mutated_queries
+from husky_whale.lexer import Lexer, RegexLexer
+from husky_whale.parser import BudgetExceeded, ParseBudget, ParseError, Parser
+from husky_whale.precedence import (
+    ColumnExpressionPrecedence,
+    column_precedences,
+    token_column_precedences,
+)
+from husky_whale.serialize import to_list
+from husky_whale.token import Token
+from husky_whale.utils import node_to_dict, node_to_tree, walk
 
 
 def dict_formatter(node_dict: dict) -> str:
@@ -15,7 +34,7 @@ def dict_formatter(node_dict: dict) -> str:
 class ParserTestCase(unittest.TestCase):
     def assertParsedAll(self, parser: Parser, result: Node):
         failures = []
-        query_input = parser.lexer.input
+        query_input = cast(str, parser.lexer.input)
         current_token = parser.current_token
         result_string = result.string()
 
@@ -40,7 +59,7 @@ class ParserTestCase(unittest.TestCase):
 
     def assertParsedStructure(self, parser: Parser, result: Node, expected: dict):
         failures = []
-        query_input = parser.lexer.input
+        query_input = cast(str, parser.lexer.input)
         result_string = result.string()
 
         actual_dict = node_to_dict(result)
@@ -166,6 +185,89 @@ class ParserTestCase(unittest.TestCase):
                 },
             )
 
+    def test_column_expression_in(self):
+        for lexer_class in (Lexer, RegexLexer):
+            with self.subTest(lexer_class=lexer_class):
+                query = "x IN (1, 2, 3) AND y IN ('a', 'b, c') OR z IN (1, b)"
+                parser = Parser(lexer_class(query))
+                result = parser.parse_column_expression()
+                self.assertParsedAll(parser, result)
+                self.assertParsedStructure(
+                    parser,
+                    result,
+                    {
+                        "left": {
+                            "left": {
+                                "left": {"column": "x"},
+                                "in_": "IN",
+                                "values": "1, 2, 3",
+                            },
+                            "operator": "AND",
+                            "right": {
+                                "left": {"column": "y"},
+                                "in_": "IN",
+                                "values": "'a', 'b, c'",
+                            },
+                        },
+                        "operator": "OR",
+                        "right": {
+                            "left": {"column": "z"},
+                            "in_": "IN",
+                            "values": {"0": "1", "1": {"column": "b"}},
+                        },
+                    },
+                )
+                literals = result.left.right.values
+                self.assertIsInstance(literals, ast.ColumnLiteralList)
+                self.assertEqual(literals.values, ["'a'", "'b, c'"])
+                self.assertIsNone(literals.original_literal)
+
+                query = "x IN ( 1,2 /* 3, */, -- 4)\n 5 )"
+                result = Parser(lexer_class(query)).parse_column_expression()
+                self.assertEqual(result.values.literal, "1, 2, 5")
+                self.assertEqual(result.original_string(), query)
+                self.assertEqual(result.string(), "x IN (1, 2, 5)")
+
+    def test_column_literal_list_lexers_agree(self):
+        # Lists that are and aren't only literals, parsed with the text skipped
+        # by RegexLexer and token by token with Lexer
+        rng = random.Random(0)
+        items = ["1", "22", "'a'", "'x, y'", "''", "'('", "a", "-1", "1a", "{{ x }}"]
+        separators = [",", ", ", " ,", ",\n", " /* , */ , ", "-- )\n,", "", ", ,"]
+        ends = [")", " )", "/*)*/)", "-- )\n)", "", " x)", " 1)"]
+        for _ in range(2000):
+            text = rng.choice(["", " ", "\n"])
+            values = rng.choice([items[:2], items[2:6], items])
+            for index in range(rng.randint(0, 5)):
+                if index:
+                    text += rng.choice(separators)
+                text += rng.choice(values)
+            query = f"SELECT x IN ({text}{rng.choice(ends)} FROM t"
+            with self.subTest(query=query):
+                results = []
+                for lexer_class in (Lexer, RegexLexer):
+                    parser = Parser(lexer_class(query))
+                    try:
+                        statement = parser.parse_statement()
+                    except ParseError as e:
+                        results.append((e.message, e.offset))
+                        continue
+                    results.append((statement, parser.current_token.start))
+                    self.assertTrue(query.startswith(statement.original_string()))
+                self.assertEqual(results[0], results[1])
+
+    def test_long_literal_list(self):
+        numbers = [str(i) for i in range(100_000)]
+        for text in (", ".join(numbers), ",".join(f"'{n}'" for n in numbers)):
+            query = f"SELECT a FROM t WHERE id IN ({text}) AND b"
+            parser = Parser(RegexLexer(query))
+            result = parser.parse_statement()
+            self.assertEqual(parser.current_token.type, token.EOF)
+            values = result.where.expression.left.values
+            self.assertIsInstance(values, ast.ColumnLiteralList)
+            self.assertEqual(len(values.values), 100_000)
+            self.assertEqual(result.original_string(), query)
+
     def test_column_alias(self):
         with self.subTest("full form"):
             query = "x AS y"
@@ -268,6 +370,622 @@ class ParserTestCase(unittest.TestCase):
             },
         )
 
+    def test_original_string(self):
+        queries = PARSER_QUERIES + [
+            "SELECT ( a ) AS  b, c  d , f (x ) FROM t  u  JOIN v AS w ON x ORDER BY a  ASC"
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                result = Parser(Lexer(query)).parse_statement()
+                self.assertEqual(result.original_string(), query)
+
+        # Table operators, which no query parses to yet
+        table = Parser(Lexer(" t")).parse_table_expression()
+        operator = ast.Keyword(preceding=[" "], trailing=[], keyword="X", literal="x")
+        prefix = ast.TablePrefixExpression(
+            preceding=["  "], operator=operator, right=table, trailing=[" "]
+        )
+        self.assertEqual(prefix.original_string(), "   x t ")
+        self.assertEqual(prefix.string(), "X t")
+        infix = ast.TableInfixExpression(
+            preceding=[], left=prefix, operator=operator, right=table, trailing=[]
+        )
+        self.assertEqual(infix.original_string(), "   x t  x t")
+        self.assertEqual(infix.string(), "X t X t")
+
+    def test_parse_script(self):
+        queries = [
+            "SELECT a; SELECT b FROM t LIMIT 1 ;\n\n",
+            ";; SELECT 1",
+            "SELECT a",
+            "  ",
+            "",
+            ";\n".join(PARSER_QUERIES),
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                statements = list(Parser(Lexer(query)).parse_script())
+                self.assertEqual(
+                    "".join(s.original_string() for s in statements), query
+                )
+
+        statements = list(Parser(Lexer("SELECT a;\n;SELECT b ")).parse_script())
+        self.assertEqual(
+            [s.string() for s in statements], ["SELECT a;", ";", "SELECT b"]
+        )
+        self.assertIsNone(statements[1].statement)
+        self.assertIsNone(statements[2].semicolon)
+
+    def test_parse_script_is_lazy(self):
+        script = Parser(Lexer("SELECT a; SELECT b )")).parse_script()
+        self.assertEqual(next(script).string(), "SELECT a;")
+        with self.assertRaises(ParseError):
+            next(script)
+
+    def test_peek(self):
+        parser = Parser(Lexer("SELECT a, b FROM t"))
+        self.assertEqual(parser.peek(0), parser.current_token)
+        self.assertEqual(parser.peek(1), parser.peek_token)
+        self.assertEqual(parser.peek(4), Token(token.FROM, "FROM"))
+        self.assertEqual(parser.peek(20).type, token.EOF)
+        parser.next_token()
+        self.assertEqual(parser.peek(3), Token(token.FROM, "FROM"))
+
+    def test_mark_and_reset(self):
+        query = ", ".join(f"column_{i}" for i in range(200))
+        lexer = RegexLexer(query)
+        parser = Parser(lexer)
+        expected = Parser(RegexLexer(query)).parse_results_clause()
+
+        mark = parser.mark()
+        # Further than the window is compacted at, to check marks hold it open
+        for _ in range(150):
+            parser.next_token()
+        lexed = lexer.pos
+        parser.reset(mark)
+        self.assertEqual(parser.current_token, Token(token.IDENTIFIER, "column_0"))
+        # Going forward again replays the same tokens without lexing them again
+        mark = parser.mark()
+        for _ in range(150):
+            parser.next_token()
+        self.assertEqual(lexer.pos, lexed)
+        parser.reset(mark)
+        self.assertEqual(parser.parse_results_clause(), expected)
+
+        # A speculative parse to the end is kept by releasing its mark
+        parser = Parser(RegexLexer(query))
+        mark = parser.mark()
+        result = parser.parse_results_clause()
+        parser.release(mark)
+        self.assertEqual(result, expected)
+        self.assertEqual(parser.current_token.type, token.EOF)
+
+    def test_append_trailing_finishes_node_in_place(self):
+        parser = Parser(Lexer("a  , b"))
+        expression = parser.parse_column_expression()
+        self.assertIs(parser.append_trailing(expression), expression)
+        self.assertEqual(expression.trailing, ["  "])
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            expression.trailing = []
+
+    def test_dispatch_tables(self):
+        parser = Parser(Lexer("x"))
+        self.assertEqual(
+            parser.column_infix_parse_fn(token.AS),
+            parser.parse_column_alias_expression,
+        )
+        self.assertIsNone(parser.column_prefix_parse_fn(token.EOF))
+        # Operators are parsed by parse_column_expression itself
+        self.assertIsNone(parser.column_infix_parse_fn(token.AND))
+        self.assertIsNone(parser.column_prefix_parse_fn(token.NOT))
+        self.assertEqual(
+            Parser(Lexer("(a, b IN (c))")).parse_column_list().string(),
+            "(a, b IN (c))",
+        )
+        for kind in token.TokenType:
+            self.assertEqual(
+                column_precedences[kind],
+                token_column_precedences.get(kind, ColumnExpressionPrecedence.LOWEST),
+            )
+
+    def test_parse_error_position(self):
+        query = "SELECT a,\n  b\nFROM )"
+        with self.assertRaises(ParseError) as context:
+            Parser(Lexer(query)).parse_statement()
+        error = context.exception
+        self.assertEqual(error.offset, query.index(")"))
+        self.assertEqual((error.position.line, error.position.column), (3, 6))
+        self.assertEqual(
+            str(error), "no prefix parse function for token RPAREN at line 3, column 6"
+        )
+        self.assertIsNone(ParseError("no position").position)
+
+        copy = pickle.loads(pickle.dumps(error))
+        self.assertEqual(copy.message, error.message)
+        self.assertEqual(copy.offset, error.offset)
+        self.assertEqual(copy.position, error.position)
+        self.assertEqual(str(copy), str(error))
+
+    def test_table_identifier(self):
+        for name, parts in [
+            ("t", (None, None, "t")),
+            ('s."t"', (None, "s", '"t"')),
+            ("d.s.t", ("d", "s", "t")),
+        ]:
+            with self.subTest(name=name):
+                query = f"SELECT a FROM {name} AS x"
+                result = Parser(Lexer(query)).parse_statement()
+                identifier = result.from_.expression.value
+                self.assertEqual(
+                    (identifier.database, identifier.schema, identifier.table), parts
+                )
+                self.assertEqual(result.string(), query)
+
+        # Built by position, as before tables had a database
+        identifier = ast.TableIdentifier([], [], "s", "t")
+        self.assertEqual((identifier.schema, identifier.table), ("s", "t"))
+        self.assertIsNone(identifier.database)
+        self.assertEqual(identifier.string(), "s.t")
+
+    def test_expect(self):
+        for query, message in [
+            ("SELECT a FROM t JOIN u WHERE b", "expected ON, got WHERE"),
+            ("SELECT a.b.c.d", "too many parts in identifier"),
+            ("SELECT a FROM d.s.t.u", "too many parts in identifier"),
+            ("SELECT a ORDER x", "expected BY, got IDENTIFIER"),
+        ]:
+            with self.subTest(query=query):
+                with self.assertRaises(ParseError) as context:
+                    Parser(Lexer(query)).parse_statement()
+                self.assertEqual(context.exception.message, message)
+
+    def test_recover(self):
+        query = (
+            "SELECT a, = b FROM t WHERE (x = ) AND f(y, =, z)\n"
+            "GROUP c ORDER BY d LIMIT )"
+        )
+        parser = Parser(Lexer(query), recover=True)
+        result = parser.parse_statement()
+        self.assertEqual(result.original_string(), query)
+        self.assertEqual(result.results, ast.Error([" "], [], "a, = b"))
+        self.assertEqual(result.from_.string(), "FROM t")
+        condition = result.where.expression
+        self.assertEqual(condition.left.expression, ast.Error([], [" "], "x ="))
+        self.assertEqual(
+            [argument.string() for argument in condition.right.arguments],
+            ["y", "=", "z"],
+        )
+        self.assertIsInstance(condition.right.arguments[1], ast.Error)
+        self.assertEqual(result.group_by, ast.Error([], [], "GROUP c"))
+        self.assertEqual(result.order_by.string(), "ORDER BY d")
+        self.assertEqual(result.limit.string(), "LIMIT )")
+        self.assertEqual(
+            [(error.message, error.position) for error in parser.errors],
+            [
+                ("no prefix parse function for token EQUAL", (1, 11)),
+                ("no prefix parse function for token RPAREN", (1, 33)),
+                ("no prefix parse function for token EQUAL", (1, 44)),
+                ("expected BY, got IDENTIFIER", (2, 7)),
+                ("no prefix parse function for token RPAREN", (2, 26)),
+            ],
+        )
+
+    def test_recover_keeps_first_error(self):
+        # The group fails to recover, as a clause keyword comes before the
+        # closing parenthesis, so the whole clause is skipped
+        query = "SELECT (a = FROM t"
+        parser = Parser(Lexer(query), recover=True)
+        result = parser.parse_statement()
+        self.assertEqual(result.results, ast.Error([" "], [], "(a ="))
+        self.assertEqual(result.from_.string(), "FROM t")
+        self.assertEqual(
+            [error.message for error in parser.errors],
+            ["no prefix parse function for token FROM"],
+        )
+
+    def test_recover_script(self):
+        query = "SELECT a FROM t ) x; INSERT INTO t;\nSELECT b ; SELECT "
+        parser = Parser(Lexer(query), recover=True)
+        statements = list(parser.parse_script())
+        self.assertEqual("".join(s.original_string() for s in statements), query)
+        self.assertEqual(
+            [s.string() for s in statements],
+            ["SELECT a FROM t", ") x;", "INSERT INTO t;", "SELECT b;", "SELECT"],
+        )
+        self.assertEqual(
+            [error.message for error in parser.errors],
+            [
+                "unexpected token RPAREN",
+                "unexpected token IDENTIFIER",
+                "no prefix parse function for token EOF",
+            ],
+        )
+
+    def test_recover_clean_queries(self):
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                parser = Parser(Lexer(query), recover=True)
+                result = parser.parse_statement()
+                self.assertEqual(result, Parser(Lexer(query)).parse_statement())
+                self.assertEqual(parser.errors, [])
+                self.assertEqual(parser.marks, [])
+
+    def test_table_subquery(self):
+        query = "SELECT a FROM (SELECT b FROM (SELECT c FROM t) u WHERE x) AS s"
+        parser = Parser(Lexer(query))
+        result = parser.parse_statement()
+        self.assertParsedAll(parser, result)
+        subquery = result.from_.expression.value
+        self.assertIsInstance(subquery, ast.TableSubquery)
+        self.assertEqual(
+            subquery.statement.from_.expression.value.statement.string(),
+            "SELECT c FROM t",
+        )
+
+        query = "SELECT a FROM ( SELECT b FROM t WHERE x ) AS s"
+        result = Parser(Lexer(query)).parse_statement()
+        self.assertEqual(result.original_string(), query)
+        self.assertEqual(result.string(), "SELECT a FROM (SELECT b FROM t WHERE x) AS s")
+
+    def test_lazy(self):
+        queries = PARSER_QUERIES + [
+            "SELECT a FROM (SELECT b FROM (SELECT c FROM t WHERE (x)) s ) AS u "
+            "JOIN (SELECT 1) v ON u.a = v.a WHERE a = (1) ORDER BY a",
+            "SELECT f(a, (b)) , c FROM t -- c\n WHERE x LIMIT 1 ",
+        ]
+        for lexer_class in (Lexer, RegexLexer):
+            for query in queries:
+                with self.subTest(query=query, lexer_class=lexer_class):
+                    expected = Parser(lexer_class(query)).parse_statement()
+                    result = Parser(lexer_class(query), lazy=True).parse_statement()
+                    self.assertNotIn("results", vars(result))
+                    self.assertEqual(result.from_, expected.from_)
+                    self.assertEqual(result, expected)
+                    self.assertIn("results", vars(result))
+                    self.assertEqual(result.original_string(), query)
+
+                    result = Parser(lexer_class(query), lazy=True).parse_statement()
+                    self.assertEqual(pickle.loads(pickle.dumps(result)), expected)
+
+    def test_lazy_subquery(self):
+        query = "SELECT a FROM (SELECT b FROM t WHERE x = 1) s WHERE y"
+        result = Parser(RegexLexer(query), lazy=True).parse_statement()
+        subquery = result.from_.expression.value
+        self.assertNotIn("statement", vars(subquery))
+        self.assertEqual(subquery.statement.where.string(), "WHERE x = 1")
+        self.assertIs(subquery.statement, subquery.statement)
+        self.assertEqual(result.where.string(), "WHERE y")
+
+        # Far too deep to parse in time if each level skipped the levels within
+        # it again
+        depth = 1000
+        query = (
+            "SELECT a FROM "
+            + "(SELECT f(a) FROM " * depth
+            + "t WHERE (x)"
+            + ") s WHERE (y)" * depth
+        )
+        for lexer_class in (Lexer, RegexLexer):
+            with self.subTest(lexer_class=lexer_class):
+                expected = Parser(lexer_class(query)).parse_statement()
+                result = Parser(lexer_class(query), lazy=True).parse_statement()
+                self.assertEqual(to_list(result), to_list(expected))
+
+    def test_lazy_threads(self):
+        query = "SELECT a FROM t WHERE x = 1"
+        result = Parser(RegexLexer(query), lazy=True).parse_statement()
+        # Both threads parse the clause before either stores it
+        barrier = threading.Barrier(2)
+        parse = result.__dict__["_pending"]["where"]
+
+        def parse_together():
+            barrier.wait()
+            return parse()
+
+        result.__dict__["_pending"]["where"] = parse_together
+        with ThreadPoolExecutor(2) as executor:
+            first, second = executor.map(lambda _: result.where, range(2))
+        self.assertIs(first, second)
+        self.assertIs(result.where, first)
+
+    def test_lazy_errors(self):
+        for lexer_class in (Lexer, RegexLexer):
+            for query, path in [
+                ("SELECT a, FROM t", ["results"]),
+                ("SELECT a FROM t WHERE x = ", ["where"]),
+                # The error is in a clause skipped before the one accessed
+                ("SELECT a, FROM t WHERE x = ", ["where"]),
+                ("SELECT a FROM (SELECT ) s", ["from_", "expression", "value", "statement", "results"]),
+            ]:
+                with self.subTest(query=query, lexer_class=lexer_class):
+                    with self.assertRaises(ParseError) as context:
+                        Parser(lexer_class(query)).parse_statement()
+                    node = Parser(lexer_class(query), lazy=True).parse_statement()
+                    with self.assertRaises(ParseError) as lazy_context:
+                        for name in path:
+                            node = getattr(node, name)
+                    self.assertEqual(lazy_context.exception.offset, context.exception.offset)
+                    self.assertEqual(lazy_context.exception.message, context.exception.message)
+
+            # Tokens left over after a clause are an error when it's parsed, as
+            # they are after a statement parsed straight away
+            result = Parser(lexer_class("SELECT a FROM t WHERE x = 1 1"), lazy=True).parse_statement()
+            with self.assertRaises(ParseError) as context:
+                result.where
+            self.assertEqual(context.exception.message, "unexpected token INTEGER")
+            with self.assertRaises(ParseError) as context:
+                Parser(lexer_class("SELECT a FROM t WHERE x = 1 1")).parse_statement()
+            self.assertEqual(context.exception.message, "unexpected token INTEGER")
+
+        # A lazy parse fails, here or when a clause is accessed, for exactly the
+        # queries that an eager one fails for, with the same error, and
+        # otherwise gives the same tree
+        for query in PARSER_QUERIES + list(mutated_queries(3000)):
+            for lexer_class in (Lexer, RegexLexer):
+                results = []
+                for lazy in (False, True):
+                    try:
+                        parser = Parser(lexer_class(query), lazy=lazy)
+                        statement = parser.parse_statement()
+                        # Parses every lazy clause
+                        results.append(to_list(statement))
+                    except ParseError as error:
+                        results.append((error.message, error.offset))
+                self.assertEqual(results[0], results[1], query)
+
+        with self.assertRaises(ValueError):
+            Parser(Lexer("SELECT a"), recover=True, lazy=True)
+
+    def test_budget(self):
+        query = "SELECT " + ", ".join(f"f(a_{i}) + {i}" for i in range(100))
+        expected = Parser(RegexLexer(query)).parse_statement()
+        budget = ParseBudget(max_tokens=1000, max_depth=10, max_seconds=60.0)
+        for lexer_class in (Lexer, RegexLexer):
+            with self.subTest(lexer_class=lexer_class):
+                parser = Parser(lexer_class(query), budget=budget)
+                self.assertEqual(parser.parse_statement(), expected)
+                self.assertEqual(parser.depth, 0)
+
+                for recover in (False, True):
+                    parser = Parser(
+                        lexer_class(query),
+                        recover=recover,
+                        budget=ParseBudget(max_tokens=200),
+                    )
+                    with self.assertRaises(BudgetExceeded) as context:
+                        parser.parse_statement()
+                    error = context.exception
+                    self.assertEqual(error.limit, "max_tokens")
+                    self.assertGreater(error.stats.tokens, 200)
+                    self.assertLessEqual(error.stats.tokens, 200 + 64)
+                    self.assertEqual(error.offset, parser.current_token.start)
+                    self.assertEqual(parser.errors, [])
+
+        parser = Parser(Lexer(query), budget=ParseBudget(max_seconds=0.0))
+        with self.assertRaises(BudgetExceeded) as context:
+            parser.parse_statement()
+        self.assertEqual(context.exception.limit, "max_seconds")
+        self.assertIn("max_seconds exceeded after 64 tokens", str(context.exception))
+
+        error = pickle.loads(pickle.dumps(context.exception))
+        self.assertEqual(error.limit, "max_seconds")
+        self.assertEqual(error.stats, context.exception.stats)
+        self.assertEqual(error.offset, context.exception.offset)
+        self.assertEqual(error.position, context.exception.position)
+        self.assertEqual(str(error), str(context.exception))
+
+    def test_budget_depth(self):
+        for query in [
+            "SELECT " + "(" * 100 + "a" + ")" * 100,
+            "SELECT " + "NOT " * 100 + "a",
+            "SELECT " + "f(" * 100 + "a" + ")" * 100,
+            "SELECT " + "a IN (" * 100 + "a" + ")" * 100,
+            "SELECT a FROM (" * 100 + "SELECT a" + ") s" * 100,
+        ]:
+            with self.subTest(query=query[:40]):
+                budget = ParseBudget(max_depth=100)
+                Parser(RegexLexer(query), budget=budget).parse_statement()
+                parser = Parser(RegexLexer(query), budget=ParseBudget(max_depth=50))
+                with self.assertRaises(BudgetExceeded) as context:
+                    parser.parse_statement()
+                self.assertEqual(context.exception.limit, "max_depth")
+                self.assertGreater(context.exception.stats.depth, 50)
+
+    def test_budget_literal_lists(self):
+        # Lists of literals are skipped over without filling the window
+        query = "SELECT a FROM t WHERE " + " OR ".join(["x IN (1)"] * 20000)
+        for lexer_class in (Lexer, RegexLexer):
+            with self.subTest(lexer_class=lexer_class):
+                parser = Parser(lexer_class(query), budget=ParseBudget(max_tokens=100))
+                with self.assertRaises(BudgetExceeded) as context:
+                    parser.parse_statement()
+                self.assertLessEqual(context.exception.stats.tokens, 100 + 64)
+
+                budget = ParseBudget(max_tokens=100)
+                parser = Parser(lexer_class(query), lazy=True, budget=budget)
+                with self.assertRaises(BudgetExceeded):
+                    parser.parse_statement().where
+
+    def test_budget_lazy(self):
+        # Checked when a clause is parsed, as tokens skipped over without being
+        # lexed aren't counted
+        query = "SELECT a FROM t WHERE " + " OR ".join(f"a = {i}" for i in range(100))
+        budget = ParseBudget(max_tokens=200)
+        parser = Parser(RegexLexer(query), lazy=True, budget=budget)
+        statement = parser.parse_statement()
+        with self.assertRaises(BudgetExceeded):
+            statement.where
+
+        # Shared by the clauses, though each is within it on its own
+        where = " OR ".join(f"a = {i}" for i in range(40))
+        query = f"SELECT a FROM t WHERE {where} ORDER BY {where}"
+        parser = Parser(RegexLexer(query), lazy=True, budget=budget)
+        statement = parser.parse_statement()
+        statement.where
+        with self.assertRaises(BudgetExceeded) as context:
+            statement.order_by
+        self.assertGreater(context.exception.stats.tokens, 200)
+
+        # Only the time spent parsing counts, not that before a clause is
+        # accessed, or while the caller has a statement of a script
+        budget = ParseBudget(max_seconds=0.05)
+        parser = Parser(RegexLexer(query), lazy=True, budget=budget)
+        statement = parser.parse_statement()
+        time.sleep(0.1)
+        self.assertEqual(statement.where.string(), f"WHERE {where}")
+        script = Parser(RegexLexer(f"{query};{query}"), budget=budget)
+        for _ in script.parse_script():
+            time.sleep(0.1)
+
+        parser = Parser(RegexLexer(query), lazy=True, budget=budget)
+        statement = parser.parse_statement()
+        parser.elapsed[0] = 0.1
+        with self.assertRaises(BudgetExceeded) as context:
+            statement.where
+        self.assertEqual(context.exception.limit, "max_seconds")
+
+    def test_deep_expressions(self):
+        # Each is nested far deeper than the recursion limit
+        depth = 5000
+        chain = "SELECT a FROM t WHERE " + " OR ".join(
+            f"a = {i}" for i in range(depth)
+        )
+        groups = "SELECT " + "(" * depth + "a" + " )" * depth + " AS b"
+        prefixes = "SELECT " + "NOT -" * depth + "a"
+        calls = "SELECT " + "f(" * depth + "a" + ", 1)" * depth
+        in_lists = "SELECT a FROM t WHERE " + "a IN (b, " * depth + "c" + ")" * depth
+        betweens = "SELECT " + "a BETWEEN (" * depth + "b" + ") AND c" * depth
+        subqueries = "SELECT a FROM " + "(SELECT a FROM " * depth + "t" + ")" * depth
+        for query in (chain, groups, prefixes, calls, in_lists, betweens, subqueries):
+            with self.subTest(query=query[:30]):
+                result = Parser(Lexer(query)).parse_statement()
+                self.assertEqual(result.original_string(), query)
+                string = result.string()
+                self.assertEqual(
+                    Parser(Lexer(string)).parse_statement().string(), string
+                )
+
+        result = Parser(Lexer(chain)).parse_statement()
+        condition = result.where.expression
+        self.assertEqual(condition.right.string(), f"a = {depth - 1}")
+        self.assertEqual(condition.left.left.right.string(), f"a = {depth - 3}")
+        # Every infix expression, comparison and operand
+        self.assertEqual(
+            sum(isinstance(node, ast.ColumnInfixExpression) for node in walk(result)),
+            2 * depth - 1,
+        )
+        self.assertEqual(node_to_dict(condition)["right"]["right"], str(depth - 1))
+
+        result = Parser(Lexer(groups)).parse_statement()
+        expression = result.results.expressions[0].value
+        for _ in range(depth):
+            self.assertIsInstance(expression, ast.ColumnGroupExpression)
+            self.assertEqual(expression.expression.trailing, [" "])
+            expression = expression.expression
+        self.assertEqual(expression.string(), "a")
+
+        result = Parser(Lexer(calls)).parse_statement()
+        expression = result.results.expressions[0]
+        for _ in range(depth):
+            self.assertIsInstance(expression, ast.ColumnCallExpression)
+            self.assertEqual(expression.arguments[1].string(), "1")
+            expression = expression.arguments[0]
+        self.assertEqual(expression.string(), "a")
+
+        result = Parser(Lexer(subqueries)).parse_statement()
+        self.assertEqual(
+            sum(isinstance(node, ast.TableSubquery) for node in walk(result)), depth
+        )
+
+    def test_deep_node_to_tree(self):
+        query = "SELECT " + "(" * 1500 + "a" + ")" * 1500
+        tree = node_to_tree(Parser(Lexer(query)).parse_statement())
+        lines = tree.splitlines()
+        self.assertEqual(lines[0], "Select()")
+        self.assertEqual(
+            lines[1], "├── select = Keyword(keyword='SELECT', literal='SELECT')"
+        )
+        self.assertEqual(
+            lines[-1],
+            "    " * 1501 + "└── expression = ColumnIdentifier(column='a')",
+        )
+        self.assertEqual(len(lines), 1500 + 4)
+
+    def test_deep_recover(self):
+        depth = 3000
+        for opening in ("(", "f(", "a IN (b, "):
+            query = "SELECT " + opening * depth + "a = " + ")" * depth + " FROM t"
+            with self.subTest(opening=opening):
+                parser = Parser(Lexer(query), recover=True)
+                result = parser.parse_statement()
+                self.assertEqual(result.original_string(), query)
+                self.assertEqual(result.from_.string(), "FROM t")
+                self.assertEqual(
+                    [error.message for error in parser.errors],
+                    ["no prefix parse function for token RPAREN"],
+                )
+                self.assertEqual(parser.marks, [])
+                self.assertEqual(parser.depth, 0)
+
+        query = "SELECT a FROM " + "(SELECT a = FROM " * depth + "t" + ")" * depth
+        parser = Parser(Lexer(query), recover=True)
+        result = parser.parse_statement()
+        self.assertEqual(result.original_string(), query)
+        self.assertEqual(len(parser.errors), depth)
+        self.assertEqual(parser.marks, [])
+
+    def test_threads(self):
+        tables = (
+            lexer.keyword_tokens,
+            precedence.token_column_precedences,
+            precedence.column_precedences,
+            parser.column_prefix_parse_fns,
+            parser.column_infix_parse_fns,
+        )
+        before = [dict(table) if isinstance(table, dict) else table for table in tables]
+        queries = PARSER_QUERIES + ["SELECT ) FROM t", "SELECT a IN (1, 'b', 2)"]
+
+        def parse_all(seed: int) -> list:
+            results = []
+            for query in random.Random(seed).sample(queries, len(queries)):
+                for options in ({}, {"recover": True}, {"lazy": True}):
+                    p = Parser(RegexLexer(query), budget=ParseBudget(), **options)
+                    result: object
+                    try:
+                        statement = p.parse_statement()
+                        # Parses every lazy clause
+                        statement.string()
+                        result = statement
+                    except ParseError as error:
+                        result = str(error)
+                    results.append((query, options, result))
+            return sorted(results, key=repr)
+
+        expected = parse_all(0)
+        with ThreadPoolExecutor(8) as executor:
+            for result in executor.map(parse_all, range(32)):
+                self.assertEqual(result, expected)
+        self.assertEqual(list(tables), before)
+
+    def test_threads_share_lazy_node(self):
+        query = "SELECT a, b FROM t WHERE x = 1 ORDER BY a"
+        expected = Parser(RegexLexer(query)).parse_statement()
+        for _ in range(20):
+            result = Parser(RegexLexer(query), lazy=True).parse_statement()
+            barrier = threading.Barrier(8)
+
+            def access() -> tuple:
+                barrier.wait()
+                return (result.results, result.where, result.order_by)
+
+            with ThreadPoolExecutor(8) as executor:
+                accessed = list(executor.map(lambda _: access(), range(8)))
+            for clauses in accessed:
+                self.assertEqual(
+                    clauses, (expected.results, expected.where, expected.order_by)
+                )
+            self.assertEqual(vars(result)["_pending"], {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import pickle
+import random
+import threading
+import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from husky_whale.lexer import BytesLexer, Lexer, RegexLexer
+from husky_whale.position import LineIndex, Position
+from husky_whale.token_arrays import TokenArrayLexer, tokenize
+
+
+def naive_position(input, offset: int) -> Position:
+    newline = "\n" if isinstance(input, str) else b"\n"
+    line_start = input.rfind(newline, 0, offset) + 1
+    return Position(input.count(newline, 0, offset) + 1, offset - line_start + 1)
+
+
+class LineIndexTestCase(unittest.TestCase):
+    def test_position_of(self):
+        lines = LineIndex("ab\ncd\n\ne")
+        self.assertEqual(lines.position_of(0), Position(1, 1))
+        self.assertEqual(lines.position_of(2), Position(1, 3))
+        self.assertEqual(lines.position_of(3), Position(2, 1))
+        self.assertEqual(lines.position_of(6), Position(3, 1))
+        self.assertEqual(lines.position_of(7), Position(4, 1))
+        self.assertEqual(lines.position_of(8), Position(4, 2))
+
+    def test_random_offsets(self):
+        rng = random.Random(6)
+        text = "".join(rng.choice("ab \n") for _ in range(2000))
+        for input in (text, text.encode("utf-8")):
+            lines = LineIndex(input)
+            # Out of order, so that lookups go both behind and past the scan
+            for _ in range(500):
+                offset = rng.randrange(len(input) + 1)
+                self.assertEqual(
+                    lines.position_of(offset), naive_position(input, offset)
+                )
+
+    def test_pickle(self):
+        lines = LineIndex("ab\ncd\n\ne")
+        lines.position_of(4)
+        data = pickle.dumps(lines)
+        # Only the line starts go with it
+        self.assertNotIn(b"ab", data)
+        copy = pickle.loads(data)
+        self.assertEqual(copy.line_starts, array("q", [0, 3, 6, 7]))
+        self.assertEqual(copy.position_of(8), Position(4, 2))
+
+        lines = LineIndex(b"a\nb")
+        copy = pickle.loads(pickle.dumps(lines))
+        self.assertEqual(copy.position_of(2), Position(2, 1))
+        self.assertEqual(copy.newline, b"\n")
+
+    def test_lexers(self):
+        query = "SELECT a,\n  'b\nc' AS \"d\ne\"\nFROM t"
+        offset = query.index("FROM")
+        for lexer in (
+            Lexer(query),
+            RegexLexer(query),
+            BytesLexer(query.encode("utf-8")),
+            TokenArrayLexer(tokenize(query)),
+        ):
+            with self.subTest(lexer=type(lexer).__name__):
+                self.assertEqual(lexer.position_of(offset), Position(5, 1))
+
+    def test_threads(self):
+        rng = random.Random(7)
+        text = "".join(rng.choice("ab \n") for _ in range(20000))
+        offsets = [rng.randrange(len(text) + 1) for _ in range(2000)]
+        expected = [naive_position(text, offset) for offset in offsets]
+        for _ in range(5):
+            lines = LineIndex(text)
+            barrier = threading.Barrier(8)
+
+            def look_up(start: int) -> list:
+                barrier.wait()
+                return [lines.position_of(offset) for offset in offsets[start:]]
+
+            with ThreadPoolExecutor(8) as executor:
+                for start, result in zip(
+                    range(0, 800, 100), executor.map(look_up, range(0, 800, 100))
+                ):
+                    self.assertEqual(result, expected[start:])
+            self.assertEqual(
+                len(lines.line_starts), text.count("\n", 0, max(offsets)) + 1
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from typing import List, Optional, Tuple
+
+from husky_whale import ast
+from husky_whale import token
+from husky_whale.corpus import LEXER_QUERIES, PARSER_QUERIES, mutated_queries
+from husky_whale.lexer import RegexLexer
+from husky_whale.parser import ParseError, Parser
+from husky_whale.tables import TableReference, scan_tables
+from husky_whale.utils import walk
+
+QUERIES = PARSER_QUERIES + [
+    'SELECT a FROM "s"."t" JOIN u.v ON x JOIN w AS "w" ON y',
+    "SELECT a FROM (SELECT b FROM (SELECT c FROM s.t) x JOIN u ON y) AS z",
+    "SELECT a FROM -- t\n /* u */ v",
+    "SELECT 'FROM t', from_date FROM t",
+    "SELECT a FROM {{ table }} JOIN t ON x",
+    "SELECT a FROM d.s.t JOIN u ON x",
+]
+
+
+def parsed_tables(
+    query: str,
+) -> Optional[List[Tuple[Optional[str], Optional[str], str]]]:
+    """The tables of the query as parsed, or None if it doesn't parse to the end."""
+    parser = Parser(RegexLexer(query))
+    try:
+        statement = parser.parse_statement()
+    except ParseError:
+        return None
+    if parser.current_token.type != token.EOF:
+        return None
+    return [
+        (node.database, node.schema, node.table)
+        for node in walk(statement)
+        if isinstance(node, ast.TableIdentifier)
+    ]
+
+
+class ScanTablesTestCase(unittest.TestCase):
+    def test_scan_tables(self):
+        self.assertEqual(
+            scan_tables("SELECT a FROM s.t JOIN (SELECT b FROM u) v ON x"),
+            [
+                TableReference(None, "s", "t", 14, 17),
+                TableReference(None, None, "u", 38, 39),
+            ],
+        )
+        self.assertEqual(
+            scan_tables("SELECT a FROM d.s.t"), [TableReference("d", "s", "t", 14, 19)]
+        )
+        self.assertEqual(scan_tables("SELECT a FROM t; SELECT b FROM u")[1].table, "u")
+        self.assertEqual(scan_tables("SELECT 1"), [])
+        with self.assertRaises(ParseError):
+            scan_tables("SELECT a FROM a.b.c.d")
+
+    def test_same_as_parser(self):
+        for query in QUERIES + list(mutated_queries(5000)):
+            expected = parsed_tables(query)
+            if expected is None:
+                continue
+            with self.subTest(query=query):
+                result = scan_tables(query)
+                self.assertEqual(
+                    [(table.database, table.schema, table.table) for table in result],
+                    expected,
+                )
+                for table in result:
+                    self.assertEqual(
+                        query[table.start : table.end],
+                        ".".join(part for part in table if isinstance(part, str)),
+                    )
+
+    def test_malformed(self):
+        # Only checks that scanning never fails on text the lexer can lex
+        for query in LEXER_QUERIES + list(mutated_queries(5000, seed=1)):
+            try:
+                scan_tables(query)
+            except ParseError as e:
+                self.assertEqual(e.message, "too many parts in identifier")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+
+from husky_whale import ast
+from husky_whale import token
+from husky_whale.lexer import Lexer
+from husky_whale.parser import ParseError, Parser
+from husky_whale.template import Template
+from husky_whale.test_lexer import read_all_tokens
+from husky_whale.token import Token
+
+QUERY = (
+    "SELECT a, {{ column }} AS c\n"
+    "FROM {{table}} t JOIN s ON t.id = s.id\n"
+    "WHERE date < {{input_date}} AND b = '{}'"
+)
+
+
+class TemplateTestCase(unittest.TestCase):
+    def test_lexer(self):
+        self.assertEqual(
+            read_all_tokens(Lexer("x<{{ d }}")),
+            [
+                Token(token.IDENTIFIER, "x"),
+                Token(token.LT, "<"),
+                Token(token.PLACEHOLDER, "{{ d }}"),
+                Token(token.EOF, ""),
+            ],
+        )
+
+    def test_parse(self):
+        template = Template.parse(QUERY)
+        self.assertEqual(template.names, ["column", "table", "input_date"])
+        self.assertEqual(template.statement.original_string(), QUERY)
+        self.assertEqual(
+            template.statement.where.expression.left.right,
+            ast.ColumnPlaceholder(
+                preceding=[" "], literal="{{input_date}}", trailing=[]
+            ),
+        )
+        self.assertIsInstance(
+            template.statement.from_.expression.left.value, ast.TablePlaceholder
+        )
+
+    def test_render(self):
+        template = Template.parse(QUERY)
+        values = {"column": "x + 1", "table": "s.users", "input_date": "'2020-01-01'"}
+        expected = (
+            "SELECT a, x + 1 AS c\n"
+            "FROM s.users t JOIN s ON t.id = s.id\n"
+            "WHERE date < '2020-01-01' AND b = '{}'"
+        )
+        self.assertEqual(template.render(values), expected)
+        # Unbound placeholders are left in place
+        self.assertEqual(
+            template.render({"column": "x"}),
+            QUERY.replace("{{ column }}", "x"),
+        )
+
+    def test_bind(self):
+        template = Template.parse(QUERY)
+        values = {"column": "x", "table": "s.users", "input_date": "'2020-01-01'"}
+        statement = template.bind(values)
+        self.assertEqual(statement.original_string(), template.render(values))
+        self.assertEqual(
+            statement.from_.expression.left.value,
+            ast.TableIdentifier(
+                preceding=[" "],
+                database=None,
+                schema="s",
+                table="users",
+                trailing=[" "],
+            ),
+        )
+        self.assertEqual(
+            statement.where.expression.left.right,
+            ast.ColumnLiteral(preceding=[" "], literal="'2020-01-01'", trailing=[]),
+        )
+        # Nodes without placeholders below them are shared with the template
+        self.assertIs(statement.select, template.statement.select)
+        self.assertIs(
+            statement.from_.expression.right, template.statement.from_.expression.right
+        )
+        self.assertEqual(template.statement.original_string(), QUERY)
+
+    def test_bind_same_as_parse(self):
+        template = Template.parse("SELECT f({{a}}, {{ b }}) FROM t WHERE x = {{a}}")
+        values = {"a": "1", "b": "'b'"}
+        rendered = template.render(values)
+        self.assertEqual(rendered, "SELECT f(1, 'b') FROM t WHERE x = 1")
+        self.assertEqual(
+            template.bind(values), Parser(Lexer(rendered)).parse_statement()
+        )
+
+    def test_bind_values_as_parsed(self):
+        cases = [
+            ("SELECT {{v}} FROM t", "a.b"),
+            ("SELECT {{v}} AS c, d FROM t", "f(x, 1)"),
+            ("SELECT {{v}}, d FROM t", "y + 1"),
+            ("SELECT f({{v}}) FROM t", "y + 1 AS z"),
+            ("SELECT a FROM t WHERE x * {{ v }} > 2", "(y + 1)"),
+            ("SELECT a FROM t WHERE x = {{v}} AND y", "NULL"),
+            ("SELECT a FROM t WHERE {{v}} ORDER BY a", "x = 1 OR y"),
+            ("SELECT a FROM t WHERE x IN ({{v}})", "1, 2"),
+            ("SELECT a FROM t WHERE x IN ({{v}}, {{w}})", "'a'"),
+            ("SELECT a FROM t WHERE x IN ({{v}}, {{w}})", "b"),
+            ("SELECT a FROM t WHERE x IN (f({{v}}) , {{w}})", "1"),
+            ("SELECT a FROM {{v}} JOIN u ON a", "d.s.t"),
+            ("SELECT a FROM {{v}}", "s.t x JOIN u ON a"),
+            ("SELECT a FROM {{v}} u", "(SELECT 1)"),
+        ]
+        for query, value in cases:
+            with self.subTest(query=query, value=value):
+                template = Template.parse(query)
+                values = {"v": value, "w": value}
+                rendered = template.render(values)
+                self.assertEqual(
+                    template.bind(values), Parser(Lexer(rendered)).parse_statement()
+                )
+
+    def test_bind_rejects(self):
+        cases = [
+            ("SELECT x * {{v}} FROM t", "y + 1"),
+            ("SELECT {{v}} AS c FROM t", "y + 1"),
+            ("SELECT a FROM {{v}} u", "s.t v"),
+            ("SELECT a FROM t WHERE x = {{v}}", " 1"),
+            ("SELECT a FROM t WHERE x IN ({{v}})", "1,"),
+        ]
+        for query, value in cases:
+            with self.subTest(query=query, value=value):
+                template = Template.parse(query)
+                with self.assertRaises((ValueError, ParseError)):
+                    template.bind({"v": value})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from husky_whale import token
+from husky_whale.corpus import LEXER_QUERIES, PARSER_QUERIES
+from husky_whale.lexer import Lexer
+from husky_whale.parser import Parser
+from husky_whale.test_lexer import read_all_tokens
+from husky_whale.token_arrays import TokenArrayLexer, tokenize
+
+
+class TokenizeTestCase(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        for query in LEXER_QUERIES + PARSER_QUERIES:
+            with self.subTest(query=query):
+                arrays = tokenize(query)
+                tokens = [arrays.token(index) for index in range(len(arrays))]
+                self.assertEqual(tokens, read_all_tokens(Lexer(query))[:-1])
+
+    def test_columns(self):
+        arrays = tokenize("SELECT x, 'y'")
+        self.assertEqual(
+            list(arrays.types),
+            [
+                token.SELECT,
+                token.WHITESPACE,
+                token.IDENTIFIER,
+                token.COMMA,
+                token.WHITESPACE,
+                token.STRING,
+            ],
+        )
+        self.assertEqual(list(arrays.starts), [0, 6, 7, 8, 9, 10])
+        self.assertEqual(list(arrays.ends), [6, 7, 8, 9, 10, 13])
+        self.assertEqual(arrays.literal(5), "'y'")
+        self.assertEqual(memoryview(arrays.types).itemsize, 2)
+
+    def test_type_counts(self):
+        counts = tokenize("a + b + c").type_counts()
+        self.assertEqual(
+            counts, {token.IDENTIFIER: 3, token.PLUS: 2, token.WHITESPACE: 4}
+        )
+
+    def test_parser_reads_token_arrays(self):
+        for query in PARSER_QUERIES:
+            with self.subTest(query=query):
+                expected = Parser(Lexer(query)).parse_statement()
+                parser = Parser(TokenArrayLexer(tokenize(query)))
+                self.assertEqual(parser.parse_statement(), expected)
+                self.assertEqual(parser.current_token.type, token.EOF)
+
+
+if __name__ == "__main__":
+    unittest.main()
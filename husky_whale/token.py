@@ -1,203 +1,460 @@
-from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Final, List, Optional
+
+
+class TokenType(IntEnum):
+    # Token types
+    ILLEGAL = 0
+    EOF = 1
+    PLUS = 2
+    SUBTRACT = 3
+    ASTERISK = 4
+    SLASH = 5
+    PIPE = 6
+    PIPEPIPE = 7
+    EQUAL = 8
+    BANG = 9
+    BANGEQUAL = 10
+    LT = 11
+    LTGT = 12
+    LTEQUAL = 13
+    GT = 14
+    GTEQUAL = 15
+    COMMA = 16
+    FULLSTOP = 17
+    COLON = 18
+    COLONCOLON = 19
+    LPAREN = 20
+    RPAREN = 21
+
+    WHITESPACE = 22
+    COMMENT_SINGLE = 23
+    COMMENT_MULTI = 24
+
+    IDENTIFIER = 25
+    INTEGER = 26
+    ASSIGNMENT = 27
+    STRING = 28
+
+    BY = 29
+
+    # Functions
+    COUNT = 30
+    SUM = 31
+    AVG = 32
+
+    # Keywords from https://docs.aws.amazon.com/redshift/latest/dg/r_pg_keywords.html
+    AES128 = 33
+    AES256 = 34
+    ALL = 35
+    ALLOWOVERWRITE = 36
+    ANALYSE = 37
+    ANALYZE = 38
+    AND = 39
+    ANY = 40
+    ARRAY = 41
+    AS = 42
+    ASC = 43
+    AUTHORIZATION = 44
+    AZ64 = 45
+    BACKUP = 46
+    BETWEEN = 47
+    BINARY = 48
+    BLANKSASNULL = 49
+    BOTH = 50
+    BYTEDICT = 51
+    BZIP2 = 52
+    CASE = 53
+    CAST = 54
+    CHECK = 55
+    COLLATE = 56
+    COLUMN = 57
+    CONSTRAINT = 58
+    CREATE = 59
+    CREDENTIALS = 60
+    CROSS = 61
+    CURRENT_DATE = 62
+    CURRENT_TIME = 63
+    CURRENT_TIMESTAMP = 64
+    CURRENT_USER = 65
+    CURRENT_USER_ID = 66
+    DEFAULT = 67
+    DEFERRABLE = 68
+    DEFLATE = 69
+    DEFRAG = 70
+    DELTA = 71
+    DELTA32K = 72
+    DESC = 73
+    DISABLE = 74
+    DISTINCT = 75
+    DO = 76
+    ELSE = 77
+    EMPTYASNULL = 78
+    ENABLE = 79
+    ENCODE = 80
+    ENCRYPT = 81
+    ENCRYPTION = 82
+    END = 83
+    EXCEPT = 84
+    EXPLICIT = 85
+    FALSE = 86
+    FOR = 87
+    FOREIGN = 88
+    FREEZE = 89
+    FROM = 90
+    FULL = 91
+    GLOBALDICT256 = 92
+    GLOBALDICT64K = 93
+    GRANT = 94
+    GROUP = 95
+    GZIP = 96
+    HAVING = 97
+    IDENTITY = 98
+    IGNORE = 99
+    ILIKE = 100
+    IN = 101
+    INITIALLY = 102
+    INNER = 103
+    INTERSECT = 104
+    INTO = 105
+    IS = 106
+    ISNULL = 107
+    JOIN = 108
+    LANGUAGE = 109
+    LEADING = 110
+    LEFT = 111
+    LIKE = 112
+    LIMIT = 113
+    LOCALTIME = 114
+    LOCALTIMESTAMP = 115
+    LUN = 116
+    LUNS = 117
+    LZO = 118
+    LZOP = 119
+    MINUS = 120
+    MOSTLY13 = 121
+    MOSTLY32 = 122
+    MOSTLY8 = 123
+    NATURAL = 124
+    NEW = 125
+    NOT = 126
+    NOTNULL = 127
+    NULL = 128
+    NULLS = 129
+    OFF = 130
+    OFFLINE = 131
+    OFFSET = 132
+    OID = 133
+    OLD = 134
+    ON = 135
+    ONLY = 136
+    OPEN = 137
+    OR = 138
+    ORDER = 139
+    OUTER = 140
+    OVERLAPS = 141
+    PARALLEL = 142
+    PARTITION = 143
+    PERCENT = 144
+    PERMISSIONS = 145
+    PLACING = 146
+    PRIMARY = 147
+    RAW = 148
+    READRATIO = 149
+    RECOVER = 150
+    REFERENCES = 151
+    RESPECT = 152
+    REJECTLOG = 153
+    RESORT = 154
+    RESTORE = 155
+    RIGHT = 156
+    SELECT = 157
+    SESSION_USER = 158
+    SIMILAR = 159
+    SNAPSHOT = 160
+    SOME = 161
+    SYSDATE = 162
+    SYSTEM = 163
+    TABLE = 164
+    TAG = 165
+    TDES = 166
+    TEXT255 = 167
+    TEXT32K = 168
+    THEN = 169
+    TIMESTAMP = 170
+    TO = 171
+    TOP = 172
+    TRAILING = 173
+    TRUE = 174
+    TRUNCATECOLUMNS = 175
+    UNION = 176
+    UNIQUE = 177
+    USER = 178
+    USING = 179
+    VERBOSE = 180
+    WALLET = 181
+    WHEN = 182
+    WHERE = 183
+    WITH = 184
+    WITHOUT = 185
+
+    # Template variables, e.g. {{input_date}}
+    PLACEHOLDER = 186
+
+    # Statement separator
+    SEMICOLON = 187
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.name, format_spec)
 
 
-@dataclass(frozen=True)
 class Token:
-    type: str
-    literal: str
-
-
-# Token types
-ILLEGAL = "ILLEGAL"
-EOF = "EOF"
-PLUS = "PLUS"
-SUBTRACT = "SUBTRACT"
-ASTERISK = "ASTERISK"
-SLASH = "SLASH"
-PIPE = "PIPE"
-PIPEPIPE = "PIPEPIPE"
-EQUAL = "EQUAL"
-BANG = "BANG"
-BANGEQUAL = "BANGEQUAL"
-LT = "LT"
-LTGT = "LTGT"
-LTEQUAL = "LTEQUAL"
-GT = "GT"
-GTEQUAL = "GTEQUAL"
-COMMA = "COMMA"
-FULLSTOP = "FULLSTOP"
-COLON = "COLON"
-COLONCOLON = "COLONCOLON"
-LPAREN = "LPAREN"
-RPAREN = "RPAREN"
-
-WHITESPACE = "WHITESPACE"
-COMMENT_SINGLE = "COMMENT_SINGLE"
-COMMENT_MULTI = "COMMENT_MULTI"
-
-IDENTIFIER = "IDENTIFIER"
-INTEGER = "INTEGER"
-ASSIGNMENT = "ASSIGNMENT"
-STRING = "STRING"
-
-BY = "BY"
-
-# Functions
-COUNT = "COUNT"
-SUM = "SUM"
-AVG = "AVG"
-
-# Keywords from https://docs.aws.amazon.com/redshift/latest/dg/r_pg_keywords.html
-AES128 = "AES128"
-AES256 = "AES256"
-ALL = "ALL"
-ALLOWOVERWRITE = "ALLOWOVERWRITE"
-ANALYSE = "ANALYSE"
-ANALYZE = "ANALYZE"
-AND = "AND"
-ANY = "ANY"
-ARRAY = "ARRAY"
-AS = "AS"
-ASC = "ASC"
-AUTHORIZATION = "AUTHORIZATION"
-AZ64 = "AZ64"
-BACKUP = "BACKUP"
-BETWEEN = "BETWEEN"
-BINARY = "BINARY"
-BLANKSASNULL = "BLANKSASNULL"
-BOTH = "BOTH"
-BYTEDICT = "BYTEDICT"
-BZIP2 = "BZIP2"
-CASE = "CASE"
-CAST = "CAST"
-CHECK = "CHECK"
-COLLATE = "COLLATE"
-COLUMN = "COLUMN"
-CONSTRAINT = "CONSTRAINT"
-CREATE = "CREATE"
-CREDENTIALS = "CREDENTIALS"
-CROSS = "CROSS"
-CURRENT_DATE = "CURRENT_DATE"
-CURRENT_TIME = "CURRENT_TIME"
-CURRENT_TIMESTAMP = "CURRENT_TIMESTAMP"
-CURRENT_USER = "CURRENT_USER"
-CURRENT_USER_ID = "CURRENT_USER_ID"
-DEFAULT = "DEFAULT"
-DEFERRABLE = "DEFERRABLE"
-DEFLATE = "DEFLATE"
-DEFRAG = "DEFRAG"
-DELTA = "DELTA"
-DELTA32K = "DELTA32K"
-DESC = "DESC"
-DISABLE = "DISABLE"
-DISTINCT = "DISTINCT"
-DO = "DO"
-ELSE = "ELSE"
-EMPTYASNULL = "EMPTYASNULL"
-ENABLE = "ENABLE"
-ENCODE = "ENCODE"
-ENCRYPT = "ENCRYPT"
-ENCRYPTION = "ENCRYPTION"
-END = "END"
-EXCEPT = "EXCEPT"
-EXPLICIT = "EXPLICIT"
-FALSE = "FALSE"
-FOR = "FOR"
-FOREIGN = "FOREIGN"
-FREEZE = "FREEZE"
-FROM = "FROM"
-FULL = "FULL"
-GLOBALDICT256 = "GLOBALDICT256"
-GLOBALDICT64K = "GLOBALDICT64K"
-GRANT = "GRANT"
-GROUP = "GROUP"
-GZIP = "GZIP"
-HAVING = "HAVING"
-IDENTITY = "IDENTITY"
-IGNORE = "IGNORE"
-ILIKE = "ILIKE"
-IN = "IN"
-INITIALLY = "INITIALLY"
-INNER = "INNER"
-INTERSECT = "INTERSECT"
-INTO = "INTO"
-IS = "IS"
-ISNULL = "ISNULL"
-JOIN = "JOIN"
-LANGUAGE = "LANGUAGE"
-LEADING = "LEADING"
-LEFT = "LEFT"
-LIKE = "LIKE"
-LIMIT = "LIMIT"
-LOCALTIME = "LOCALTIME"
-LOCALTIMESTAMP = "LOCALTIMESTAMP"
-LUN = "LUN"
-LUNS = "LUNS"
-LZO = "LZO"
-LZOP = "LZOP"
-MINUS = "MINUS"
-MOSTLY13 = "MOSTLY13"
-MOSTLY32 = "MOSTLY32"
-MOSTLY8 = "MOSTLY8"
-NATURAL = "NATURAL"
-NEW = "NEW"
-NOT = "NOT"
-NOTNULL = "NOTNULL"
-NULL = "NULL"
-NULLS = "NULLS"
-OFF = "OFF"
-OFFLINE = "OFFLINE"
-OFFSET = "OFFSET"
-OID = "OID"
-OLD = "OLD"
-ON = "ON"
-ONLY = "ONLY"
-OPEN = "OPEN"
-OR = "OR"
-ORDER = "ORDER"
-OUTER = "OUTER"
-OVERLAPS = "OVERLAPS"
-PARALLEL = "PARALLEL"
-PARTITION = "PARTITION"
-PERCENT = "PERCENT"
-PERMISSIONS = "PERMISSIONS"
-PLACING = "PLACING"
-PRIMARY = "PRIMARY"
-RAW = "RAW"
-READRATIO = "READRATIO"
-RECOVER = "RECOVER"
-REFERENCES = "REFERENCES"
-RESPECT = "RESPECT"
-REJECTLOG = "REJECTLOG"
-RESORT = "RESORT"
-RESTORE = "RESTORE"
-RIGHT = "RIGHT"
-SELECT = "SELECT"
-SESSION_USER = "SESSION_USER"
-SIMILAR = "SIMILAR"
-SNAPSHOT = "SNAPSHOT"
-SOME = "SOME"
-SYSDATE = "SYSDATE"
-SYSTEM = "SYSTEM"
-TABLE = "TABLE"
-TAG = "TAG"
-TDES = "TDES"
-TEXT255 = "TEXT255"
-TEXT32K = "TEXT32K"
-THEN = "THEN"
-TIMESTAMP = "TIMESTAMP"
-TO = "TO"
-TOP = "TOP"
-TRAILING = "TRAILING"
-TRUE = "TRUE"
-TRUNCATECOLUMNS = "TRUNCATECOLUMNS"
-UNION = "UNION"
-UNIQUE = "UNIQUE"
-USER = "USER"
-USING = "USING"
-VERBOSE = "VERBOSE"
-WALLET = "WALLET"
-WHEN = "WHEN"
-WHERE = "WHERE"
-WITH = "WITH"
-WITHOUT = "WITHOUT"
+    """
+    A token points into the source it was lexed from, and only slices out its
+    literal when asked, so lexing copies no text.
+
+    Its type is an int kind, one of the module-level aliases such as SELECT,
+    which type_names and kinds turn back into a name or a TokenType. Tokens
+    compare equal when their types and literals match, wherever they came from.
+    """
+
+    __slots__ = ("type", "source", "start", "end")
+
+    def __init__(
+        self, type: int, source: Any, start: int = 0, end: Optional[int] = None
+    ):
+        self.type = type
+        # A str, or UTF-8 bytes or an mmap of them for a BytesToken
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    @property
+    def literal(self) -> str:
+        return self.source[self.start : self.end]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return self.type == other.type and self.literal == other.literal
+
+    def __hash__(self) -> int:
+        return hash((self.type, self.literal))
+
+    def __repr__(self) -> str:
+        return f"Token(type={type_names[self.type]}, literal={self.literal!r})"
+
+
+class BytesToken(Token):
+    """A Token lexed from UTF-8 bytes: its offsets count bytes, not characters."""
+
+    __slots__ = ()
+
+    @property
+    def literal(self) -> str:
+        return str(self.source[self.start : self.end], "utf-8")
+
+
+# Module-level aliases, so token types can be written as e.g. token.SELECT. They
+# are plain ints, which tokens hold as their type, as comparing and hashing ints
+# is faster than TokenType members.
+ILLEGAL: Final = TokenType.ILLEGAL.value
+EOF: Final = TokenType.EOF.value
+PLUS: Final = TokenType.PLUS.value
+SUBTRACT: Final = TokenType.SUBTRACT.value
+ASTERISK: Final = TokenType.ASTERISK.value
+SLASH: Final = TokenType.SLASH.value
+PIPE: Final = TokenType.PIPE.value
+PIPEPIPE: Final = TokenType.PIPEPIPE.value
+EQUAL: Final = TokenType.EQUAL.value
+BANG: Final = TokenType.BANG.value
+BANGEQUAL: Final = TokenType.BANGEQUAL.value
+LT: Final = TokenType.LT.value
+LTGT: Final = TokenType.LTGT.value
+LTEQUAL: Final = TokenType.LTEQUAL.value
+GT: Final = TokenType.GT.value
+GTEQUAL: Final = TokenType.GTEQUAL.value
+COMMA: Final = TokenType.COMMA.value
+FULLSTOP: Final = TokenType.FULLSTOP.value
+COLON: Final = TokenType.COLON.value
+COLONCOLON: Final = TokenType.COLONCOLON.value
+LPAREN: Final = TokenType.LPAREN.value
+RPAREN: Final = TokenType.RPAREN.value
+WHITESPACE: Final = TokenType.WHITESPACE.value
+COMMENT_SINGLE: Final = TokenType.COMMENT_SINGLE.value
+COMMENT_MULTI: Final = TokenType.COMMENT_MULTI.value
+IDENTIFIER: Final = TokenType.IDENTIFIER.value
+INTEGER: Final = TokenType.INTEGER.value
+ASSIGNMENT: Final = TokenType.ASSIGNMENT.value
+STRING: Final = TokenType.STRING.value
+BY: Final = TokenType.BY.value
+COUNT: Final = TokenType.COUNT.value
+SUM: Final = TokenType.SUM.value
+AVG: Final = TokenType.AVG.value
+AES128: Final = TokenType.AES128.value
+AES256: Final = TokenType.AES256.value
+ALL: Final = TokenType.ALL.value
+ALLOWOVERWRITE: Final = TokenType.ALLOWOVERWRITE.value
+ANALYSE: Final = TokenType.ANALYSE.value
+ANALYZE: Final = TokenType.ANALYZE.value
+AND: Final = TokenType.AND.value
+ANY: Final = TokenType.ANY.value
+ARRAY: Final = TokenType.ARRAY.value
+AS: Final = TokenType.AS.value
+ASC: Final = TokenType.ASC.value
+AUTHORIZATION: Final = TokenType.AUTHORIZATION.value
+AZ64: Final = TokenType.AZ64.value
+BACKUP: Final = TokenType.BACKUP.value
+BETWEEN: Final = TokenType.BETWEEN.value
+BINARY: Final = TokenType.BINARY.value
+BLANKSASNULL: Final = TokenType.BLANKSASNULL.value
+BOTH: Final = TokenType.BOTH.value
+BYTEDICT: Final = TokenType.BYTEDICT.value
+BZIP2: Final = TokenType.BZIP2.value
+CASE: Final = TokenType.CASE.value
+CAST: Final = TokenType.CAST.value
+CHECK: Final = TokenType.CHECK.value
+COLLATE: Final = TokenType.COLLATE.value
+COLUMN: Final = TokenType.COLUMN.value
+CONSTRAINT: Final = TokenType.CONSTRAINT.value
+CREATE: Final = TokenType.CREATE.value
+CREDENTIALS: Final = TokenType.CREDENTIALS.value
+CROSS: Final = TokenType.CROSS.value
+CURRENT_DATE: Final = TokenType.CURRENT_DATE.value
+CURRENT_TIME: Final = TokenType.CURRENT_TIME.value
+CURRENT_TIMESTAMP: Final = TokenType.CURRENT_TIMESTAMP.value
+CURRENT_USER: Final = TokenType.CURRENT_USER.value
+CURRENT_USER_ID: Final = TokenType.CURRENT_USER_ID.value
+DEFAULT: Final = TokenType.DEFAULT.value
+DEFERRABLE: Final = TokenType.DEFERRABLE.value
+DEFLATE: Final = TokenType.DEFLATE.value
+DEFRAG: Final = TokenType.DEFRAG.value
+DELTA: Final = TokenType.DELTA.value
+DELTA32K: Final = TokenType.DELTA32K.value
+DESC: Final = TokenType.DESC.value
+DISABLE: Final = TokenType.DISABLE.value
+DISTINCT: Final = TokenType.DISTINCT.value
+DO: Final = TokenType.DO.value
+ELSE: Final = TokenType.ELSE.value
+EMPTYASNULL: Final = TokenType.EMPTYASNULL.value
+ENABLE: Final = TokenType.ENABLE.value
+ENCODE: Final = TokenType.ENCODE.value
+ENCRYPT: Final = TokenType.ENCRYPT.value
+ENCRYPTION: Final = TokenType.ENCRYPTION.value
+END: Final = TokenType.END.value
+EXCEPT: Final = TokenType.EXCEPT.value
+EXPLICIT: Final = TokenType.EXPLICIT.value
+FALSE: Final = TokenType.FALSE.value
+FOR: Final = TokenType.FOR.value
+FOREIGN: Final = TokenType.FOREIGN.value
+FREEZE: Final = TokenType.FREEZE.value
+FROM: Final = TokenType.FROM.value
+FULL: Final = TokenType.FULL.value
+GLOBALDICT256: Final = TokenType.GLOBALDICT256.value
+GLOBALDICT64K: Final = TokenType.GLOBALDICT64K.value
+GRANT: Final = TokenType.GRANT.value
+GROUP: Final = TokenType.GROUP.value
+GZIP: Final = TokenType.GZIP.value
+HAVING: Final = TokenType.HAVING.value
+IDENTITY: Final = TokenType.IDENTITY.value
+IGNORE: Final = TokenType.IGNORE.value
+ILIKE: Final = TokenType.ILIKE.value
+IN: Final = TokenType.IN.value
+INITIALLY: Final = TokenType.INITIALLY.value
+INNER: Final = TokenType.INNER.value
+INTERSECT: Final = TokenType.INTERSECT.value
+INTO: Final = TokenType.INTO.value
+IS: Final = TokenType.IS.value
+ISNULL: Final = TokenType.ISNULL.value
+JOIN: Final = TokenType.JOIN.value
+LANGUAGE: Final = TokenType.LANGUAGE.value
+LEADING: Final = TokenType.LEADING.value
+LEFT: Final = TokenType.LEFT.value
+LIKE: Final = TokenType.LIKE.value
+LIMIT: Final = TokenType.LIMIT.value
+LOCALTIME: Final = TokenType.LOCALTIME.value
+LOCALTIMESTAMP: Final = TokenType.LOCALTIMESTAMP.value
+LUN: Final = TokenType.LUN.value
+LUNS: Final = TokenType.LUNS.value
+LZO: Final = TokenType.LZO.value
+LZOP: Final = TokenType.LZOP.value
+MINUS: Final = TokenType.MINUS.value
+MOSTLY13: Final = TokenType.MOSTLY13.value
+MOSTLY32: Final = TokenType.MOSTLY32.value
+MOSTLY8: Final = TokenType.MOSTLY8.value
+NATURAL: Final = TokenType.NATURAL.value
+NEW: Final = TokenType.NEW.value
+NOT: Final = TokenType.NOT.value
+NOTNULL: Final = TokenType.NOTNULL.value
+NULL: Final = TokenType.NULL.value
+NULLS: Final = TokenType.NULLS.value
+OFF: Final = TokenType.OFF.value
+OFFLINE: Final = TokenType.OFFLINE.value
+OFFSET: Final = TokenType.OFFSET.value
+OID: Final = TokenType.OID.value
+OLD: Final = TokenType.OLD.value
+ON: Final = TokenType.ON.value
+ONLY: Final = TokenType.ONLY.value
+OPEN: Final = TokenType.OPEN.value
+OR: Final = TokenType.OR.value
+ORDER: Final = TokenType.ORDER.value
+OUTER: Final = TokenType.OUTER.value
+OVERLAPS: Final = TokenType.OVERLAPS.value
+PARALLEL: Final = TokenType.PARALLEL.value
+PARTITION: Final = TokenType.PARTITION.value
+PERCENT: Final = TokenType.PERCENT.value
+PERMISSIONS: Final = TokenType.PERMISSIONS.value
+PLACING: Final = TokenType.PLACING.value
+PRIMARY: Final = TokenType.PRIMARY.value
+RAW: Final = TokenType.RAW.value
+READRATIO: Final = TokenType.READRATIO.value
+RECOVER: Final = TokenType.RECOVER.value
+REFERENCES: Final = TokenType.REFERENCES.value
+RESPECT: Final = TokenType.RESPECT.value
+REJECTLOG: Final = TokenType.REJECTLOG.value
+RESORT: Final = TokenType.RESORT.value
+RESTORE: Final = TokenType.RESTORE.value
+RIGHT: Final = TokenType.RIGHT.value
+SELECT: Final = TokenType.SELECT.value
+SESSION_USER: Final = TokenType.SESSION_USER.value
+SIMILAR: Final = TokenType.SIMILAR.value
+SNAPSHOT: Final = TokenType.SNAPSHOT.value
+SOME: Final = TokenType.SOME.value
+SYSDATE: Final = TokenType.SYSDATE.value
+SYSTEM: Final = TokenType.SYSTEM.value
+TABLE: Final = TokenType.TABLE.value
+TAG: Final = TokenType.TAG.value
+TDES: Final = TokenType.TDES.value
+TEXT255: Final = TokenType.TEXT255.value
+TEXT32K: Final = TokenType.TEXT32K.value
+THEN: Final = TokenType.THEN.value
+TIMESTAMP: Final = TokenType.TIMESTAMP.value
+TO: Final = TokenType.TO.value
+TOP: Final = TokenType.TOP.value
+TRAILING: Final = TokenType.TRAILING.value
+TRUE: Final = TokenType.TRUE.value
+TRUNCATECOLUMNS: Final = TokenType.TRUNCATECOLUMNS.value
+UNION: Final = TokenType.UNION.value
+UNIQUE: Final = TokenType.UNIQUE.value
+USER: Final = TokenType.USER.value
+USING: Final = TokenType.USING.value
+VERBOSE: Final = TokenType.VERBOSE.value
+WALLET: Final = TokenType.WALLET.value
+WHEN: Final = TokenType.WHEN.value
+WHERE: Final = TokenType.WHERE.value
+WITH: Final = TokenType.WITH.value
+WITHOUT: Final = TokenType.WITHOUT.value
+
+PLACEHOLDER: Final = TokenType.PLACEHOLDER.value
+
+SEMICOLON: Final = TokenType.SEMICOLON.value
+
+# String names of token types, for compatibility with code that stored or
+# compared them: type_names[kind] is the name and type_ids[name] the kind
+type_names: List[str] = [kind.name for kind in TokenType]
+type_ids: Dict[str, int] = {kind.name: kind.value for kind in TokenType}
+# Indexed by integer kind, to convert a small int back to its TokenType
+kinds: List[TokenType] = list(TokenType)
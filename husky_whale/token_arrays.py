@@ -0,0 +1,111 @@
+from array import array
+from collections import Counter
+from typing import Dict, List, Tuple, cast
+
+from husky_whale import token
+from husky_whale.lexer import (
+    _group_token_types,
+    _keyword_group,
+    _master_pattern,
+    _trivia_types,
+    keyword_tokens,
+)
+from husky_whale.position import LineIndex, Position
+from husky_whale.token import Token, TokenType
+
+
+class TokenArrays:
+    """
+    Every token of an input as parallel arrays: `types` holds TokenType values
+    and `starts`/`ends` hold offsets into `input`.
+
+    The arrays support the buffer protocol, so they can be wrapped without
+    copying, e.g. `numpy.frombuffer(arrays.types, dtype=numpy.uint16)`.
+    """
+
+    def __init__(self, input: str, types: array, starts: array, ends: array):
+        self.input = input
+        self.types = types
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def type(self, index: int) -> TokenType:
+        return token.kinds[self.types[index]]
+
+    def literal(self, index: int) -> str:
+        return self.input[self.starts[index] : self.ends[index]]
+
+    def token(self, index: int) -> Token:
+        return Token(
+            self.types[index],
+            self.input,
+            self.starts[index],
+            self.ends[index],
+        )
+
+    def type_counts(self) -> Dict[TokenType, int]:
+        return {
+            token.kinds[type_id]: count
+            for type_id, count in Counter(self.types).items()
+        }
+
+
+def tokenize(input: str) -> TokenArrays:
+    """
+    Lex the whole input at once, without creating a Token per token.
+
+    Produces the same token stream as Lexer, excluding the final EOF token.
+    """
+    types = array("H")
+    starts = array("I")
+    ends = array("I")
+    add_type = types.append
+    add_start = starts.append
+    add_end = ends.append
+    group_types = _group_token_types
+    keywords = keyword_tokens
+
+    for match in _master_pattern.finditer(input):
+        # Every alternative of the pattern is a group
+        group = cast(int, match.lastindex)
+        start, end = match.span()
+        if group == _keyword_group and input[end : end + 1] != "(":
+            add_type(keywords.get(match.group().upper(), token.IDENTIFIER))
+        else:
+            add_type(group_types[group])
+        add_start(start)
+        add_end(end)
+
+    return TokenArrays(input, types, starts, ends)
+
+
+class TokenArrayLexer:
+    """Replays TokenArrays through the same interface as Lexer, for Parser."""
+
+    def __init__(self, arrays: TokenArrays):
+        self.arrays = arrays
+        self.input = arrays.input
+        self.index = 0
+        self.lines = LineIndex(arrays.input)
+
+    def next_whitespace_and_token(self) -> Tuple[List[Token], Token]:
+        whitespace = []
+        types = self.arrays.types
+        while self.index < len(types) and types[self.index] in _trivia_types:
+            whitespace.append(self.arrays.token(self.index))
+            self.index += 1
+        return whitespace, self.next_token()
+
+    def next_token(self) -> Token:
+        if self.index >= len(self.arrays):
+            end = len(self.input)
+            return Token(token.EOF, self.input, end, end)
+        t = self.arrays.token(self.index)
+        self.index += 1
+        return t
+
+    def position_of(self, offset: int) -> Position:
+        return self.lines.position_of(offset)
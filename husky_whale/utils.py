@@ -1,61 +1,99 @@
-from typing import Union
+import dataclasses
+from typing import Any, Dict, Iterator, List, Tuple, Union
 
 from husky_whale import ast
 
 
-def node_to_tree(n: ast.Node, _key="", _depth=0, _last=True, _base_prefix="") -> str:
-    children = n.child_nodes()
-    value_attrs = [
-        f"{key}={repr(value)}"
-        for key, value in n.as_dict().items()
-        if key not in children.keys()
-        and key not in ("preceding", "trailing")
-        and value is not None
-    ]
-    value = f"{n.__class__.__name__}({', '.join(value_attrs)})"
+def walk(n: ast.Node) -> Iterator[ast.Node]:
+    """
+    Yield n and every node below it in child_nodes(), parents before their
+    children, using a stack rather than recursion.
+    """
+    stack = [n]
+    while stack:
+        node = stack.pop()
+        yield node
+        children = list(node.child_nodes().values())
+        children.reverse()
+        stack.extend(children)
 
-    if _depth == 0:
-        prefix = ""
-    else:
-        prefix = "└── " if _last else "├── "
 
-    output = f"{_base_prefix}{prefix}{_key}{value}\n"
+def _attributes(n: ast.Node) -> Dict[str, Any]:
+    # Like as_dict(), but without converting the nodes below n
+    if type(n).as_dict is not ast.Node.as_dict:
+        return n.as_dict()
+    return {field.name: getattr(n, field.name) for field in dataclasses.fields(n)}
 
-    for index, (child_key, child_node) in enumerate(children.items()):
-        is_last_child = index == (len(children) - 1)
-        if _depth == 0:
+
+def node_to_tree(n: ast.Node) -> str:
+    output = []
+    # The (node, key, depth, is last child, prefix) of each line still to
+    # output, the next one last
+    stack: List[Tuple[ast.Node, str, int, bool, str]] = [(n, "", 0, True, "")]
+    while stack:
+        node, key, depth, last, base_prefix = stack.pop()
+        children = node.child_nodes()
+        value_attrs = [
+            f"{name}={repr(value)}"
+            for name, value in _attributes(node).items()
+            if name not in children.keys()
+            and name not in ("preceding", "trailing")
+            and value is not None
+        ]
+        value = f"{node.__class__.__name__}({', '.join(value_attrs)})"
+
+        if depth == 0:
+            prefix = ""
             parent_prefix = ""
         else:
-            parent_prefix = "    " if _last else "│   "
-        output += node_to_tree(
-            child_node,
-            _key=child_key + " = ",
-            _depth=_depth + 1,
-            _last=is_last_child,
-            _base_prefix=_base_prefix + parent_prefix,
-        )
-    return output
+            prefix = "└── " if last else "├── "
+            parent_prefix = "    " if last else "│   "
+        output.append(f"{base_prefix}{prefix}{key}{value}\n")
+
+        child_prefix = base_prefix + parent_prefix
+        items = list(children.items())
+        for index in range(len(items) - 1, -1, -1):
+            child_key, child_node = items[index]
+            stack.append(
+                (
+                    child_node,
+                    child_key + " = ",
+                    depth + 1,
+                    index == len(items) - 1,
+                    child_prefix,
+                )
+            )
+    return "".join(output)
 
 
 def node_to_dict(n: ast.Node) -> Union[dict, str]:
-    result = {}
-
-    if hasattr(n, "literal"):
-        return n.literal
-    elif hasattr(n, "keyword"):
-        return n.keyword
-    elif hasattr(n, "column"):
-        result["column"] = n.column
-        if hasattr(n, "table") and getattr(n, "table", None):
+    def value_of(n: ast.Node) -> Union[dict, str]:
+        if hasattr(n, "literal"):
+            return n.literal
+        elif hasattr(n, "keyword"):
+            return n.keyword
+        result = {}
+        if hasattr(n, "column"):
+            result["column"] = n.column
+            if hasattr(n, "table") and getattr(n, "table", None):
+                result["table"] = n.table
+        elif hasattr(n, "table"):
             result["table"] = n.table
-    elif hasattr(n, "table"):
-        result["table"] = n.table
-    elif hasattr(n, "function"):
-        result["function"] = n.function.column
-    elif hasattr(n, "alias"):
-        result["alias"] = n.alias
-
-    children = n.child_nodes()
-    for child_key, child_node in children.items():
-        result[child_key] = node_to_dict(child_node)
-    return result
+        elif hasattr(n, "function"):
+            result["function"] = n.function.column
+        elif hasattr(n, "alias"):
+            result["alias"] = n.alias
+        return result
+
+    root = value_of(n)
+    # The (node, its dict) pairs whose children are still to be added
+    stack = [(n, root)]
+    while stack:
+        node, result = stack.pop()
+        if not isinstance(result, dict):
+            continue
+        for child_key, child_node in node.child_nodes().items():
+            child = value_of(child_node)
+            result[child_key] = child
+            stack.append((child_node, child))
+    return root